@@ -0,0 +1,105 @@
+"""
+JSON serialization benchmark
+Serves the same 10k habit logs through two endpoints of a throwaway app:
+the default FastAPI path (response_model validation, jsonable dicts and the
+stdlib encoder), fast_json_response (pydantic-core straight to bytes) and
+fast_json_response over plain column rows (what GET /habits/{id}/logs
+selects), then measures gzip / brotli size and cost for the payload.
+
+Usage:
+    python bench_serialization.py [--rows 10000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models import HabitLog
+from schemas import HabitLogResponse
+from utils.compression import brotli, compress, supported_encodings
+from utils.fast_json import FastJSONResponse, fast_json_response
+
+
+def build_logs(rows: int) -> List[HabitLog]:
+    """Transient ORM objects, like the rows a query returns"""
+    start = datetime(2020, 1, 1, 8, 0)
+    return [
+        HabitLog(
+            id=index + 1,
+            habit_id=1,
+            date=start + timedelta(days=index),
+            value=index % 3 != 0,
+            note=f"Day {index}: felt good" if index % 4 == 0 else None
+        )
+        for index in range(rows)
+    ]
+
+
+def build_app(logs: List[HabitLog]) -> FastAPI:
+    app = FastAPI()
+    rows = [
+        {"id": log.id, "habit_id": log.habit_id, "date": log.date, "value": log.value, "note": log.note}
+        for log in logs
+    ]
+
+    @app.get("/default", response_model=List[HabitLogResponse])
+    def default_path():
+        return logs
+
+    @app.get("/fast", response_model=List[HabitLogResponse], response_class=FastJSONResponse)
+    def fast_path():
+        return fast_json_response(List[HabitLogResponse], logs)
+
+    @app.get("/fast-rows", response_model=List[HabitLogResponse], response_class=FastJSONResponse)
+    def fast_rows_path():
+        return fast_json_response(List[HabitLogResponse], rows)
+    
+    return app
+
+
+def time_ms(func, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    logs = build_logs(args.rows)
+    client = TestClient(build_app(logs))
+    headers = {"Accept-Encoding": "identity"}
+    
+    body = client.get("/fast", headers=headers).content
+    assert client.get("/default").json() == client.get("/fast").json() == client.get("/fast-rows").json(), \
+        "paths disagree"
+    
+    print(f"{args.rows} logs ({len(body)} bytes), median of {args.repeat} requests\n")
+    print(f"{'path':<12}{'ms/request':>12}")
+    for label, path in (("default", "/default"), ("fast", "/fast"), ("fast rows", "/fast-rows")):
+        elapsed = time_ms(lambda: client.get(path, headers=headers), args.repeat)
+        print(f"{label:<12}{elapsed:>12.1f}")
+    
+    print(f"\n{'encoding':<12}{'ms':>12}{'bytes':>12}{'ratio':>10}")
+    if brotli is None:
+        print("(brotli not installed: only gzip is negotiated)")
+    for encoding in supported_encodings():
+        elapsed = time_ms(lambda: compress(body, encoding), args.repeat)
+        size = len(compress(body, encoding))
+        print(f"{encoding:<12}{elapsed:>12.1f}{size:>12}{len(body) / size:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+SQLite engine profile benchmark
+Compares read/write throughput of the "default" and "production" profiles
+with concurrent clients: writers upsert habit logs one commit at a time
+(like POST /habits/{id}/logs) while readers load a user's logs (like the
+analytics endpoints).
+
+Usage:
+    python bench_sqlite.py [--writers 4] [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_db_engine, sqlite_pragmas
+from models import User, Habit, HabitLog
+
+HABITS = 20
+SEED_DAYS = 365
+
+
+def seed(session_factory):
+    """Create one user with a year of logs for every habit"""
+    db = session_factory()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    habits = [Habit(name=f"Habit {i}", goal="Benchmark", user_id=user.id) for i in range(HABITS)]
+    db.add_all(habits)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    for habit in habits:
+        db.add_all(
+            HabitLog(habit_id=habit.id, date=start + timedelta(days=day), value=random.random() < 0.7)
+            for day in range(SEED_DAYS)
+        )
+    db.commit()
+    habit_ids = [habit.id for habit in habits]
+    db.close()
+    return habit_ids
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    """Measure one profile on a fresh database, removed afterwards"""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{profile}-") as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        return _measure(url, profile, writers, readers, seconds)
+
+
+def _measure(url: str, profile: str, writers: int, readers: int, seconds: float) -> dict:
+    engine = create_db_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    habit_ids = seed(session_factory)
+
+    counters = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def count(key):
+        with lock:
+            counters[key] += 1
+
+    def writer():
+        day = datetime(2025, 1, 1) + timedelta(days=random.randint(0, 10000))
+        while time.monotonic() < stop_at:
+            db = session_factory()
+            try:
+                db.add(HabitLog(habit_id=random.choice(habit_ids), date=day, value=True))
+                db.commit()
+                count("writes")
+            except OperationalError:
+                db.rollback()
+                count("locked")
+            finally:
+                db.close()
+            day += timedelta(days=1)
+
+    def reader():
+        while time.monotonic() < stop_at:
+            db = session_factory()
+            try:
+                db.query(HabitLog).filter(HabitLog.habit_id.in_(habit_ids)).all()
+                count("reads")
+            except OperationalError:
+                count("locked")
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_s": counters["writes"] / seconds,
+        "reads_per_s": counters["reads"] / seconds,
+        "locked_errors": counters["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per profile\n")
+    print(f"{'profile':<12}{'writes/s':>12}{'reads/s':>12}{'locked':>10}")
+    for profile in ("default", "production"):
+        result = run_profile(profile, args.writers, args.readers, args.seconds)
+        print(
+            f"{result['profile']:<12}{result['writes_per_s']:>12.1f}"
+            f"{result['reads_per_s']:>12.1f}{result['locked_errors']:>10}"
+        )
+    print(f"\nproduction pragmas: {sqlite_pragmas('production')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Worker start-up benchmark
+Starts the API in a fresh uvicorn process several times and measures the
+time until the first request is answered and the worker's resident memory
+(RSS) right after it. The "pandas preloaded" row imports pandas before the
+app, which is what every worker paid before the analytics imports were made
+lazy.
+
+Usage:
+    python bench_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_TIMEOUT_SECONDS = 60
+
+SERVER_SCRIPT = """
+import sys
+{preload}
+import uvicorn
+uvicorn.run("main:app", host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def start_worker(preload: str, database_url: str) -> dict:
+    """Spawn one worker and poll it until the first request succeeds"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT.format(preload=preload), str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > STARTUP_TIMEOUT_SECONDS:
+                raise RuntimeError("worker did not answer in time")
+            if process.poll() is not None:
+                raise RuntimeError(f"worker exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read()
+                break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.01)
+        first_request = time.perf_counter() - started
+        return {"first_request_s": first_request, "rss_mb": rss_mb(process.pid)}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run_variant(preload: str, runs: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        # The first start creates the schema; measure warm restarts like a scale-up
+        start_worker(preload, database_url)
+        results = [start_worker(preload, database_url) for _ in range(runs)]
+    return {
+        "first_request_s": statistics.median(result["first_request_s"] for result in results),
+        "rss_mb": statistics.median(result["rss_mb"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"median of {args.runs} worker starts\n")
+    print(f"{'variant':<20}{'first request (s)':>20}{'RSS (MB)':>12}")
+    for label, preload in (("lazy imports", ""), ("pandas preloaded", "import pandas")):
+        result = run_variant(preload, args.runs)
+        print(f"{label:<20}{result['first_request_s']:>20.3f}{result['rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,7 @@
-from database import SessionLocal
+from database import AsyncSessionLocal
 
 
-def get_db():
+async def get_db():
     """Database session dependency"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
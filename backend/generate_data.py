@@ -0,0 +1,310 @@
+"""
+Synthetic data generator
+Fills the database with users, habits, categories, tags, goals and logs
+through SQLAlchemy Core bulk inserts (no HTTP, no ORM objects), for scale
+tests such as 10k users x 20 habits x 3 years of history.
+
+Every habit alternates completed streaks and gaps whose lengths are drawn
+from geometric distributions: --mean-streak sets the average streak and the
+gaps are sized so the habit completes its own rate of days, drawn around
+--completion-rate. Missed days are logged as not completed some of the
+time, and --duplicate-rate adds a second log on the same day, as clients
+that toggle twice produce.
+
+The same --seed and --end-date on an empty database produce the same data.
+Run it while the API is not writing: ids are allocated up front.
+
+Usage:
+    python generate_data.py [--users 100] [--habits 20] [--days 365] [--seed 42]
+    python generate_data.py --users 10000 --days 1095 --database-url sqlite:///./scale.db
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+# Names of the categories created by seed_data.py
+CATEGORIES = [
+    ("Health & Fitness", "Physical health and exercise habits", "#10b981", "fitness"),
+    ("Productivity", "Work and productivity habits", "#3b82f6", "productivity"),
+    ("Learning", "Education and skill development", "#8b5cf6", "book"),
+    ("Mindfulness", "Mental health and meditation", "#ec4899", "meditation"),
+    ("Social", "Relationships and social activities", "#f59e0b", "people"),
+]
+HABITS = [
+    ("Morning Meditation", "Meditate for 10 minutes every morning"),
+    ("Running", "Run 5k three times a week"),
+    ("Reading", "Read 20 pages a day"),
+    ("Drink Water", "Drink 2 liters of water"),
+    ("Journaling", "Write a journal entry before bed"),
+    ("Spanish Practice", "Practice Spanish for 15 minutes"),
+    ("Stretching", "Stretch after waking up"),
+    ("No Sugar", "Skip added sugar for the day"),
+    ("Call Family", "Call a family member"),
+    ("Deep Work", "Two hours of focused work"),
+    ("Walk", "Walk 8000 steps"),
+    ("Sleep Early", "In bed before 23:00"),
+]
+TAGS = ["morning", "evening", "health", "focus", "social", "weekend", "quick", "outdoor"]
+NOTES = [
+    "felt great today", "hard to start but done", "skipped breakfast", "new personal best",
+    "rainy day, stayed inside", "short session", "with a friend", "tired after work",
+    "traveling, did a lighter version", "very productive morning",
+]
+
+# Bulk insert batch (rows per executemany call)
+BATCH_SIZE = 20000
+
+
+def geometric(rng: random.Random, mean: float) -> int:
+    """Run length >= 1 with the given mean"""
+    if mean <= 1:
+        return 1
+    p = 1 / mean
+    return 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+
+
+class Generator:
+    """Allocates ids and builds the rows of one chunk of users at a time"""
+
+    def __init__(self, conn, args, password_hash: str):
+        from models import Category, Goal, Habit, HabitLog, Tag, User
+        from models.tag import habit_tags
+        
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.password_hash = password_hash
+        self.end_day = args.end_date
+        self.start_day = args.end_date - timedelta(days=args.days - 1)
+        self.tables = {
+            "users": User.__table__, "categories": Category.__table__, "habits": Habit.__table__,
+            "tags": Tag.__table__, "habit_tags": habit_tags, "goals": Goal.__table__,
+            "habit_logs": HabitLog.__table__,
+        }
+        self.next_ids = {name: self._max_id(name) + 1 for name in self.tables if name != "habit_tags"}
+        self.counts: Dict[str, int] = {name: 0 for name in self.tables}
+
+    def _max_id(self, name: str) -> int:
+        from sqlalchemy import func, select
+        table = self.tables[name]
+        return self.conn.execute(select(func.max(table.c.id))).scalar() or 0
+
+    def _allocate(self, name: str) -> int:
+        allocated = self.next_ids[name]
+        self.next_ids[name] += 1
+        return allocated
+
+    def insert(self, name: str, rows: List[dict]) -> None:
+        for start in range(0, len(rows), BATCH_SIZE):
+            self.conn.execute(self.tables[name].insert(), rows[start:start + BATCH_SIZE])
+        self.counts[name] += len(rows)
+
+    def ensure_categories(self) -> List[int]:
+        """Ids of the seed categories, creating the missing ones"""
+        from sqlalchemy import select, update
+        from models.cache_version import CacheVersion
+        from utils.category_catalog import CATALOG_NAME
+        
+        table = self.tables["categories"]
+        existing = dict(self.conn.execute(select(table.c.name, table.c.id)).all())
+        rows = [
+            {"id": self._allocate("categories"), "name": name, "description": description,
+             "color": color, "icon": icon, "created_at": datetime.combine(self.start_day, datetime.min.time())}
+            for name, description, color, icon in CATEGORIES if name not in existing
+        ]
+        if rows:
+            self.insert("categories", rows)
+            # Running workers reload their category catalog
+            self.conn.execute(
+                update(CacheVersion.__table__)
+                .where(CacheVersion.__table__.c.name == CATALOG_NAME)
+                .values(version=CacheVersion.__table__.c.version + 1)
+            )
+        return sorted(list(existing.values()) + [row["id"] for row in rows])
+
+    def habit_logs(self, habit_id: int, start_day: date) -> List[dict]:
+        """Logs of one habit: alternating streaks and gaps from start_day to the end date"""
+        args, rng = self.args, self.rng
+        rate = min(max(rng.betavariate(*self._beta_parameters()), 0.01), 0.99)
+        mean_gap = max(args.mean_streak * (1 - rate) / rate, 1.0)
+        
+        rows = []
+        day = start_day
+        completed = rng.random() < rate
+        while day <= self.end_day:
+            run = geometric(rng, args.mean_streak if completed else mean_gap)
+            for offset in range(run):
+                current = day + timedelta(days=offset)
+                if current > self.end_day:
+                    break
+                if not completed and rng.random() >= args.missed_log_rate:
+                    continue
+                midnight = datetime(current.year, current.month, current.day)
+                copies = 2 if rng.random() < args.duplicate_rate else 1
+                for copy in range(copies):
+                    value = completed if copy == 0 else rng.random() < 0.5
+                    rows.append({
+                        "id": self._allocate("habit_logs"),
+                        "habit_id": habit_id,
+                        # Logged between 06:00 and 23:00
+                        "date": midnight + timedelta(minutes=360 + int(rng.random() * 1020)),
+                        "day": current.toordinal(),
+                        "value": value,
+                        "note": rng.choice(NOTES) if rng.random() < args.note_rate else None,
+                    })
+            day += timedelta(days=run)
+            completed = not completed
+        return rows
+
+    def _beta_parameters(self) -> tuple:
+        """Beta(a, b) with mean --completion-rate; --completion-spread widens it"""
+        mean, spread = self.args.completion_rate, self.args.completion_spread
+        concentration = max(1 / max(spread, 1e-6) - 1, 0.01)
+        return mean * concentration, (1 - mean) * concentration
+
+    def user_rows(self) -> Dict[str, List[dict]]:
+        """Rows of one user and everything it owns"""
+        args, rng = self.args, self.rng
+        rows: Dict[str, List[dict]] = {name: [] for name in self.tables}
+        user_id = self._allocate("users")
+        joined = self.start_day + timedelta(days=rng.randint(0, args.days // 4))
+        rows["users"].append({
+            "id": user_id, "username": f"{args.prefix}{user_id}", "email": f"{args.prefix}{user_id}@example.com",
+            "hashed_password": self.password_hash, "created_at": datetime.combine(joined, datetime.min.time()),
+        })
+        
+        tags = []
+        for name in rng.sample(TAGS, min(args.tags, len(TAGS))):
+            tag = {"id": self._allocate("tags"), "name": name, "user_id": user_id, "habit_count": 0,
+                   "created_at": datetime.combine(joined, datetime.min.time())}
+            tags.append(tag)
+            rows["tags"].append(tag)
+        
+        for index in range(args.habits):
+            habit_id = self._allocate("habits")
+            name, goal = HABITS[index % len(HABITS)]
+            started = joined + timedelta(days=rng.randint(0, args.days // 10))
+            rows["habits"].append({
+                "id": habit_id, "name": name if index < len(HABITS) else f"{name} {index // len(HABITS) + 1}",
+                "goal": goal, "user_id": user_id,
+                "category_id": rng.choice(self.category_ids) if rng.random() < args.category_rate else None,
+                "created_at": datetime.combine(started, datetime.min.time()),
+            })
+            for tag in rng.sample(tags, rng.randint(0, min(2, len(tags)))):
+                rows["habit_tags"].append({"habit_id": habit_id, "tag_id": tag["id"]})
+                tag["habit_count"] += 1
+            
+            if rng.random() < args.goal_rate:
+                goal_type = rng.choice(("STREAK", "COUNT", "DATE_BASED"))
+                rows["goals"].append({
+                    "id": self._allocate("goals"), "habit_id": habit_id, "user_id": user_id,
+                    "title": f"{name}: {goal_type.lower().replace('_', ' ')} goal", "description": None,
+                    "goal_type": goal_type,
+                    "target_value": rng.randint(7, 60) if goal_type == "STREAK" else rng.randint(20, 300),
+                    "start_date": datetime.combine(started, datetime.min.time()),
+                    "end_date": datetime.combine(self.end_day + timedelta(days=rng.randint(7, 90)), datetime.min.time())
+                    if goal_type == "DATE_BASED" else None,
+                    "completed": False, "completed_at": None,
+                    "created_at": datetime.combine(started, datetime.min.time()),
+                })
+            rows["habit_logs"].extend(self.habit_logs(habit_id, started))
+        return rows
+
+    def generate(self) -> None:
+        """Insert all users chunk by chunk, one transaction per chunk"""
+        args = self.args
+        self.category_ids = self.ensure_categories()
+        self.conn.commit()
+        
+        started = time.perf_counter()
+        for first in range(0, args.users, args.chunk_users):
+            chunk: Dict[str, List[dict]] = {name: [] for name in self.tables}
+            for _ in range(min(args.chunk_users, args.users - first)):
+                for name, rows in self.user_rows().items():
+                    chunk[name].extend(rows)
+            # Parents before children, for the foreign keys
+            for name in ("users", "tags", "habits", "habit_tags", "goals", "habit_logs"):
+                self.insert(name, chunk[name])
+            self.conn.commit()
+            
+            elapsed = time.perf_counter() - started
+            done = first + min(args.chunk_users, args.users - first)
+            print(f"{done}/{args.users} users, {self.counts['habit_logs']} logs, "
+                  f"{self.counts['habit_logs'] / elapsed:,.0f} logs/s")
+
+    def reset_sequences(self) -> None:
+        """PostgreSQL: move the id sequences past the explicitly inserted ids"""
+        for name in self.next_ids:
+            self.conn.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM {name}))"
+            )
+        self.conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL / the app's database)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--habits", type=int, default=20, help="Habits per user")
+    parser.add_argument("--days", type=int, default=365, help="Days of history up to --end-date")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Last logged day (YYYY-MM-DD)")
+    parser.add_argument("--completion-rate", type=float, default=0.7, help="Mean share of completed days per habit")
+    parser.add_argument("--completion-spread", type=float, default=0.1,
+                        help="How much habits differ from that mean (0-1, Beta distribution)")
+    parser.add_argument("--mean-streak", type=float, default=6, help="Average length of a completed streak (days)")
+    parser.add_argument("--missed-log-rate", type=float, default=0.3,
+                        help="Share of missed days logged as not completed (the rest have no log)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01, help="Share of logged days with a second log")
+    parser.add_argument("--note-rate", type=float, default=0.05, help="Share of logs with a note")
+    parser.add_argument("--tags", type=int, default=4, help="Tags per user (up to 2 per habit)")
+    parser.add_argument("--goal-rate", type=float, default=0.5, help="Share of habits with a goal")
+    parser.add_argument("--category-rate", type=float, default=0.8, help="Share of habits with a category")
+    parser.add_argument("--password", default="password123", help="Password of every generated user")
+    parser.add_argument("--prefix", default="user", help="Username prefix (followed by the user id)")
+    parser.add_argument("--chunk-users", type=int, default=100, help="Users per transaction")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if not 0 < args.completion_rate < 1:
+        parser.error("--completion-rate must be between 0 and 1")
+    
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from database import engine, init_db
+    from utils.auth_utils import hash_password
+    
+    init_db()
+    # bcrypt is deliberately slow: hash once, share it between all users
+    password_hash = hash_password(args.password)
+    
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Bulk load: a crash loses the generated data only, not the tables
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.exec_driver_sql("PRAGMA cache_size=-262144")
+        generator = Generator(conn, args, password_hash)
+        generator.generate()
+        if engine.dialect.name == "postgresql":
+            generator.reset_sequences()
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n{elapsed:.1f}s: " + ", ".join(f"{count} {name}" for name, count in generator.counts.items()))
+    if engine.dialect.name == "sqlite" and engine.url.database:
+        # Move the WAL into the main file first; count what a busy reader kept there
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        size = sum(
+            os.path.getsize(path)
+            for path in (engine.url.database, f"{engine.url.database}-wal")
+            if os.path.exists(path)
+        )
+        print(f"database size: {size / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Gunicorn configuration for production
+Runs N uvicorn worker processes behind one master:
+
+    gunicorn main:app -c gunicorn_conf.py
+
+The app is imported once in the master (preload) and forked, so workers
+share its memory pages and start fast. Schema migrations run once in the
+master before any worker starts, and the workers skip them. Database connections are never shared
+across a fork: every worker opens its own pools.
+
+Signals: HUP replaces the workers gracefully (finishing in-flight
+requests), TERM stops gracefully, USR2 + TERM to the old master upgrades
+the code without downtime.
+"""
+
+import multiprocessing
+import os
+
+# Configuration
+bind = os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))  # Seconds an idle keep-alive connection stays open
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))  # Pending connections queued by the kernel
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))  # Silent workers are killed and replaced after this
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))  # Time to finish requests on stop/reload
+
+# Recycle workers periodically (jittered so they do not all restart at once)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # "-" = stdout, empty disables it
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Apply migrations once, before any worker exists"""
+    # Metric files of a previous run would be aggregated with the new ones
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir and os.path.isdir(multiproc_dir):
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+    
+    from database import INIT_DB_DONE_ENV, engine, init_db
+    init_db()
+    # Inherited by the forked workers, whose lifespan then skips init_db
+    os.environ[INIT_DB_DONE_ENV] = "1"
+    # Do not hand the master's connections down to the workers
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master without closing them"""
+    from database import async_engine, engine
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Stop counting a dead worker's in-flight requests in /metrics"""
+    from utils.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,333 @@
+"""
+Load test
+Simulates N concurrent users replaying the flows of seed_data.py and
+test_dashboard.py: each one registers, logs in, creates habits with goals
+and a few weeks of history, then loops over a weighted mix of actions
+(toggle today's logs, dashboard, goal progress, streaks, login, sign-ups)
+until the run ends. Reports throughput and p50 / p95 / p99 latency per
+endpoint, plus the mean Server-Timing phases the API reported.
+
+By default the app runs in-process (httpx ASGI transport, no network) on a
+fresh SQLite file; --url targets a running server instead, e.g. the
+gunicorn deployment from scripts/run_prod.sh.
+
+Usage:
+    python load_test.py [--users 20] [--duration 30] [--mix toggle=40,dashboard=25,...]
+    python load_test.py --url http://localhost:8000 --users 100 --json results.json
+
+The temporary SQLite database of an in-process run is deleted after the
+report unless --keep-db is given.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = "toggle=40,dashboard=25,goal_progress=15,streaks=10,login=8,register=2"
+PASSWORD = "loadtest-pass-123"
+REQUEST_TIMEOUT_SECONDS = 60
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """"toggle=40,dashboard=25" -> {"toggle": 40, "dashboard": 25}"""
+    weights = {}
+    for part in mix.split(","):
+        action, _, weight = part.partition("=")
+        if action.strip() not in ACTIONS:
+            raise ValueError(f"unknown action {action!r}, choose from {', '.join(ACTIONS)}")
+        weights[action.strip()] = int(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """'db;dur=1.2;desc="3 queries", app;dur=4.5' -> {"db": 1.2, "app": 4.5}"""
+    phases = {}
+    for entry in header.split(","):
+        name, *params = entry.strip().split(";")
+        for param in params:
+            if param.startswith("dur="):
+                phases[name] = float(param[4:])
+    return phases
+
+
+class Recorder:
+    """Latencies, errors and Server-Timing phases per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.phases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str,
+                      expected: int = 200, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[label].append((time.perf_counter() - started) * 1000)
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append((time.perf_counter() - started) * 1000)
+        
+        for phase, milliseconds in parse_server_timing(response.headers.get("server-timing", "")).items():
+            self.phases[label][phase] += milliseconds
+        if response.status_code != expected:
+            self.errors[label] += 1
+            return None
+        return response
+
+    def report(self, elapsed: float) -> List[dict]:
+        rows = []
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            rows.append({
+                "endpoint": label,
+                "requests": len(values),
+                "errors": self.errors[label],
+                "rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": values[-1],
+                "phases_ms": {phase: total / len(values) for phase, total in self.phases[label].items()},
+            })
+        return rows
+
+
+class VirtualUser:
+    """One simulated account with its own habits, goals and token"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, args):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.args = args
+        self.username = f"load_{uuid.uuid4().hex[:12]}"
+        self.headers: Dict[str, str] = {}
+        self.habit_ids: List[int] = []
+        self.goal_ids: List[int] = []
+
+    async def register(self, username: str) -> bool:
+        response = await self.recorder.request(
+            self.client, "POST /auth/register", "POST", "/auth/register", expected=201,
+            json={"username": username, "email": f"{username}@loadtest.example", "password": PASSWORD}
+        )
+        return response is not None
+
+    async def login(self) -> bool:
+        response = await self.recorder.request(
+            self.client, "POST /auth/login", "POST", "/auth/login",
+            data={"username": self.username, "password": PASSWORD}
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def setup(self) -> bool:
+        """Account, habits with a goal each and --history-days of logs"""
+        if not await self.register(self.username) or not await self.login():
+            return False
+        
+        for index in range(self.args.habits):
+            response = await self.recorder.request(
+                self.client, "POST /habits", "POST", "/habits", expected=201, headers=self.headers,
+                json={"name": f"Habit {index + 1}", "goal": "Every day"}
+            )
+            if response is None:
+                return False
+            habit_id = response.json()["id"]
+            self.habit_ids.append(habit_id)
+            
+            response = await self.recorder.request(
+                self.client, "POST /goals", "POST", "/goals", expected=201, headers=self.headers,
+                json={"habit_id": habit_id, "title": "30-day streak", "goal_type": "STREAK", "target_value": 30}
+            )
+            if response is not None:
+                self.goal_ids.append(response.json()["id"])
+        
+        today = date.today()
+        for days_ago in range(self.args.history_days, 0, -1):
+            await self.set_logs(today - timedelta(days=days_ago))
+        return True
+
+    async def set_logs(self, day: Optional[date] = None) -> None:
+        # Completion probability as in a typical user: most habits done most days
+        values = {habit_id: self.rng.random() < 0.7 for habit_id in self.habit_ids}
+        payload = {"values": {str(habit_id): value for habit_id, value in values.items()}}
+        if day is not None:
+            payload["date"] = day.isoformat()
+        await self.recorder.request(
+            self.client, "POST /logs/today", "POST", "/logs/today", headers=self.headers, json=payload
+        )
+
+    async def toggle(self) -> None:
+        await self.set_logs()
+
+    async def dashboard(self) -> None:
+        await self.recorder.request(
+            self.client, "GET /analytics/dashboard", "GET", "/analytics/dashboard", headers=self.headers
+        )
+
+    async def goal_progress(self) -> None:
+        if self.goal_ids:
+            goal_id = self.rng.choice(self.goal_ids)
+            await self.recorder.request(
+                self.client, "GET /goals/{goal_id}/progress", "GET", f"/goals/{goal_id}/progress",
+                headers=self.headers
+            )
+
+    async def streaks(self) -> None:
+        habit_id = self.rng.choice(self.habit_ids)
+        await self.recorder.request(
+            self.client, "GET /streaks/{habit_id}", "GET", f"/streaks/{habit_id}", headers=self.headers
+        )
+
+    async def sign_up(self) -> None:
+        await self.register(f"load_{uuid.uuid4().hex[:12]}")
+
+    async def run(self, deadline: float, weights: Dict[str, int]) -> None:
+        actions = [ACTIONS[action] for action in weights]
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights=list(weights.values()))[0]
+            await action(self)
+            if self.args.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+
+ACTIONS = {
+    "toggle": VirtualUser.toggle,
+    "dashboard": VirtualUser.dashboard,
+    "goal_progress": VirtualUser.goal_progress,
+    "streaks": VirtualUser.streaks,
+    "login": VirtualUser.login,
+    "register": VirtualUser.sign_up,
+}
+
+
+async def simulate(client: httpx.AsyncClient, args) -> tuple:
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    setup_recorder = Recorder()
+    users = [VirtualUser(client, setup_recorder, random.Random(rng.random()), args) for _ in range(args.users)]
+    
+    started = time.perf_counter()
+    ready = await asyncio.gather(*(user.setup() for user in users))
+    setup_elapsed = time.perf_counter() - started
+    users = [user for user, ok in zip(users, ready) if ok]
+    if not users:
+        raise SystemExit("no virtual user finished its setup, is the server up?")
+    
+    # Only the mixed traffic is reported
+    recorder = Recorder()
+    for user in users:
+        user.recorder = recorder
+    
+    # Stagger the start so the users do not move in lockstep
+    async def start(user: VirtualUser, delay: float):
+        await asyncio.sleep(delay)
+        await user.run(deadline, weights)
+    
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(start(user, rng.uniform(0, args.ramp_up)) for user in users))
+    return recorder, time.perf_counter() - started, setup_elapsed
+
+
+async def run(args) -> tuple:
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            return await simulate(client, args)
+    
+    # In-process: the app, its lifespan and the database live in this process
+    from main import app, lifespan
+    transport = httpx.ASGITransport(app=app)
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test",
+                                     timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            return await simulate(client, args)
+
+
+def print_report(rows: List[dict], elapsed: float, setup_elapsed: float, args) -> None:
+    total = sum(row["requests"] for row in rows)
+    errors = sum(row["errors"] for row in rows)
+    print(f"{args.users} users, {elapsed:.1f}s of mixed traffic after a {setup_elapsed:.1f}s setup: "
+          f"{total} requests, {errors} errors, {total / elapsed:.1f} req/s\n")
+    print(f"{'endpoint':<32}{'reqs':>7}{'errors':>8}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for row in rows:
+        print(f"{row['endpoint']:<32}{row['requests']:>7}{row['errors']:>8}{row['rps']:>8.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}")
+    
+    print("\nmean Server-Timing phases (ms)")
+    for row in rows:
+        if row["phases_ms"]:
+            phases = "  ".join(f"{phase} {value:.1f}" for phase, value in row["phases_ms"].items())
+            print(f"{row['endpoint']:<32}{phases}")
+
+
+def run_and_report(args, directory: Optional[str] = None) -> None:
+    """Run the load test, in-process on a SQLite file in `directory` when given"""
+    if directory is not None:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'load.db')}"
+        print(f"in-process app on {os.environ['DATABASE_URL']}")
+    
+    recorder, elapsed, setup_elapsed = asyncio.run(run(args))
+    rows = recorder.report(elapsed)
+    print_report(rows, elapsed, setup_elapsed, args)
+    
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"users": args.users, "duration": args.duration, "mix": args.mix, "endpoints": rows}, file, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of mixed traffic after the setup")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which users start the mix")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean pause between a user's requests (s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Action weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--habits", type=int, default=5, help="Habits (each with a goal) per user")
+    parser.add_argument("--history-days", type=int, default=30, help="Days of logs created per user in the setup")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the action mix")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the in-process SQLite database after the report")
+    args = parser.parse_args()
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    
+    if args.url or "DATABASE_URL" in os.environ:
+        run_and_report(args)
+    elif args.keep_db:
+        directory = tempfile.mkdtemp(prefix="load-test-")
+        run_and_report(args, directory)
+        print(f"\ndatabase kept in {directory}")
+    else:
+        with tempfile.TemporaryDirectory(prefix="load-test-") as directory:
+            run_and_report(args, directory)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import init_db
-from routers import habits, habit_logs, analytics, auth, categories, tags, goals, achievements, streaks
+from database import init_db, init_db_done, AsyncSessionLocal, SessionLocal, POOL_CHECKOUT_LISTENERS
+from utils.compression import RESPONSE_COMPRESSION_ENABLED, CompressionMiddleware
+from utils.category_catalog import category_catalog
+from utils.log_write_queue import log_write_queue, is_queued_mode
+from utils.metrics import METRICS_ENABLED, metrics_middleware, metrics_response, observe_pool_wait
+from utils.principal_cache import watch_principal_version
+from utils.profiling import profiling_enabled, profiling_middleware
+from utils.server_timing import SERVER_TIMING_ENABLED, TimedJSONResponse, server_timing_middleware
+from utils.sql_instrumentation import SQL_INSTRUMENTATION_ENABLED, sql_instrumentation_middleware
+from routers import habits, habit_logs, analytics, auth, categories, tags, goals, achievements, streaks, imports, daily_logs, search
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Worker start-up and shutdown.
+    
+    Runs when the server starts serving instead of at import time, so importing
+    `main` does not touch the database.
+    """
+    # Create missing tables and apply pending migrations, unless the launcher
+    # already did it once before forking the workers
+    if not init_db_done():
+        init_db()
+    
+    # Start the single log writer when write-behind mode is enabled
+    if is_queued_mode():
+        log_write_queue.start()
+    
+    # Serve category reads from memory from the first request on
+    with SessionLocal() as db:
+        category_catalog.load(db)
+    
+    # Drop cached principals when a user changes in another worker
+    principal_watcher = asyncio.create_task(watch_principal_version(AsyncSessionLocal))
+    
+    yield
+    
+    principal_watcher.cancel()
+    
+    # Flush pending log writes before the process exits
+    log_write_queue.stop()
 
-# Initialize database
-init_db()
 
 # Create FastAPI app
 app = FastAPI(
     title="Habit Tracker API",
     description="MVP para demostrar Python mastery con Pandas analytics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # CORS configuration
@@ -23,16 +66,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli / gzip, as negotiated through Accept-Encoding
+if RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Sampled / on-demand profiles (X-Profile header), innermost so the profile
+# covers the handler and the SQL breakdown comes from the instrumentation
+if profiling_enabled():
+    app.middleware("http")(profiling_middleware)
+
+# Per-route request metrics, scraped from /metrics (registered before the
+# SQL instrumentation so it runs inside it and reuses its query stats)
+if METRICS_ENABLED:
+    app.middleware("http")(metrics_middleware)
+    POOL_CHECKOUT_LISTENERS.append(observe_pool_wait)
+
+# Server-Timing: auth, db, orm, compute and serialize phases of every response
+if SERVER_TIMING_ENABLED:
+    app.middleware("http")(server_timing_middleware)
+
+# Query count and DB time per request (X-DB-Query-Count / X-DB-Time-Ms)
+if SQL_INSTRUMENTATION_ENABLED:
+    app.middleware("http")(sql_instrumentation_middleware)
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(habits.router)
 app.include_router(habit_logs.router)
+app.include_router(daily_logs.router)
 app.include_router(analytics.router)
 app.include_router(categories.router)
 app.include_router(tags.router)
 app.include_router(goals.router)
 app.include_router(achievements.router)
 app.include_router(streaks.router)
+app.include_router(imports.router)
+app.include_router(search.router)
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return metrics_response()
 
 
 # Health check endpoint
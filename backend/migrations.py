@@ -0,0 +1,203 @@
+"""
+Versioned schema migrations
+`create_all` only creates missing tables, so changes to existing tables
+(new columns, new indexes) are applied here. Every migration runs once, in
+its own transaction, and is recorded in the schema_version table.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Rows backfilled per batch when migrating existing databases
+MIGRATION_BATCH_SIZE = 5000
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, name: str):
+    """Register an upgrade step; versions must be unique and increasing"""
+    def register(upgrade: Callable[[Connection], None]):
+        assert not MIGRATIONS or MIGRATIONS[-1][0] < version, "migration versions must increase"
+        MIGRATIONS.append((version, name, upgrade))
+        return upgrade
+    return register
+
+
+@migration(1, "habit_logs day key")
+def _add_habit_log_day(conn: Connection) -> None:
+    """Add and backfill habit_logs.day on databases created before the day key existed"""
+    columns = {column["name"] for column in inspect(conn).get_columns("habit_logs")}
+    if "day" in columns:
+        return
+    
+    conn.execute(text("ALTER TABLE habit_logs ADD COLUMN day INTEGER"))
+    
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text("SELECT id, date FROM habit_logs WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": MIGRATION_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        
+        conn.execute(
+            text("UPDATE habit_logs SET day = :day WHERE id = :id"),
+            [
+                {
+                    "id": log_id,
+                    # Raw SELECTs on SQLite return DateTime columns as strings
+                    "day": (datetime.fromisoformat(log_date) if isinstance(log_date, str) else log_date).toordinal()
+                }
+                for log_id, log_date in rows
+            ]
+        )
+        last_id = rows[-1][0]
+    
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_habit_logs_day ON habit_logs (day)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_habit_logs_habit_id_day ON habit_logs (habit_id, day)"
+    ))
+
+
+# Indexes for the foreign keys the routers filter on, shaped after their
+# WHERE / ORDER BY clauses (kept in sync with the models' __table_args__)
+HOT_FK_INDEXES = [
+    ("ix_habits_user_id_category_id", "habits", ("user_id", "category_id")),
+    ("ix_habits_category_id", "habits", ("category_id",)),
+    ("ix_goals_user_id_completed", "goals", ("user_id", "completed")),
+    ("ix_goals_habit_id", "goals", ("habit_id",)),
+    ("ix_streaks_habit_id_start_date", "streaks", ("habit_id", "start_date")),
+    ("ix_achievements_user_id_unlocked_at", "achievements", ("user_id", "unlocked_at")),
+    ("ix_achievements_goal_id", "achievements", ("goal_id",)),
+    ("ix_tags_user_id_name", "tags", ("user_id", "name")),
+    ("ix_habit_tags_tag_id", "habit_tags", ("tag_id",)),
+]
+
+
+@migration(2, "hot foreign key indexes")
+def _add_hot_fk_indexes(conn: Connection) -> None:
+    for index_name, table, columns in HOT_FK_INDEXES:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})"
+        ))
+
+
+@migration(3, "tags habit_count counter")
+def _add_tag_habit_count(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("tags")}
+    if "habit_count" not in columns:
+        conn.execute(text("ALTER TABLE tags ADD COLUMN habit_count INTEGER NOT NULL DEFAULT 0"))
+    
+    conn.execute(text(
+        "UPDATE tags SET habit_count = "
+        "(SELECT COUNT(*) FROM habit_tags WHERE habit_tags.tag_id = tags.id)"
+    ))
+
+
+@migration(4, "category catalog version")
+def _add_category_catalog_version(conn: Connection) -> None:
+    # The table itself comes from create_all; seed the counter it holds
+    conn.execute(text(
+        "INSERT INTO cache_versions (name, version) "
+        "SELECT 'categories', 0 WHERE NOT EXISTS (SELECT 1 FROM cache_versions WHERE name = 'categories')"
+    ))
+
+
+# External-content FTS5 indexes: the text lives in habits / habit_logs only,
+# triggers keep the inverted index in step with every insert, update and delete
+FULL_TEXT_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS habits_fts USING fts5("
+    "name, goal, content='habits', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS habits_fts_insert AFTER INSERT ON habits BEGIN "
+    "INSERT INTO habits_fts (rowid, name, goal) VALUES (new.id, new.name, new.goal); END",
+    "CREATE TRIGGER IF NOT EXISTS habits_fts_delete AFTER DELETE ON habits BEGIN "
+    "INSERT INTO habits_fts (habits_fts, rowid, name, goal) VALUES ('delete', old.id, old.name, old.goal); END",
+    "CREATE TRIGGER IF NOT EXISTS habits_fts_update AFTER UPDATE OF name, goal ON habits BEGIN "
+    "INSERT INTO habits_fts (habits_fts, rowid, name, goal) VALUES ('delete', old.id, old.name, old.goal); "
+    "INSERT INTO habits_fts (rowid, name, goal) VALUES (new.id, new.name, new.goal); END",
+    # Only logs with a note are indexed
+    "CREATE VIRTUAL TABLE IF NOT EXISTS habit_logs_fts USING fts5("
+    "note, content='habit_logs', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS habit_logs_fts_insert AFTER INSERT ON habit_logs "
+    "WHEN new.note IS NOT NULL BEGIN "
+    "INSERT INTO habit_logs_fts (rowid, note) VALUES (new.id, new.note); END",
+    "CREATE TRIGGER IF NOT EXISTS habit_logs_fts_delete AFTER DELETE ON habit_logs "
+    "WHEN old.note IS NOT NULL BEGIN "
+    "INSERT INTO habit_logs_fts (habit_logs_fts, rowid, note) VALUES ('delete', old.id, old.note); END",
+    "CREATE TRIGGER IF NOT EXISTS habit_logs_fts_update AFTER UPDATE OF note ON habit_logs BEGIN "
+    "INSERT INTO habit_logs_fts (habit_logs_fts, rowid, note) SELECT 'delete', old.id, old.note WHERE old.note IS NOT NULL; "
+    "INSERT INTO habit_logs_fts (rowid, note) SELECT new.id, new.note WHERE new.note IS NOT NULL; END",
+]
+
+
+@migration(5, "full-text search index")
+def _add_full_text_search(conn: Connection) -> None:
+    """FTS5 over habit names/goals and log notes (SQLite only; other backends skip it)"""
+    if conn.dialect.name != "sqlite":
+        return
+    
+    for statement in FULL_TEXT_SEARCH_DDL:
+        conn.execute(text(statement))
+    
+    conn.execute(text("INSERT INTO habits_fts (rowid, name, goal) SELECT id, name, goal FROM habits"))
+    conn.execute(text(
+        "INSERT INTO habit_logs_fts (rowid, note) SELECT id, note FROM habit_logs WHERE note IS NOT NULL"
+    ))
+
+
+@migration(6, "principal cache version")
+def _add_principal_cache_version(conn: Connection) -> None:
+    conn.execute(text(
+        "INSERT INTO cache_versions (name, version) "
+        "SELECT 'principals', 0 WHERE NOT EXISTS (SELECT 1 FROM cache_versions WHERE name = 'principals')"
+    ))
+
+
+def applied_versions(db_engine: Engine) -> List[int]:
+    """Versions already recorded in schema_version"""
+    with db_engine.begin() as conn:
+        schema_version.create(conn, checkfirst=True)
+        return list(conn.scalars(select(schema_version.c.version).order_by(schema_version.c.version)))
+
+
+def run_migrations(db_engine: Engine) -> List[int]:
+    """
+    Apply pending migrations in order.
+    
+    Args:
+        db_engine: Sync engine of the database to upgrade
+        
+    Returns:
+        Versions applied by this call
+    """
+    applied = set(applied_versions(db_engine))
+    
+    newly_applied = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        
+        with db_engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(schema_version.insert().values(
+                version=version,
+                name=name,
+                applied_at=datetime.utcnow()
+            ))
+        newly_applied.append(version)
+    
+    return newly_applied
@@ -3,17 +3,20 @@ Models package
 """
 
 from .user import User
-from .habit import Habit
+from .habit import Habit, habit_response_loaders
 from .habit_log import HabitLog
 from .category import Category
 from .tag import Tag, habit_tags
 from .goal import Goal, GoalType
 from .achievement import Achievement
 from .streak import Streak
+from .refresh_token import RefreshToken
+from .cache_version import CacheVersion
 
 __all__ = [
     "User",
     "Habit", 
+    "habit_response_loaders",
     "HabitLog",
     "Category",
     "Tag",
@@ -21,5 +24,7 @@ __all__ = [
     "Goal",
     "GoalType",
     "Achievement",
-    "Streak"
+    "Streak",
+    "RefreshToken",
+    "CacheVersion"
 ]
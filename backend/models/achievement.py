@@ -3,7 +3,7 @@ Achievement model - Milestones unlocked when goals are completed
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -11,6 +11,10 @@ from database import Base
 
 class Achievement(Base):
     __tablename__ = "achievements"
+    __table_args__ = (
+        Index("ix_achievements_user_id_unlocked_at", "user_id", "unlocked_at"),
+        Index("ix_achievements_goal_id", "goal_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,18 @@
+"""
+CacheVersion model - Version counters for in-process caches
+Writers bump a named version in the same transaction as their change; every
+worker compares it with the version its cache was built from.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from database import Base
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
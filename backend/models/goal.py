@@ -4,7 +4,7 @@ Supports three types: STREAK (consecutive days), COUNT (total completions), DATE
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -20,6 +20,10 @@ class GoalType(str, enum.Enum):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_completed", "user_id", "completed"),
+        Index("ix_goals_habit_id", "habit_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id", ondelete="CASCADE"), nullable=False)
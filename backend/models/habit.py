@@ -3,14 +3,18 @@ Habit model
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import joinedload, raiseload, relationship, selectinload
 
 from database import Base
 
 
 class Habit(Base):
     __tablename__ = "habits"
+    __table_args__ = (
+        Index("ix_habits_user_id_category_id", "user_id", "category_id"),
+        Index("ix_habits_category_id", "category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -28,3 +32,16 @@ class Habit(Base):
     streaks = relationship("Streak", back_populates="habit", cascade="all, delete-orphan")
 
 
+def habit_response_loaders() -> tuple:
+    """
+    Loader options for queries serialized as HabitResponse.
+    
+    Category and tags are fetched eagerly (one JOIN plus one IN query for any
+    number of habits) and any other lazy load raises instead of silently
+    querying once per row.
+    """
+    return (
+        joinedload(Habit.category),
+        selectinload(Habit.tags),
+        raiseload("*"),
+    )
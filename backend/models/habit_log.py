@@ -2,19 +2,30 @@
 HabitLog model
 """
 
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship, validates
 
 from database import Base
+from utils.day_key import to_day_key
 
 
 class HabitLog(Base):
     __tablename__ = "habit_logs"
+    __table_args__ = (
+        Index("ix_habit_logs_habit_id_day", "habit_id", "day"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id"), nullable=False)
     date = Column(DateTime, nullable=False)
+    day = Column(Integer, nullable=False, index=True)  # Day key (date ordinal), derived from `date`
     value = Column(Boolean, default=False)  # True = completed, False = not completed
     note = Column(Text, nullable=True)  # Optional journal note/reflection
     
     habit = relationship("Habit", back_populates="logs")
+    
+    @validates("date")
+    def _sync_day(self, key, value):
+        """Keep the day key in step with the log timestamp"""
+        self.day = to_day_key(value)
+        return value
@@ -0,0 +1,27 @@
+"""
+RefreshToken model - Rotating, revocable refresh tokens
+Only a SHA-256 digest of each token is stored; tokens issued from the same
+login share a family so reuse of a rotated token can revoke the whole chain.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+from database import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # Set on rotation, logout or reuse detection
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="refresh_tokens")
@@ -4,7 +4,7 @@ Tracks consecutive completion periods for analytics
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -12,6 +12,9 @@ from database import Base
 
 class Streak(Base):
     __tablename__ = "streaks"
+    __table_args__ = (
+        Index("ix_streaks_habit_id_start_date", "habit_id", "start_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id", ondelete="CASCADE"), nullable=False)
@@ -3,7 +3,7 @@ Tag model - User-specific tags for habits with many-to-many relationship
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -14,16 +14,22 @@ habit_tags = Table(
     'habit_tags',
     Base.metadata,
     Column('habit_id', Integer, ForeignKey('habits.id', ondelete='CASCADE'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key covers lookups by habit; tag-side lookups need their own index
+    Index('ix_habit_tags_tag_id', 'tag_id')
 )
 
 
 class Tag(Base):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index("ix_tags_user_id_name", "user_id", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    habit_count = Column(Integer, nullable=False, default=0, server_default="0")  # Denormalized, see utils/tag_counts.py
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -1,4 +1,4 @@
-from routers import habits, habit_logs, analytics, auth, categories, tags, goals, achievements, streaks
+from routers import habits, habit_logs, analytics, auth, categories, tags, goals, achievements, streaks, imports, daily_logs, search
 
 __all__ = [
     "habits",
@@ -9,5 +9,8 @@ __all__ = [
     "tags",
     "goals",
     "achievements",
-    "streaks"
+    "streaks",
+    "imports",
+    "daily_logs",
+    "search"
 ]
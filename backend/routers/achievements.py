@@ -1,11 +1,13 @@
 from typing import List
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import Achievement, User
 from schemas import AchievementResponse
 from utils.auth_utils import get_current_user
+from utils.sql_instrumentation import query_budget
 
 router = APIRouter(
     prefix="/achievements",
@@ -13,14 +15,16 @@ router = APIRouter(
 )
 
 
-@router.get("", response_model=List[AchievementResponse])
-def list_achievements(
-    db: Session = Depends(get_db),
+@router.get("", response_model=List[AchievementResponse], dependencies=[Depends(query_budget(1))])
+async def list_achievements(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all achievements for current user"""
-    achievements = db.query(Achievement).filter(
-        Achievement.user_id == current_user.id
-    ).order_by(Achievement.unlocked_at.desc()).all()
+    result = await db.execute(
+        select(Achievement)
+        .where(Achievement.user_id == current_user.id)
+        .order_by(Achievement.unlocked_at.desc())
+    )
     
-    return achievements
+    return result.scalars().all()
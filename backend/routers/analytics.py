@@ -1,12 +1,12 @@
-from datetime import datetime, timedelta
-from typing import Dict
-import pandas as pd
+from typing import Dict, List
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
-from models import Habit, HabitLog, User, Category
+from models import Habit, HabitLog, User
 from schemas.analytics import (
     HeatmapResponse, 
     HeatmapDataPoint, 
@@ -16,6 +16,11 @@ from schemas.analytics import (
     HabitSummary
 )
 from utils.auth_utils import get_current_user
+from utils.category_catalog import CategoryCatalog, get_category_catalog
+from utils.fast_json import FastJSONResponse, fast_json_response
+from utils.metrics import timed_calculator
+from utils.sql_instrumentation import query_budget
+from utils.day_key import from_day_key, today_key
 from utils.streak_calculator import calculate_current_streak, calculate_longest_streak
 
 router = APIRouter(
@@ -24,18 +29,20 @@ router = APIRouter(
 )
 
 
-@router.get("/dashboard", response_model=DashboardAnalytics)
-def get_dashboard_analytics(
-    db: Session = Depends(get_db),
+@router.get("/dashboard", response_model=DashboardAnalytics, response_class=FastJSONResponse, dependencies=[Depends(query_budget(4))])
+async def get_dashboard_analytics(
+    db: AsyncSession = Depends(get_db),
+    catalog: CategoryCatalog = Depends(get_category_catalog),
     current_user: User = Depends(get_current_user)
 ):
     
     # Get all user habits
-    habits = db.query(Habit).filter(Habit.user_id == current_user.id).all()
+    result = await db.execute(select(Habit).where(Habit.user_id == current_user.id))
+    habits = result.scalars().all()
     
     if not habits:
         # Return empty analytics for users with no habits
-        return DashboardAnalytics(
+        return fast_json_response(DashboardAnalytics, DashboardAnalytics(
             overall_stats=OverallStats(
                 total_habits=0,
                 total_logs=0,
@@ -48,26 +55,34 @@ def get_dashboard_analytics(
             heatmap_data=[],
             habit_summaries=[],
             category_breakdown={}
-        )
+        ))
     
     habit_ids = [h.id for h in habits]
     
     # Get all logs for user's habits
-    all_logs = db.query(HabitLog).filter(HabitLog.habit_id.in_(habit_ids)).all()
-    
-    # Convert to DataFrame for analysis
-    if all_logs:
-        df = pd.DataFrame([
-            {
-                'habit_id': log.habit_id,
-                'date': log.date.date(),
-                'value': log.value,
-                'habit_name': next((h.name for h in habits if h.id == log.habit_id), 'Unknown')
-            }
-            for log in all_logs
-        ])
-    else:
-        df = pd.DataFrame(columns=['habit_id', 'date', 'value', 'habit_name'])
+    result = await db.execute(select(HabitLog).where(HabitLog.habit_id.in_(habit_ids)))
+    all_logs = result.scalars().all()
+    
+    # pandas and the streak calculators are CPU-bound: keep them off the event loop
+    dashboard = await run_in_threadpool(_build_dashboard, habits, all_logs, catalog.names())
+    return fast_json_response(DashboardAnalytics, dashboard)
+
+
+@timed_calculator("dashboard")
+def _build_dashboard(habits: list, all_logs: list, category_names: Dict[int, str]) -> DashboardAnalytics:
+    import pandas as pd
+    
+    # Convert to DataFrame for analysis (day keys, no per-row datetime conversion)
+    df = pd.DataFrame({
+        'habit_id': pd.Series([log.habit_id for log in all_logs], dtype='int64'),
+        'day': pd.Series([log.day for log in all_logs], dtype='int64'),
+        'value': pd.Series([bool(log.value) for log in all_logs], dtype='bool')
+    })
+    
+    # Group logs per habit once instead of scanning all logs for every habit
+    logs_by_habit: Dict[int, list] = {}
+    for log in all_logs:
+        logs_by_habit.setdefault(log.habit_id, []).append(log)
     
     # Calculate overall stats
     total_logs = len(df)
@@ -77,9 +92,9 @@ def get_dashboard_analytics(
     # Find best day (most habits completed)
     if not df.empty and total_completed > 0:
         completed_df = df[df['value'] == True]
-        daily_counts = completed_df.groupby('date').size()
+        daily_counts = completed_df.groupby('day').size()
         best_day_count = int(daily_counts.max())
-        best_day_date = daily_counts.idxmax().strftime('%Y-%m-%d')
+        best_day_date = from_day_key(daily_counts.idxmax()).strftime('%Y-%m-%d')
     else:
         best_day_count = 0
         best_day_date = None
@@ -89,7 +104,7 @@ def get_dashboard_analytics(
     habit_summaries = []
     
     for habit in habits:
-        habit_logs = [log for log in all_logs if log.habit_id == habit.id]
+        habit_logs = logs_by_habit.get(habit.id, [])
         
         # Calculate stats for this habit
         total_habit_logs = len(habit_logs)
@@ -113,41 +128,36 @@ def get_dashboard_analytics(
         ))
     
     # Generate combined heatmap for last 30 days
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=29)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
+    end_day = today_key()
+    start_day = end_day - 29
     
-    heatmap_data = []
-    for date in date_range:
-        date_obj = date.date()
-        
-        # Count how many habits were completed on this date
-        if not df.empty:
-            day_logs = df[df['date'] == date_obj]
-            completed_count = len(day_logs[day_logs['value'] == True])
-        else:
-            completed_count = 0
-        
-        heatmap_data.append(OverallHeatmapDataPoint(
-            date=date.strftime('%Y-%m-%d'),
-            completed_count=completed_count,
+    completed_per_day = (
+        df[df['value'] & (df['day'] >= start_day)].groupby('day').size()
+        if not df.empty else pd.Series(dtype='int64')
+    )
+    
+    heatmap_data = [
+        OverallHeatmapDataPoint(
+            date=from_day_key(day).strftime('%Y-%m-%d'),
+            completed_count=int(completed_per_day.get(day, 0)),
             total_habits=len(habits)
-        ))
+        )
+        for day in range(start_day, end_day + 1)
+    ]
     
     # Category breakdown
     category_breakdown: Dict[str, int] = {}
     
     for habit in habits:
         if habit.category_id:
-            category = db.query(Category).filter(Category.id == habit.category_id).first()
-            if category:
-                category_name = category.name
-                habit_logs = [log for log in all_logs if log.habit_id == habit.id and log.value]
-                category_breakdown[category_name] = category_breakdown.get(category_name, 0) + len(habit_logs)
+            category_name = category_names.get(habit.category_id)
+            if category_name:
+                completed = sum(1 for log in logs_by_habit.get(habit.id, []) if log.value)
+                category_breakdown[category_name] = category_breakdown.get(category_name, 0) + completed
     
     # Add "Uncategorized" for habits without category
     uncategorized_logs = sum(
-        len([log for log in all_logs if log.habit_id == h.id and log.value])
+        sum(1 for log in logs_by_habit.get(h.id, []) if log.value)
         for h in habits if not h.category_id
     )
     if uncategorized_logs > 0:
@@ -169,65 +179,62 @@ def get_dashboard_analytics(
     )
 
 
-@router.get("/{habit_id}/heatmap", response_model=HeatmapResponse)
-def get_habit_heatmap(
+@router.get("/{habit_id}/heatmap", response_model=HeatmapResponse, response_class=FastJSONResponse, dependencies=[Depends(query_budget(2))])
+async def get_habit_heatmap(
     habit_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     
     # Verify habit exists and belongs to user
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Habit).where(
+            Habit.id == habit_id,
+            Habit.user_id == current_user.id
+        )
+    )
+    habit = result.scalars().first()
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
     # Fetch all logs for this habit
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
-    
-    # Convert to DataFrame
-    if logs:
-        # Create DataFrame from logs
-        df = pd.DataFrame([
-            {
-                'date': log.date.date(),  # Convert datetime to date
-                'value': 1 if log.value else 0  # Convert boolean to int
-            }
-            for log in logs
-        ])
-        
-        # Set date as index for easier manipulation
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.set_index('date')
-    else:
-        # Create empty DataFrame with proper structure
-        df = pd.DataFrame(columns=['value'])
-        df.index = pd.DatetimeIndex([])
-        df.index.name = 'date'
+    result = await db.execute(select(HabitLog).where(HabitLog.habit_id == habit_id))
+    logs = result.scalars().all()
     
-    # Define date range: last 30 days from today
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=29)  # 30 days total (including today)
+    heatmap_data = await run_in_threadpool(_build_heatmap, logs)
+    
+    return fast_json_response(HeatmapResponse, HeatmapResponse(
+        habit_name=habit.name,
+        data=heatmap_data
+    ))
+
+
+@timed_calculator("heatmap")
+def _build_heatmap(logs: list) -> List[HeatmapDataPoint]:
+    import pandas as pd
     
-    # Create complete date range
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D')
+    # Completion per day key (a day counts as done if any of its logs is)
+    df = pd.DataFrame({
+        'day': pd.Series([log.day for log in logs], dtype='int64'),
+        'value': pd.Series([1 if log.value else 0 for log in logs], dtype='int64')
+    })
+    daily_values = df.groupby('day')['value'].max()
+    
+    # Define date range: last 30 days from today
+    end_day = today_key()
+    start_day = end_day - 29  # 30 days total (including today)
     
     # Reindex to fill missing dates with 0
-    df = df.reindex(date_range, fill_value=0)
+    daily_values = daily_values.reindex(range(start_day, end_day + 1), fill_value=0)
     
     # Format data for ApexCharts
     # ApexCharts expects: [{date: "YYYY-MM-DD", value: 0}, ...]
     heatmap_data = [
         HeatmapDataPoint(
-            date=date.strftime('%Y-%m-%d'),
-            value=int(df.loc[date, 'value']) if 'value' in df.columns else 0
+            date=from_day_key(day).strftime('%Y-%m-%d'),
+            value=int(value)
         )
-        for date in date_range
+        for day, value in daily_values.items()
     ]
     
-    return HeatmapResponse(
-        habit_name=habit.name,
-        data=heatmap_data
-    )
+    return heatmap_data
@@ -1,11 +1,27 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import User
-from schemas.auth_schemas import UserCreate, UserResponse, Token
-from utils.auth_utils import hash_password, verify_password, create_access_token, get_current_user
+from schemas.auth_schemas import UserCreate, UserResponse, Token, RefreshRequest
+from utils.auth_utils import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    create_access_token,
+    get_current_user
+)
+from utils.principal_cache import principal_cache, snapshot_user
+from utils.refresh_tokens import (
+    RefreshTokenError,
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token
+)
 
 router = APIRouter(
     prefix="/auth",
@@ -13,27 +29,41 @@ router = APIRouter(
 )
 
 
+async def _get_user_by(db: AsyncSession, column, value) -> Optional[User]:
+    result = await db.execute(select(User).where(column == value))
+    return result.scalars().first()
+
+
+def _token_response(user_id: int, username: str, refresh_token: str) -> dict:
+    # Access token carries the user id so requests are validated without a user lookup
+    access_token = create_access_token(data={"sub": username, "uid": user_id})
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
+    if await _get_user_by(db, User.username, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
+    if await _get_user_by(db, User.email, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user
-    hashed_pwd = hash_password(user_data.password)
+    hashed_pwd = await hash_password_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -41,31 +71,71 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     
     # Find user by username
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await _get_user_by(db, User.username, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": user.username})
+    # Transparently upgrade hashes created with a different work factor
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(form_data.password)
+        await db.commit()
+        await db.refresh(user)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    principal_cache.set(user.username, snapshot_user(user))
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    
+    return _token_response(user.id, user.username, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh pair (no password check)"""
+    try:
+        user_id, new_refresh_token = await rotate_refresh_token(db, request.refresh_token)
+    except RefreshTokenError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    username = await db.scalar(select(User.username).where(User.id == user_id))
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return _token_response(user_id, username, new_refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke the refresh token and every token rotated from the same login"""
+    await revoke_refresh_token(db, request.refresh_token)
+    return None
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Stateless principals only carry the token claims; load the profile columns
+    if inspect(current_user).unloaded:
+        await db.refresh(current_user)
     return current_user
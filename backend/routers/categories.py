@@ -1,13 +1,17 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-import pandas as pd
+from datetime import date
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy import case, distinct, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from dependencies import get_db
-from models import Category, Habit, HabitLog, User
-from schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryStats
+from models import Category, Habit, HabitLog, User, habit_response_loaders
+from schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryStats, HabitResponse
 from utils.auth_utils import get_current_user
+from utils.day_key import to_day_key
+from utils.category_catalog import CategoryCatalog, category_catalog, bump_catalog_version, get_category_catalog
+from utils.sql_instrumentation import query_budget
 
 router = APIRouter(
     prefix="/categories",
@@ -15,14 +19,82 @@ router = APIRouter(
 )
 
 
+async def _get_category(db: AsyncSession, category_id: int, raise_on_lazy: bool = True) -> Optional[Category]:
+    query = select(Category).where(Category.id == category_id)
+    if raise_on_lazy:
+        query = query.options(raiseload("*"))
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def _category_usage(
+    db: AsyncSession,
+    user_id: int,
+    category_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[int, dict]:
+    """
+    Habit count and completion rate per category for one user.
+    
+    A single grouped SUM/COUNT over habits and their logs; the date window
+    is applied in the join so habits without logs in it still count.
+    
+    Returns:
+        Dict of category_id -> {"habit_count", "completion_rate"}
+    """
+    log_join = HabitLog.habit_id == Habit.id
+    if start_date is not None:
+        log_join &= HabitLog.day >= to_day_key(start_date)
+    if end_date is not None:
+        log_join &= HabitLog.day <= to_day_key(end_date)
+    
+    query = (
+        select(
+            Habit.category_id,
+            func.count(distinct(Habit.id)).label("habit_count"),
+            func.count(HabitLog.id).label("total_logs"),
+            func.sum(case((HabitLog.value == True, 1), else_=0)).label("completed_logs")
+        )
+        .outerjoin(HabitLog, log_join)
+        .where(Habit.user_id == user_id, Habit.category_id.is_not(None))
+        .group_by(Habit.category_id)
+    )
+    if category_id is not None:
+        query = query.where(Habit.category_id == category_id)
+    
+    usage = {}
+    for row in await db.execute(query):
+        completion_rate = (row.completed_logs / row.total_logs) * 100 if row.total_logs else 0.0
+        usage[row.category_id] = {
+            "habit_count": row.habit_count,
+            "completion_rate": round(completion_rate, 2)
+        }
+    return usage
+
+
+def _category_stats(category: dict, usage: Optional[dict]) -> CategoryStats:
+    usage = usage or {"habit_count": 0, "completion_rate": 0.0}
+    return CategoryStats(
+        id=category["id"],
+        name=category["name"],
+        description=category["description"],
+        color=category["color"],
+        icon=category["icon"],
+        habit_count=usage["habit_count"],
+        completion_rate=usage["completion_rate"]
+    )
+
+
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category: CategoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Check if category name already exists
-    existing = db.query(Category).filter(Category.name == category.name).first()
+    result = await db.execute(select(Category.id).where(Category.name == category.name))
+    existing = result.first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,126 +109,106 @@ def create_category(
     )
     
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await bump_catalog_version(db)
+    await db.commit()
+    await db.refresh(db_category)
+    await category_catalog.reload(db)
     
     return db_category
 
 
-@router.get("", response_model=List[CategoryResponse])
-def list_categories(
-    db: Session = Depends(get_db),
+@router.get("", response_model=List[CategoryResponse], dependencies=[Depends(query_budget(2))])
+async def list_categories(
+    catalog: CategoryCatalog = Depends(get_category_catalog),
     current_user: User = Depends(get_current_user)
 ):
-    categories = db.query(Category).all()
-    return categories
+    return catalog.all()
 
 
-@router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(
+# Declared before /{category_id} so "stats" is not parsed as an id
+@router.get("/stats", response_model=List[CategoryStats], dependencies=[Depends(query_budget(3))])
+async def list_category_stats(
+    start_date: Optional[date] = Query(None, description="Only count logs on or after this day"),
+    end_date: Optional[date] = Query(None, description="Only count logs on or before this day"),
+    db: AsyncSession = Depends(get_db),
+    catalog: CategoryCatalog = Depends(get_category_catalog),
+    current_user: User = Depends(get_current_user)
+):
+    """Habit count and completion rate of every category for the current user"""
+    usage = await _category_usage(db, current_user.id, start_date=start_date, end_date=end_date)
+    return [_category_stats(category, usage.get(category["id"])) for category in catalog.all()]
+
+
+@router.get("/{category_id}", response_model=CategoryResponse, dependencies=[Depends(query_budget(2))])
+async def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    catalog: CategoryCatalog = Depends(get_category_catalog),
     current_user: User = Depends(get_current_user)
 ):
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = catalog.get(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 
-@router.get("/{category_id}/habits", response_model=List)
-def get_category_habits(
+@router.get("/{category_id}/habits", response_model=List[HabitResponse], dependencies=[Depends(query_budget(4))])
+async def get_category_habits(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    catalog: CategoryCatalog = Depends(get_category_catalog),
     current_user: User = Depends(get_current_user)
 ):
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
+    if not catalog.get(category_id):
         raise HTTPException(status_code=404, detail="Category not found")
     
-    habits = db.query(Habit).filter(
-        Habit.category_id == category_id,
-        Habit.user_id == current_user.id
-    ).all()
+    result = await db.execute(
+        select(Habit).options(*habit_response_loaders()).where(
+            Habit.category_id == category_id,
+            Habit.user_id == current_user.id
+        )
+    )
     
-    return habits
+    return result.scalars().all()
 
 
-@router.get("/{category_id}/stats", response_model=CategoryStats)
-def get_category_stats(
+@router.get("/{category_id}/stats", response_model=CategoryStats, dependencies=[Depends(query_budget(3))])
+async def get_category_stats(
     category_id: int,
-    db: Session = Depends(get_db),
+    start_date: Optional[date] = Query(None, description="Only count logs on or after this day"),
+    end_date: Optional[date] = Query(None, description="Only count logs on or before this day"),
+    db: AsyncSession = Depends(get_db),
+    catalog: CategoryCatalog = Depends(get_category_catalog),
     current_user: User = Depends(get_current_user)
 ):
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = catalog.get(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    # Get user's habits in this category
-    habits = db.query(Habit).filter(
-        Habit.category_id == category_id,
-        Habit.user_id == current_user.id
-    ).all()
-    
-    habit_count = len(habits)
-    
-    if habit_count == 0:
-        return CategoryStats(
-            id=category.id,
-            name=category.name,
-            description=category.description,
-            color=category.color,
-            icon=category.icon,
-            habit_count=0,
-            completion_rate=0.0
-        )
-    
-    # Get all logs for these habits
-    habit_ids = [h.id for h in habits]
-    logs = db.query(HabitLog).filter(HabitLog.habit_id.in_(habit_ids)).all()
-    
-    if not logs:
-        completion_rate = 0.0
-    else:
-        # Use Pandas to calculate completion rate
-        df = pd.DataFrame([
-            {'habit_id': log.habit_id, 'value': log.value}
-            for log in logs
-        ])
-        
-        total_logs = len(df)
-        completed_logs = len(df[df['value'] == True])
-        completion_rate = (completed_logs / total_logs) * 100 if total_logs > 0 else 0.0
-    
-    return CategoryStats(
-        id=category.id,
-        name=category.name,
-        description=category.description,
-        color=category.color,
-        icon=category.icon,
-        habit_count=habit_count,
-        completion_rate=round(completion_rate, 2)
-    )
+    usage = await _category_usage(db, current_user.id, category_id, start_date, end_date)
+    return _category_stats(category, usage.get(category_id))
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_id: int,
     category_update: CategoryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    db_category = await _get_category(db, category_id)
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Update fields if provided
     if category_update.name is not None:
         # Check for duplicate name
-        existing = db.query(Category).filter(
-            Category.name == category_update.name,
-            Category.id != category_id
-        ).first()
+        result = await db.execute(
+            select(Category.id).where(
+                Category.name == category_update.name,
+                Category.id != category_id
+            )
+        )
+        existing = result.first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -171,29 +223,34 @@ def update_category(
     if category_update.icon is not None:
         db_category.icon = category_update.icon
     
-    db.commit()
-    db.refresh(db_category)
+    await bump_catalog_version(db)
+    await db.commit()
+    await db.refresh(db_category)
+    await category_catalog.reload(db)
     
     return db_category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a category (sets habits' category_id to NULL)"""
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    # The flush loads the habits relationship to detach it
+    db_category = await _get_category(db, category_id, raise_on_lazy=False)
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Set category_id to NULL for all habits using this category
-    db.query(Habit).filter(Habit.category_id == category_id).update(
-        {Habit.category_id: None}
+    await db.execute(
+        update(Habit).where(Habit.category_id == category_id).values(category_id=None)
     )
     
-    db.delete(db_category)
-    db.commit()
+    await db.delete(db_category)
+    await bump_catalog_version(db)
+    await db.commit()
+    await category_catalog.reload(db)
     
     return None
@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import get_db
+from models import Habit, HabitLog, User
+from schemas import TodayLogsUpdate, TodayLogResult, TodayLogsResponse
+from utils.auth_utils import get_current_user
+from utils.day_key import to_day_key
+from utils.log_write_queue import log_write_queue, LOG_WRITE_MODE
+from utils.streak_calculator import calculate_current_streak
+
+router = APIRouter(
+    prefix="/logs",
+    tags=["habit-logs"]
+)
+
+
+def _current_streaks(completed_rows: Dict[int, List]) -> Dict[int, int]:
+    """Current streak per habit (pandas, run off the event loop)"""
+    return {habit_id: calculate_current_streak(rows) for habit_id, rows in completed_rows.items()}
+
+
+@router.post("/today", response_model=TodayLogsResponse)
+async def set_today_logs(
+    payload: TodayLogsUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set today's completion for several habits in one transaction"""
+    log_date = payload.date or date.today()
+    day = to_day_key(log_date)
+    habit_ids = list(payload.values)
+
+    # Verify ownership of every habit with a single query
+    owned_ids = set(await db.scalars(
+        select(Habit.id).where(
+            Habit.id.in_(habit_ids),
+            Habit.user_id == current_user.id
+        )
+    ))
+    missing = sorted(set(habit_ids) - owned_ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Habits not found: {missing}")
+
+    # Upsert one log per habit for the day
+    existing_logs: Dict[int, HabitLog] = {}
+    for log in await db.scalars(
+        select(HabitLog).where(
+            HabitLog.habit_id.in_(habit_ids),
+            HabitLog.day == day
+        ).order_by(HabitLog.id)
+    ):
+        existing_logs.setdefault(log.habit_id, log)
+
+    day_logs: Dict[int, HabitLog] = {}
+    for habit_id, value in payload.values.items():
+        log = existing_logs.get(habit_id)
+        if log:
+            log.value = value
+        else:
+            log = HabitLog(
+                habit_id=habit_id,
+                date=datetime.combine(log_date, datetime.min.time()),
+                value=value
+            )
+            db.add(log)
+        day_logs[habit_id] = log
+
+    await db.flush()
+    log_ids = {habit_id: log.id for habit_id, log in day_logs.items()}
+    await db.commit()
+
+    # Current streaks for all toggled habits from one lightweight query
+    completed_rows: Dict[int, List] = {habit_id: [] for habit_id in habit_ids}
+    for row in await db.execute(
+        select(HabitLog.habit_id, HabitLog.day, HabitLog.value).where(
+            HabitLog.habit_id.in_(habit_ids),
+            HabitLog.value == True
+        )
+    ):
+        completed_rows[row.habit_id].append(row)
+    current_streaks = await run_in_threadpool(_current_streaks, completed_rows)
+
+    return TodayLogsResponse(
+        date=log_date,
+        results=[
+            TodayLogResult(
+                habit_id=habit_id,
+                log_id=log_ids[habit_id],
+                value=value,
+                current_streak=current_streaks[habit_id]
+            )
+            for habit_id, value in payload.values.items()
+        ]
+    )
+
+
+@router.get("/write-queue", response_model=dict)
+async def get_write_queue_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Throughput and batching counters of the log write-behind queue"""
+    return {"mode": LOG_WRITE_MODE, **log_write_queue.stats()}
@@ -1,12 +1,16 @@
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends, status, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import Goal, Habit, HabitLog, Achievement, User
 from schemas import GoalCreate, GoalUpdate, GoalResponse, GoalProgress, AchievementResponse
 from utils.auth_utils import get_current_user
+from utils.metrics import timed_calculator
+from utils.sql_instrumentation import query_budget
 from utils.goal_calculator import (
     calculate_goal_progress,
     check_goal_completion,
@@ -20,19 +24,46 @@ router = APIRouter(
 )
 
 
+async def _get_user_goal(db: AsyncSession, goal_id: int, user_id: int) -> Optional[Goal]:
+    result = await db.execute(
+        select(Goal).where(
+            Goal.id == goal_id,
+            Goal.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def _user_owns_habit(db: AsyncSession, habit_id: int, user_id: int) -> bool:
+    result = await db.execute(
+        select(Habit.id).where(
+            Habit.id == habit_id,
+            Habit.user_id == user_id
+        )
+    )
+    return result.first() is not None
+
+
+async def _get_habit_logs(db: AsyncSession, habit_id: int) -> List[HabitLog]:
+    result = await db.execute(select(HabitLog).where(HabitLog.habit_id == habit_id))
+    return list(result.scalars().all())
+
+
+@timed_calculator("goal_progress")
+def _evaluate_goal(goal: Goal, logs: List[HabitLog]) -> tuple:
+    """Progress, completion and remaining days (pandas, run off the event loop)"""
+    current_value, progress_percentage = calculate_goal_progress(goal, logs)
+    return current_value, progress_percentage, check_goal_completion(goal, logs), calculate_days_remaining(goal)
+
+
 @router.post("", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
-def create_goal(
+async def create_goal(
     goal: GoalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify habit exists and belongs to user
-    habit = db.query(Habit).filter(
-        Habit.id == goal.habit_id,
-        Habit.user_id == current_user.id
-    ).first()
-    
-    if not habit:
+    if not await _user_owns_habit(db, goal.habit_id, current_user.id):
         raise HTTPException(status_code=404, detail="Habit not found")
     
     db_goal = Goal(
@@ -47,39 +78,36 @@ def create_goal(
     )
     
     db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     
     return db_goal
 
 
-@router.get("", response_model=List[GoalResponse])
-def list_goals(
+@router.get("", response_model=List[GoalResponse], dependencies=[Depends(query_budget(1))])
+async def list_goals(
     active_only: bool = Query(False, description="Filter to only active (incomplete) goals"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all goals for current user"""
-    query = db.query(Goal).filter(Goal.user_id == current_user.id)
+    query = select(Goal).where(Goal.user_id == current_user.id)
     
     if active_only:
-        query = query.filter(Goal.completed == False)
+        query = query.where(Goal.completed == False)
     
-    goals = query.all()
-    return goals
+    result = await db.execute(query)
+    return result.scalars().all()
 
 
 @router.get("/{goal_id}", response_model=GoalResponse)
-def get_goal(
+async def get_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific goal"""
-    goal = db.query(Goal).filter(
-        Goal.id == goal_id,
-        Goal.user_id == current_user.id
-    ).first()
+    goal = await _get_user_goal(db, goal_id, current_user.id)
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
@@ -87,28 +115,25 @@ def get_goal(
     return goal
 
 
-@router.get("/{goal_id}/progress", response_model=GoalProgress)
-def get_goal_progress(
+@router.get("/{goal_id}/progress", response_model=GoalProgress, dependencies=[Depends(query_budget(2))])
+async def get_goal_progress(
     goal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed progress for a goal"""
-    goal = db.query(Goal).filter(
-        Goal.id == goal_id,
-        Goal.user_id == current_user.id
-    ).first()
+    goal = await _get_user_goal(db, goal_id, current_user.id)
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
     # Get habit logs
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == goal.habit_id).all()
+    logs = await _get_habit_logs(db, goal.habit_id)
     
     # Calculate progress
-    current_value, progress_percentage = calculate_goal_progress(goal, logs)
-    is_completed = check_goal_completion(goal, logs)
-    days_remaining = calculate_days_remaining(goal)
+    current_value, progress_percentage, is_completed, days_remaining = await run_in_threadpool(
+        _evaluate_goal, goal, logs
+    )
     
     return GoalProgress(
         goal=goal,
@@ -120,24 +145,21 @@ def get_goal_progress(
 
 
 @router.post("/{goal_id}/check", response_model=GoalResponse)
-def check_and_update_goal(
+async def check_and_update_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    goal = db.query(Goal).filter(
-        Goal.id == goal_id,
-        Goal.user_id == current_user.id
-    ).first()
+    goal = await _get_user_goal(db, goal_id, current_user.id)
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
     # Get habit logs
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == goal.habit_id).all()
+    logs = await _get_habit_logs(db, goal.habit_id)
     
     # Check completion
-    is_completed = check_goal_completion(goal, logs)
+    is_completed = await run_in_threadpool(check_goal_completion, goal, logs)
     
     # Update goal if newly completed
     if is_completed and not goal.completed:
@@ -153,23 +175,20 @@ def check_and_update_goal(
         )
         db.add(achievement)
         
-        db.commit()
-        db.refresh(goal)
+        await db.commit()
+        await db.refresh(goal)
     
     return goal
 
 
 @router.put("/{goal_id}", response_model=GoalResponse)
-def update_goal(
+async def update_goal(
     goal_id: int,
     goal_update: GoalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_goal = db.query(Goal).filter(
-        Goal.id == goal_id,
-        Goal.user_id == current_user.id
-    ).first()
+    db_goal = await _get_user_goal(db, goal_id, current_user.id)
     
     if not db_goal:
         raise HTTPException(status_code=404, detail="Goal not found")
@@ -184,46 +203,38 @@ def update_goal(
     if goal_update.end_date is not None:
         db_goal.end_date = goal_update.end_date
     
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     
     return db_goal
 
 
 @router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_goal(
+async def delete_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    goal = db.query(Goal).filter(
-        Goal.id == goal_id,
-        Goal.user_id == current_user.id
-    ).first()
+    goal = await _get_user_goal(db, goal_id, current_user.id)
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    db.delete(goal)
-    db.commit()
+    await db.delete(goal)
+    await db.commit()
     
     return None
 
 
 @router.get("/habit/{habit_id}/goals", response_model=List[GoalResponse])
-def get_habit_goals(
+async def get_habit_goals(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify habit belongs to user
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
-    
-    if not habit:
+    if not await _user_owns_habit(db, habit_id, current_user.id):
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    goals = db.query(Goal).filter(Goal.habit_id == habit_id).all()
-    return goals
+    result = await db.execute(select(Goal).where(Goal.habit_id == habit_id))
+    return result.scalars().all()
@@ -2,14 +2,20 @@
 Habit logs router - CRUD endpoints for habit logs
 """
 
+import asyncio
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import Habit, HabitLog, User
 from schemas import HabitLogCreate, HabitLogResponse
 from utils.auth_utils import get_current_user
+from utils.sql_instrumentation import query_budget
+from utils.day_key import to_day_key
+from utils.fast_json import FastJSONResponse, fast_json_response
+from utils.log_write_queue import log_write_queue, is_queued_mode, LOG_WRITE_ACK_TIMEOUT_SECONDS
 
 router = APIRouter(
     prefix="/habits/{habit_id}/logs",
@@ -17,82 +23,97 @@ router = APIRouter(
 )
 
 
+async def _user_owns_habit(db: AsyncSession, habit_id: int, user_id: int) -> bool:
+    result = await db.execute(
+        select(Habit.id).where(Habit.id == habit_id, Habit.user_id == user_id)
+    )
+    return result.first() is not None
+
+
 @router.post("", response_model=HabitLogResponse, status_code=201)
-def create_habit_log(
+async def create_habit_log(
     habit_id: int, 
     log: HabitLogCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Check if habit exists and belongs to user
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
-    if not habit:
+    if not await _user_owns_habit(db, habit_id, current_user.id):
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    # Check if log already exists for this date
-    existing_log = db.query(HabitLog).filter(
-        HabitLog.habit_id == habit_id,
-        HabitLog.date == log.date
-    ).first()
+    # Write-behind mode: group-commit through the single writer, ack after commit
+    if is_queued_mode():
+        future = log_write_queue.submit(habit_id, log.date, log.value, log.note)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), LOG_WRITE_ACK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Log write timed out, please retry")
+    
+    # Check if log already exists for this day (regardless of time of day)
+    result = await db.execute(
+        select(HabitLog).where(
+            HabitLog.habit_id == habit_id,
+            HabitLog.day == to_day_key(log.date)
+        )
+    )
+    existing_log = result.scalars().first()
     
     if existing_log:
         # Update existing log
         existing_log.value = log.value
-        db.commit()
-        db.refresh(existing_log)
+        if log.note is not None:
+            existing_log.note = log.note
+        await db.commit()
+        await db.refresh(existing_log)
         return existing_log
     
     # Create new log
-    db_log = HabitLog(habit_id=habit_id, date=log.date, value=log.value)
+    db_log = HabitLog(habit_id=habit_id, date=log.date, value=log.value, note=log.note)
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    await db.commit()
+    await db.refresh(db_log)
     return db_log
 
 
-@router.get("", response_model=List[HabitLogResponse])
-def list_habit_logs(
+@router.get("", response_model=List[HabitLogResponse], response_class=FastJSONResponse, dependencies=[Depends(query_budget(2))])
+async def list_habit_logs(
     habit_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
-    if not habit:
+    if not await _user_owns_habit(db, habit_id, current_user.id):
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
-    return logs
+    # Can be years of logs: plain rows instead of ORM objects, serialized straight to JSON bytes
+    result = await db.execute(
+        select(HabitLog.id, HabitLog.habit_id, HabitLog.date, HabitLog.value, HabitLog.note)
+        .where(HabitLog.habit_id == habit_id)
+    )
+    return fast_json_response(List[HabitLogResponse], result.mappings().all())
 
 
 @router.delete("/{log_id}", status_code=204)
-def delete_habit_log(
+async def delete_habit_log(
     habit_id: int, 
     log_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify habit ownership
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
-    if not habit:
+    if not await _user_owns_habit(db, habit_id, current_user.id):
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    db_log = db.query(HabitLog).filter(
-        HabitLog.id == log_id,
-        HabitLog.habit_id == habit_id
-    ).first()
+    result = await db.execute(
+        select(HabitLog).where(
+            HabitLog.id == log_id,
+            HabitLog.habit_id == habit_id
+        )
+    )
+    db_log = result.scalars().first()
     
     if not db_log:
         raise HTTPException(status_code=404, detail="Log not found")
     
-    db.delete(db_log)
-    db.commit()
+    await db.delete(db_log)
+    await db.commit()
     return None
@@ -1,11 +1,15 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
-from models import Habit, User, Tag
+from models import Habit, User, Tag, habit_tags, habit_response_loaders
 from schemas import HabitCreate, HabitUpdate, HabitResponse
 from utils.auth_utils import get_current_user
+from utils.fast_json import FastJSONResponse, fast_json_response
+from utils.sql_instrumentation import query_budget
+from utils.tag_counts import habits_with_tags, refresh_tag_counts
 
 router = APIRouter(
     prefix="/habits",
@@ -13,10 +17,27 @@ router = APIRouter(
 )
 
 
+async def _get_user_habit(db: AsyncSession, habit_id: int, user_id: int) -> Optional[Habit]:
+    """Load a habit owned by the user with the relationships HabitResponse needs"""
+    result = await db.execute(
+        select(Habit)
+        .options(*habit_response_loaders())
+        .where(Habit.id == habit_id, Habit.user_id == user_id)
+    )
+    return result.scalars().first()
+
+
+async def _get_user_tags(db: AsyncSession, tag_ids: List[int], user_id: int) -> List[Tag]:
+    result = await db.execute(
+        select(Tag).where(Tag.id.in_(tag_ids), Tag.user_id == user_id)
+    )
+    return list(result.scalars().all())
+
+
 @router.post("", response_model=HabitResponse, status_code=201)
-def create_habit(
+async def create_habit(
     habit: HabitCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     db_habit = Habit(
@@ -27,66 +48,62 @@ def create_habit(
     )
     
     # Add tags if provided
-    if habit.tag_ids:
-        tags = db.query(Tag).filter(
-            Tag.id.in_(habit.tag_ids),
-            Tag.user_id == current_user.id
-        ).all()
-        db_habit.tags = tags
+    db_habit.tags = await _get_user_tags(db, habit.tag_ids, current_user.id) if habit.tag_ids else []
     
     db.add(db_habit)
-    db.commit()
-    db.refresh(db_habit)
-    return db_habit
+    await refresh_tag_counts(db, [tag.id for tag in db_habit.tags])
+    await db.commit()
+    return await _get_user_habit(db, db_habit.id, current_user.id)
 
 
-@router.get("", response_model=List[HabitResponse])
-def list_habits(
+@router.get("", response_model=List[HabitResponse], response_class=FastJSONResponse, dependencies=[Depends(query_budget(2))])
+async def list_habits(
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     tag_id: Optional[int] = Query(None, description="Filter by tag ID"),
-    db: Session = Depends(get_db),
+    tag_ids: Optional[List[int]] = Query(None, description="Filter by several tag IDs"),
+    tag_match: Literal["any", "all"] = Query("any", description="Match any or all of tag_ids"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Habit).filter(Habit.user_id == current_user.id)
+    query = (
+        select(Habit)
+        .options(*habit_response_loaders())
+        .where(Habit.user_id == current_user.id)
+    )
     
     # Filter by category if provided
     if category_id is not None:
-        query = query.filter(Habit.category_id == category_id)
+        query = query.where(Habit.category_id == category_id)
     
-    # Filter by tag if provided
-    if tag_id is not None:
-        query = query.join(Habit.tags).filter(Tag.id == tag_id)
+    # Filter by tags if provided (grouped over habit_tags, no duplicate rows)
+    filter_tag_ids = (tag_ids or []) + ([tag_id] if tag_id is not None else [])
+    if filter_tag_ids:
+        query = query.where(Habit.id.in_(habits_with_tags(filter_tag_ids, tag_match)))
     
-    habits = query.all()
-    return habits
+    result = await db.execute(query)
+    return fast_json_response(List[HabitResponse], result.scalars().all())
 
 
-@router.get("/{habit_id}", response_model=HabitResponse)
-def get_habit(
+@router.get("/{habit_id}", response_model=HabitResponse, dependencies=[Depends(query_budget(2))])
+async def get_habit(
     habit_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    habit = await _get_user_habit(db, habit_id, current_user.id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     return habit
 
 
 @router.put("/{habit_id}", response_model=HabitResponse)
-def update_habit(
+async def update_habit(
     habit_id: int, 
     habit_update: HabitUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    db_habit = await _get_user_habit(db, habit_id, current_user.id)
     if not db_habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
@@ -100,30 +117,32 @@ def update_habit(
     
     # Update tags if provided
     if habit_update.tag_ids is not None:
-        tags = db.query(Tag).filter(
-            Tag.id.in_(habit_update.tag_ids),
-            Tag.user_id == current_user.id
-        ).all()
-        db_habit.tags = tags
+        changed_tag_ids = {tag.id for tag in db_habit.tags}
+        db_habit.tags = await _get_user_tags(db, habit_update.tag_ids, current_user.id)
+        changed_tag_ids.symmetric_difference_update(tag.id for tag in db_habit.tags)
+        await refresh_tag_counts(db, changed_tag_ids)
     
-    db.commit()
-    db.refresh(db_habit)
-    return db_habit
+    await db.commit()
+    # Re-select so the (possibly changed) category is loaded eagerly
+    db.expire(db_habit)
+    return await _get_user_habit(db, habit_id, current_user.id)
 
 
 @router.delete("/{habit_id}", status_code=204)
-def delete_habit(
+async def delete_habit(
     habit_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Habit).where(Habit.id == habit_id, Habit.user_id == current_user.id)
+    )
+    db_habit = result.scalars().first()
     if not db_habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    db.delete(db_habit)
-    db.commit()
+    tag_ids = list(await db.scalars(select(habit_tags.c.tag_id).where(habit_tags.c.habit_id == habit_id)))
+    await db.delete(db_habit)
+    await refresh_tag_counts(db, tag_ids)
+    await db.commit()
     return None
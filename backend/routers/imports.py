@@ -0,0 +1,50 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, File, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models import User
+from schemas import ImportSummary
+from utils.auth_utils import get_current_user
+from utils.log_importer import import_logs, IMPORT_BATCH_SIZE
+
+router = APIRouter(
+    prefix="/import",
+    tags=["import"]
+)
+
+
+def _detect_format(file: UploadFile, requested: Optional[str]) -> str:
+    """Resolve the upload format from the query parameter or the file name"""
+    if requested:
+        return requested
+    
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    
+    raise HTTPException(
+        status_code=400,
+        detail="Could not detect file format, pass format=csv or format=ndjson"
+    )
+
+
+@router.post("/logs", response_model=ImportSummary)
+async def import_habit_logs(
+    file: UploadFile = File(..., description="CSV or NDJSON with habit, date, value[, note, goal]"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Upload format"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000, description="Rows per transaction"),
+    current_user: User = Depends(get_current_user)
+):
+    """Bulk import logs, matching or creating habits by name"""
+    file_format = _detect_format(file, format)
+    
+    # The importer streams the upload with blocking reads and commits per
+    # batch, so it runs on a worker thread with its own sync session
+    def run_import():
+        with SessionLocal() as db:
+            return import_logs(db, current_user.id, file.file, file_format, batch_size)
+    
+    return await run_in_threadpool(run_import)
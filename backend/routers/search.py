@@ -0,0 +1,47 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import get_db
+from models import User
+from schemas import SearchResults
+from utils.auth_utils import get_current_user
+from utils.search import build_match_query, search_supported, search_user_content
+from utils.sql_instrumentation import query_budget
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"]
+)
+
+
+@router.get("", response_model=SearchResults, dependencies=[Depends(query_budget(1))])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for"),
+    type: Optional[Literal["habit", "log"]] = Query(None, description="Only search habits or log notes"),
+    limit: int = Query(20, ge=1, le=100, description="Results per page"),
+    offset: int = Query(0, ge=0, description="Results to skip"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search over the current user's habit names, goals and log notes"""
+    if not search_supported(db):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Search is only available on SQLite databases"
+        )
+
+    match = build_match_query(q)
+    if match is None:
+        return SearchResults(query=q, results=[], limit=limit, offset=offset, has_more=False)
+
+    # One extra row tells whether another page exists without a COUNT query
+    hits = await search_user_content(db, current_user.id, match, type, limit + 1, offset)
+
+    return SearchResults(
+        query=q,
+        results=hits[:limit],
+        limit=limit,
+        offset=offset,
+        has_more=len(hits) > limit
+    )
@@ -1,17 +1,22 @@
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import Habit, HabitLog, Streak, User
 from schemas import StreakResponse, StreakStats, StreakHistory
 from utils.auth_utils import get_current_user
+from utils.day_key import to_day_key
+from utils.sql_instrumentation import query_budget
 from utils.streak_calculator import (
     calculate_current_streak,
     calculate_longest_streak,
     get_streak_history,
     calculate_streak_statistics
 )
+from utils.streak_store import rebuild_habit_streaks
 
 router = APIRouter(
     prefix="/streaks",
@@ -19,25 +24,37 @@ router = APIRouter(
 )
 
 
-@router.get("/{habit_id}", response_model=StreakStats)
-def get_streak_stats(
+async def _get_user_habit(db: AsyncSession, habit_id: int, user_id: int):
+    result = await db.execute(
+        select(Habit).where(
+            Habit.id == habit_id,
+            Habit.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def _get_habit_logs(db: AsyncSession, habit_id: int) -> List[HabitLog]:
+    result = await db.execute(select(HabitLog).where(HabitLog.habit_id == habit_id))
+    return list(result.scalars().all())
+
+
+@router.get("/{habit_id}", response_model=StreakStats, dependencies=[Depends(query_budget(2))])
+async def get_streak_stats(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    habit = await _get_user_habit(db, habit_id, current_user.id)
     
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
     # Get all logs for this habit
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
+    logs = await _get_habit_logs(db, habit_id)
     
     # Calculate statistics using Pandas
-    stats = calculate_streak_statistics(logs)
+    stats = await run_in_threadpool(calculate_streak_statistics, logs)
     
     return StreakStats(
         habit_id=habit_id,
@@ -48,30 +65,29 @@ def get_streak_stats(
     )
 
 
-@router.get("/{habit_id}/history", response_model=StreakHistory)
-def get_streak_history_endpoint(
+@router.get("/{habit_id}/history", response_model=StreakHistory, dependencies=[Depends(query_budget(5))])
+async def get_streak_history_endpoint(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    habit = await _get_user_habit(db, habit_id, current_user.id)
     
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
+    logs = await _get_habit_logs(db, habit_id)
     
-    history = get_streak_history(logs)
+    history = await run_in_threadpool(get_streak_history, logs)
     
-    streak_responses = []
-    for idx, (start_date, end_date, length) in enumerate(history):
-        db_streak = db.query(Streak).filter(
-            Streak.habit_id == habit_id,
-            Streak.start_date == start_date
-        ).first()
+    # Stored streaks of the habit, matched by start day (stored values are
+    # datetimes, the calculator returns dates)
+    result = await db.execute(select(Streak).where(Streak.habit_id == habit_id))
+    stored_streaks = {to_day_key(streak.start_date): streak for streak in result.scalars()}
+    
+    db_streaks = []
+    for start_date, end_date, length in history:
+        db_streak = stored_streaks.get(to_day_key(start_date))
         
         if not db_streak:
             # Create new streak record
@@ -88,19 +104,26 @@ def get_streak_history_endpoint(
             db_streak.end_date = end_date
             db_streak.length = length
             db_streak.is_current = (end_date is None)
-        
-        streak_responses.append(StreakResponse(
-            id=db_streak.id if db_streak.id else idx,
+        db_streaks.append(db_streak)
+    
+    # Assign ids and timestamps to the new records
+    await db.flush()
+    
+    streak_responses = [
+        StreakResponse(
+            id=db_streak.id,
             habit_id=habit_id,
             start_date=start_date,
             end_date=end_date,
             length=length,
             is_current=(end_date is None),
-            created_at=db_streak.created_at if db_streak.created_at else start_date,
-            updated_at=db_streak.updated_at if db_streak.updated_at else start_date
-        ))
+            created_at=db_streak.created_at,
+            updated_at=db_streak.updated_at
+        )
+        for db_streak, (start_date, end_date, length) in zip(db_streaks, history)
+    ]
     
-    db.commit()
+    await db.commit()
     
     return StreakHistory(
         habit_id=habit_id,
@@ -109,25 +132,22 @@ def get_streak_history_endpoint(
     )
 
 
-@router.get("/{habit_id}/current", response_model=dict)
-def get_current_streak(
+@router.get("/{habit_id}/current", response_model=dict, dependencies=[Depends(query_budget(2))])
+async def get_current_streak(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    habit = await _get_user_habit(db, habit_id, current_user.id)
     
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
     # Get all logs
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
+    logs = await _get_habit_logs(db, habit_id)
     
     # Calculate current streak
-    current = calculate_current_streak(logs)
+    current = await run_in_threadpool(calculate_current_streak, logs)
     
     return {
         "habit_id": habit_id,
@@ -138,43 +158,23 @@ def get_current_streak(
 
 
 @router.post("/{habit_id}/recalculate", response_model=dict)
-def recalculate_streaks(
+async def recalculate_streaks(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify habit exists and belongs to user
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id,
-        Habit.user_id == current_user.id
-    ).first()
+    habit = await _get_user_habit(db, habit_id, current_user.id)
     
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     
-    # Delete existing streak records
-    db.query(Streak).filter(Streak.habit_id == habit_id).delete()
-    
-    # Get all logs
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
-    
-    # Calculate streak history
-    history = get_streak_history(logs)
-    
-    # Create new streak records
-    for start_date, end_date, length in history:
-        db_streak = Streak(
-            habit_id=habit_id,
-            start_date=start_date,
-            end_date=end_date,
-            length=length,
-            is_current=(end_date is None)
-        )
-        db.add(db_streak)
+    # Rebuild streak records from the habit's logs (shared with the importer)
+    total_streaks = await db.run_sync(rebuild_habit_streaks, habit_id)
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Streaks recalculated successfully",
-        "total_streaks": len(history)
+        "total_streaks": total_streaks
     }
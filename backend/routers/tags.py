@@ -1,12 +1,15 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from dependencies import get_db
-from models import Tag, Habit, User
-from schemas import TagCreate, TagResponse, TagWithCount
+from models import Tag, Habit, User, habit_response_loaders
+from schemas import TagCreate, TagResponse, TagWithCount, HabitResponse
 from utils.auth_utils import get_current_user
+from utils.sql_instrumentation import query_budget
+from utils.tag_counts import TAG_COUNTS_DENORMALIZED, tag_usage_counts
 
 router = APIRouter(
     prefix="/tags",
@@ -14,18 +17,32 @@ router = APIRouter(
 )
 
 
+async def _get_user_tag(db: AsyncSession, tag_id: int, user_id: int, raise_on_lazy: bool = True) -> Optional[Tag]:
+    query = select(Tag).where(
+        Tag.id == tag_id,
+        Tag.user_id == user_id
+    )
+    if raise_on_lazy:
+        query = query.options(raiseload("*"))
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
 @router.post("", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
-def create_tag(
+async def create_tag(
     tag: TagCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new tag for current user"""
     # Check if user already has a tag with this name
-    existing = db.query(Tag).filter(
-        Tag.name == tag.name,
-        Tag.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Tag.id).where(
+            Tag.name == tag.name,
+            Tag.user_id == current_user.id
+        )
+    )
+    existing = result.first()
     
     if existing:
         raise HTTPException(
@@ -39,58 +56,58 @@ def create_tag(
     )
     
     db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
+    await db.commit()
+    await db.refresh(db_tag)
     
     return db_tag
 
 
-@router.get("", response_model=List[TagResponse])
-def list_tags(
-    db: Session = Depends(get_db),
+@router.get("", response_model=List[TagResponse], dependencies=[Depends(query_budget(1))])
+async def list_tags(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all tags for current user"""
-    tags = db.query(Tag).filter(Tag.user_id == current_user.id).all()
-    return tags
+    result = await db.execute(
+        select(Tag).options(raiseload("*")).where(Tag.user_id == current_user.id)
+    )
+    return result.scalars().all()
 
 
-@router.get("/with-counts", response_model=List[TagWithCount])
-def list_tags_with_counts(
-    db: Session = Depends(get_db),
+@router.get("/with-counts", response_model=List[TagWithCount], dependencies=[Depends(query_budget(1))])
+async def list_tags_with_counts(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all tags with usage counts"""
-    tags = db.query(Tag).filter(Tag.user_id == current_user.id).all()
-    
-    result = []
-    for tag in tags:
-        # Count habits using this tag
-        habit_count = db.query(Habit).join(Habit.tags).filter(
-            Tag.id == tag.id,
-            Habit.user_id == current_user.id
-        ).count()
-        
-        result.append(TagWithCount(
-            id=tag.id,
-            name=tag.name,
-            habit_count=habit_count
-        ))
+    # Maintained counter: cost does not depend on how many habits use the tags
+    if TAG_COUNTS_DENORMALIZED:
+        result = await db.execute(
+            select(Tag.id, Tag.name, Tag.habit_count).where(Tag.user_id == current_user.id)
+        )
+    else:
+        # Count habits per tag with one GROUP BY instead of a query per tag
+        counts = tag_usage_counts().subquery()
+        result = await db.execute(
+            select(Tag.id, Tag.name, func.coalesce(counts.c.habit_count, 0).label("habit_count"))
+            .outerjoin(counts, counts.c.tag_id == Tag.id)
+            .where(Tag.user_id == current_user.id)
+        )
     
-    return result
+    return [
+        TagWithCount(id=row.id, name=row.name, habit_count=row.habit_count)
+        for row in result
+    ]
 
 
-@router.get("/{tag_id}", response_model=TagResponse)
-def get_tag(
+@router.get("/{tag_id}", response_model=TagResponse, dependencies=[Depends(query_budget(1))])
+async def get_tag(
     tag_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific tag"""
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.user_id == current_user.id
-    ).first()
+    tag = await _get_user_tag(db, tag_id, current_user.id)
     
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
@@ -98,46 +115,43 @@ def get_tag(
     return tag
 
 
-@router.get("/{tag_id}/habits", response_model=List)
-def get_tag_habits(
+@router.get("/{tag_id}/habits", response_model=List[HabitResponse], dependencies=[Depends(query_budget(3))])
+async def get_tag_habits(
     tag_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all habits with this tag"""
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.user_id == current_user.id
-    ).first()
+    tag = await _get_user_tag(db, tag_id, current_user.id)
     
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
     # Get habits with this tag
-    habits = db.query(Habit).join(Habit.tags).filter(
-        Tag.id == tag_id,
-        Habit.user_id == current_user.id
-    ).all()
+    result = await db.execute(
+        select(Habit).options(*habit_response_loaders()).join(Habit.tags).where(
+            Tag.id == tag_id,
+            Habit.user_id == current_user.id
+        )
+    )
     
-    return habits
+    return result.scalars().all()
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tag(
+async def delete_tag(
     tag_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a tag (removes from all habits)"""
-    tag = db.query(Tag).filter(
-        Tag.id == tag_id,
-        Tag.user_id == current_user.id
-    ).first()
+    # The flush loads the habits collection to delete the association rows
+    tag = await _get_user_tag(db, tag_id, current_user.id, raise_on_lazy=False)
     
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
-    db.delete(tag)
-    db.commit()
+    await db.delete(tag)
+    await db.commit()
     
     return None
\ No newline at end of file
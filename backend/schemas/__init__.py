@@ -1,5 +1,5 @@
 from schemas.habit import HabitCreate, HabitUpdate, HabitResponse, CategoryBasic, TagBasic
-from schemas.habit_log import HabitLogCreate, HabitLogResponse
+from schemas.habit_log import HabitLogCreate, HabitLogResponse, TodayLogsUpdate, TodayLogResult, TodayLogsResponse
 from schemas.analytics import (
     HeatmapDataPoint, 
     HeatmapResponse, 
@@ -12,6 +12,8 @@ from schemas.category_schemas import CategoryCreate, CategoryUpdate, CategoryRes
 from schemas.tag_schemas import TagCreate, TagResponse, TagWithCount
 from schemas.goal_schemas import GoalCreate, GoalUpdate, GoalResponse, GoalProgress, AchievementResponse
 from schemas.streak_schemas import StreakResponse, StreakStats, StreakHistory
+from schemas.import_schemas import ImportSummary, ImportBatchProgress, ImportRowErrorResponse
+from schemas.search_schemas import SearchHit, SearchResults
 
 __all__ = [
     # Habit schemas
@@ -23,6 +25,9 @@ __all__ = [
     # Habit log schemas
     "HabitLogCreate",
     "HabitLogResponse",
+    "TodayLogsUpdate",
+    "TodayLogResult",
+    "TodayLogsResponse",
     # Analytics schemas
     "HeatmapDataPoint",
     "HeatmapResponse",
@@ -49,4 +54,11 @@ __all__ = [
     "StreakResponse",
     "StreakStats",
     "StreakHistory",
+    # Import schemas
+    "ImportSummary",
+    "ImportBatchProgress",
+    "ImportRowErrorResponse",
+    # Search schemas
+    "SearchHit",
+    "SearchResults",
 ]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
+from typing import Optional
 
 
 class UserCreate(BaseModel):
@@ -24,6 +25,13 @@ class Token(BaseModel):
     """Schema for JWT token response"""
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+
+
+class RefreshRequest(BaseModel):
+    """Schema for refresh token exchange and logout"""
+    refresh_token: str = Field(..., min_length=1)
 
 
 class LoginRequest(BaseModel):
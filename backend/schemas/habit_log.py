@@ -1,6 +1,6 @@
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime, date as date_type
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 
 class HabitLogCreate(BaseModel):
@@ -19,3 +19,23 @@ class HabitLogResponse(BaseModel):
     note: Optional[str] = None
     
     model_config = {"from_attributes": True}
+
+
+class TodayLogsUpdate(BaseModel):
+    """Schema for setting today's log of several habits at once"""
+    values: Dict[int, bool] = Field(..., min_length=1)  # habit_id -> completed
+    date: Optional[date_type] = None  # Defaults to the server's current date
+
+
+class TodayLogResult(BaseModel):
+    """Schema for a single habit in a batch toggle response"""
+    habit_id: int
+    log_id: int
+    value: bool
+    current_streak: int
+
+
+class TodayLogsResponse(BaseModel):
+    """Schema for batch toggle response"""
+    date: date_type
+    results: List[TodayLogResult]
@@ -0,0 +1,29 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class ImportRowErrorResponse(BaseModel):
+    """Schema for a rejected import row"""
+    line: int
+    message: str
+
+
+class ImportBatchProgress(BaseModel):
+    """Schema for progress after each committed batch"""
+    batch: int
+    rows_processed: int
+    logs_created: int
+    logs_updated: int
+
+
+class ImportSummary(BaseModel):
+    """Schema for bulk import result"""
+    rows_processed: int
+    habits_created: int
+    logs_created: int
+    logs_updated: int
+    batches_committed: int
+    streaks_rebuilt: int  # Habits whose streak records were re-materialized
+    error_count: int
+    errors: List[ImportRowErrorResponse]  # Capped list of rejected rows
+    progress: List[ImportBatchProgress]
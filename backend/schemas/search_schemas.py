@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    """Schema for a single search result"""
+    type: Literal["habit", "log"]
+    id: int  # Habit id or log id, depending on type
+    habit_id: int
+    habit_name: str
+    date: Optional[datetime] = None  # Log date (logs only)
+    snippet: str  # HTML-escaped matched text with terms wrapped in <mark></mark>
+    score: float  # bm25 relative to the best hit of the same type, 1.0 is best
+
+
+class SearchResults(BaseModel):
+    """Schema for a page of search results"""
+    query: str
+    results: List[SearchHit]
+    limit: int
+    offset: int
+    has_more: bool
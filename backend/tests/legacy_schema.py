@@ -0,0 +1,91 @@
+"""
+The original database schema, as created before any migration existed
+(no habit_logs.day, no hot foreign key indexes). Used to test upgrades.
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text
+
+legacy_metadata = MetaData()
+
+legacy_users = Table(
+    "users", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String, nullable=False, unique=True, index=True),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("hashed_password", String, nullable=False),
+    Column("created_at", DateTime),
+)
+legacy_categories = Table(
+    "categories", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, unique=True, index=True),
+    Column("description", String),
+    Column("color", String, nullable=False),
+    Column("icon", String),
+    Column("created_at", DateTime),
+)
+legacy_habits = Table(
+    "habits", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("goal", String, nullable=False),
+    Column("created_at", DateTime),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+)
+legacy_tags = Table(
+    "tags", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime),
+)
+legacy_habit_logs = Table(
+    "habit_logs", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("habit_id", Integer, ForeignKey("habits.id"), nullable=False),
+    Column("date", DateTime, nullable=False),
+    Column("value", Boolean),
+    Column("note", Text),
+)
+legacy_habit_tags = Table(
+    "habit_tags", legacy_metadata,
+    Column("habit_id", Integer, ForeignKey("habits.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+)
+legacy_goals = Table(
+    "goals", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("habit_id", Integer, ForeignKey("habits.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", String),
+    Column("goal_type", String(10), nullable=False),
+    Column("target_value", Integer, nullable=False),
+    Column("start_date", DateTime),
+    Column("end_date", DateTime),
+    Column("completed", Boolean),
+    Column("completed_at", DateTime),
+    Column("created_at", DateTime),
+)
+legacy_streaks = Table(
+    "streaks", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("habit_id", Integer, ForeignKey("habits.id", ondelete="CASCADE"), nullable=False),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime),
+    Column("length", Integer, nullable=False),
+    Column("is_current", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+legacy_achievements = Table(
+    "achievements", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("goal_id", Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", String),
+    Column("unlocked_at", DateTime),
+    Column("created_at", DateTime),
+)
@@ -0,0 +1,151 @@
+"""
+Authentication: tokens and the cached principal behind get_current_user
+"""
+
+import asyncio
+
+import bcrypt
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal
+from models import User
+from tests.conftest import PASSWORD, register_and_login
+from utils.auth_utils import BCRYPT_ROUNDS
+from utils.principal_cache import principal_cache, watch_principal_version
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_principal_served_from_cache(client):
+    tokens = register_and_login(client)
+    hits = principal_cache.hits
+    
+    for _ in range(3):
+        response = client.get("/auth/me", headers=bearer(tokens))
+        assert response.status_code == 200, response.text
+    assert principal_cache.hits == hits + 3
+    assert response.json()["email"].endswith("@example.com")
+
+
+def test_deleted_user_loses_access(client, bound_database):
+    tokens = register_and_login(client)
+    me = client.get("/auth/me", headers=bearer(tokens)).json()
+    
+    with Session(bound_database) as db:
+        db.delete(db.get(User, me["id"]))
+        db.commit()
+    
+    assert client.get("/auth/me", headers=bearer(tokens)).status_code == 401
+
+
+def test_renamed_user_invalidates_old_subject(client, bound_database):
+    tokens = register_and_login(client)
+    me = client.get("/auth/me", headers=bearer(tokens)).json()
+    
+    with Session(bound_database) as db:
+        db.get(User, me["id"]).username = f"renamed_{me['id']}"
+        db.commit()
+    
+    # The token's subject no longer names the user
+    assert principal_cache.get(me["username"]) is None
+    assert client.get("/auth/me", headers=bearer(tokens)).status_code == 401
+
+
+def test_login_rehashes_other_work_factors(client, bound_database):
+    old_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS + 1)).decode()
+    with Session(bound_database) as db:
+        db.add(User(username="old_cost", email="old_cost@example.com", hashed_password=old_hash))
+        db.commit()
+    
+    response = client.post("/auth/login", data={"username": "old_cost", "password": "wrong password"})
+    assert response.status_code == 401
+    response = client.post("/auth/login", data={"username": "old_cost", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    
+    with Session(bound_database) as db:
+        new_hash = db.query(User.hashed_password).filter(User.username == "old_cost").scalar()
+    assert new_hash.split("$")[2] == f"{BCRYPT_ROUNDS:02d}"
+    assert bcrypt.checkpw(PASSWORD.encode(), new_hash.encode())
+
+
+def test_refresh_token_rotation(client):
+    tokens = register_and_login(client)
+    assert client.get("/auth/me", headers=bearer(tokens)).status_code == 200
+    
+    # Refreshing rotates the token
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/auth/me", headers=bearer(rotated)).status_code == 200
+    
+    # Replaying the old token is rejected and revokes the whole family
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    response = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_refresh_token(client):
+    tokens = register_and_login(client)
+    
+    response = client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_deleted_user_cannot_refresh(client, bound_database):
+    tokens = register_and_login(client)
+    me = client.get("/auth/me", headers=bearer(tokens)).json()
+    
+    with Session(bound_database) as db:
+        db.delete(db.get(User, me["id"]))
+        db.commit()
+    
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_invalid_token(client):
+    assert client.get("/auth/me", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+
+
+def principals_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version FROM cache_versions WHERE name = 'principals'")).scalar_one()
+
+
+def test_user_changes_bump_principals_version(client, bound_database):
+    tokens = register_and_login(client)
+    me = client.get("/auth/me", headers=bearer(tokens)).json()
+    version = principals_version(bound_database)
+    
+    with Session(bound_database) as db:
+        db.get(User, me["id"]).email = "changed@example.com"
+        db.commit()
+    assert principals_version(bound_database) == version + 1
+
+
+def test_other_worker_change_clears_cache(client, bound_database):
+    tokens = register_and_login(client)
+    me = client.get("/auth/me", headers=bearer(tokens)).json()
+    principal_cache.sync_version(principals_version(bound_database))
+    
+    # Another worker renames the user: its own cache is invalidated, this one's is not
+    with bound_database.begin() as conn:
+        conn.execute(text("UPDATE users SET username = 'renamed' WHERE id = :id"), {"id": me["id"]})
+        conn.execute(text("UPDATE cache_versions SET version = version + 1 WHERE name = 'principals'"))
+    assert client.get("/auth/me", headers=bearer(tokens)).status_code == 200
+    
+    async def poll_briefly():
+        watcher = asyncio.create_task(watch_principal_version(AsyncSessionLocal, interval=0.01))
+        await asyncio.sleep(0.1)
+        watcher.cancel()
+    
+    client.portal.call(poll_briefly)
+    assert principal_cache.get(me["username"]) is None
+    assert client.get("/auth/me", headers=bearer(tokens)).status_code == 401
@@ -0,0 +1,97 @@
+"""
+Category reads served from the in-process catalog
+"""
+
+from sqlalchemy import select, text
+
+from models import Habit, HabitLog
+from tests.test_logs import log_days
+from utils.category_catalog import category_catalog
+
+
+def catalog_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version FROM cache_versions WHERE name = 'categories'")).scalar_one()
+
+
+def test_category_writes_bump_version(client, auth_headers, bound_database):
+    version = catalog_version(bound_database)
+    category = client.post("/categories", json={"name": "Health"}, headers=auth_headers).json()
+    assert catalog_version(bound_database) == version + 1
+    
+    response = client.put(f"/categories/{category['id']}", json={"name": "Fitness"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert catalog_version(bound_database) == version + 2
+    assert client.get(f"/categories/{category['id']}", headers=auth_headers).json()["name"] == "Fitness"
+    
+    assert client.delete(f"/categories/{category['id']}", headers=auth_headers).status_code == 204
+    assert catalog_version(bound_database) == version + 3
+    assert client.get(f"/categories/{category['id']}", headers=auth_headers).status_code == 404
+
+
+def test_stale_catalog_reloads_after_version_bump(client, auth_headers, bound_database, monkeypatch):
+    category = client.post("/categories", json={"name": "Health"}, headers=auth_headers).json()
+    url = f"/categories/{category['id']}"
+    # Check the version on every request instead of every few seconds
+    monkeypatch.setattr(category_catalog, "_check_seconds", 0)
+    reloads = category_catalog.reloads
+    
+    # Another worker renames the category: without a version bump the catalog keeps serving its snapshot
+    with bound_database.begin() as conn:
+        conn.execute(text("UPDATE categories SET name = 'Fitness' WHERE id = :id"), {"id": category["id"]})
+    assert client.get(url, headers=auth_headers).json()["name"] == "Health"
+    assert category_catalog.reloads == reloads
+    
+    with bound_database.begin() as conn:
+        conn.execute(text("UPDATE cache_versions SET version = version + 1 WHERE name = 'categories'"))
+    assert client.get(url, headers=auth_headers).json()["name"] == "Fitness"
+    assert category_catalog.reloads == reloads + 1
+
+
+def per_log_stats(engine, user_id: int, category_id: int) -> dict:
+    """Reference: the habits of the category and every one of their logs, counted in Python"""
+    with engine.connect() as conn:
+        habit_ids = conn.execute(
+            select(Habit.id).where(Habit.user_id == user_id, Habit.category_id == category_id)
+        ).scalars().all()
+        values = conn.execute(select(HabitLog.value).where(HabitLog.habit_id.in_(habit_ids))).scalars().all()
+    completion_rate = sum(1 for value in values if value) / len(values) * 100 if values else 0.0
+    return {"habit_count": len(habit_ids), "completion_rate": round(completion_rate, 2)}
+
+
+def test_grouped_stats_match_per_log_computation(client, auth_headers, bound_database):
+    user_id = client.get("/auth/me", headers=auth_headers).json()["id"]
+    health, learning, empty = (
+        client.post("/categories", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("Health", "Learning", "Empty")
+    )
+    habits = {}
+    for name, category_id in (("Run", health), ("Swim", health), ("Read", learning), ("Write", learning)):
+        response = client.post(
+            "/habits", json={"name": name, "goal": "Every day", "category_id": category_id}, headers=auth_headers
+        )
+        habits[name] = response.json()["id"]
+    log_days(client, auth_headers, habits["Run"], [(1, True), (2, False), (3, True)])
+    log_days(client, auth_headers, habits["Swim"], [(1, False), (2, False), (3, True)])
+    # Write has no logs: it still counts as a habit of Learning
+    log_days(client, auth_headers, habits["Read"], [(1, True), (2, True), (3, True), (4, False)])
+    
+    response = client.get("/categories/stats", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    listed = {stats["id"]: stats for stats in response.json()}
+    
+    for category_id in (health, learning, empty):
+        expected = per_log_stats(bound_database, user_id, category_id)
+        single = client.get(f"/categories/{category_id}/stats", headers=auth_headers).json()
+        for stats in (single, listed[category_id]):
+            assert {key: stats[key] for key in expected} == expected
+    assert listed[empty]["habit_count"] == 0 and listed[empty]["completion_rate"] == 0.0
+    assert listed[health]["completion_rate"] == 50.0
+    
+    # The date window only narrows the logs; habits without logs in it still count
+    response = client.get(
+        f"/categories/{health}/stats",
+        params={"start_date": "2024-03-03", "end_date": "2024-03-31"},
+        headers=auth_headers
+    )
+    assert (response.json()["habit_count"], response.json()["completion_rate"]) == (2, 100.0)
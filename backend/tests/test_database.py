@@ -0,0 +1,49 @@
+"""
+Engine configuration
+"""
+
+import pytest
+
+from database import create_db_engine, sqlite_pragmas
+
+
+def pragma(engine, name: str):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_production_profile_applies_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'production.db'}", "production")
+    try:
+        assert pragma(engine, "journal_mode") == "wal"
+        assert pragma(engine, "busy_timeout") == 5000
+        assert pragma(engine, "synchronous") == 1  # NORMAL
+    finally:
+        engine.dispose()
+
+
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'default.db'}", "default")
+    try:
+        assert pragma(engine, "journal_mode") == "delete"
+    finally:
+        engine.dispose()
+
+
+def test_pragma_overrides_and_unknown_profile(monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "10000")
+    assert sqlite_pragmas("production")["busy_timeout"] == "10000"
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fastest")
+
+
+def test_engine_for_database_url(database_url):
+    engine = create_db_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+            if engine.dialect.name == "postgresql":
+                assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "30s"
+        assert engine.pool._pre_ping is (engine.dialect.name != "sqlite")
+    finally:
+        engine.dispose()
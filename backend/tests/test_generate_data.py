@@ -0,0 +1,74 @@
+"""
+Bulk synthetic data generator
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from tests.conftest import register_and_login
+from utils.category_catalog import category_catalog
+from utils.tag_counts import tag_usage_counts
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SMALL_RUN = ["--users", "3", "--habits", "4", "--days", "30", "--end-date", "2024-03-31", "--note-rate", "0.3"]
+TABLES = ("users", "categories", "tags", "habits", "habit_tags", "goals", "habit_logs")
+
+
+def generate(database_url: str, *args) -> None:
+    subprocess.run(
+        [sys.executable, "generate_data.py", "--database-url", database_url, *SMALL_RUN, *args],
+        cwd=BACKEND_DIR, env=dict(os.environ, BCRYPT_ROUNDS="4"), capture_output=True, check=True
+    )
+
+
+def table_rows(database_url: str) -> dict:
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            rows = {table: conn.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2")).all() for table in TABLES}
+            # bcrypt salts differ from run to run
+            rows["users"] = conn.execute(text("SELECT id, username, email, created_at FROM users ORDER BY id")).all()
+    finally:
+        engine.dispose()
+    return rows
+
+
+def test_same_seed_same_data(tmp_path):
+    first, second = (f"sqlite:///{tmp_path / name}" for name in ("first.db", "second.db"))
+    generate(first)
+    generate(second)
+    
+    assert table_rows(first) == table_rows(second)
+    assert table_rows(first)["habit_logs"] != []
+
+
+def test_generated_data_served_by_api(client, bound_database, database_url, monkeypatch):
+    # The app is running (tables created, category catalog loaded) before the generator writes
+    generate(database_url)
+    
+    with bound_database.connect() as conn:
+        username = conn.execute(text("SELECT username FROM users ORDER BY id")).scalars().first()
+        grouped = dict(conn.execute(tag_usage_counts()).all())
+    response = client.post("/auth/login", data={"username": username, "password": "password123"})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    # Denormalized tag counts match habit_tags
+    tags = client.get("/tags/with-counts", headers=headers).json()
+    assert tags and all(tag["habit_count"] == grouped.get(tag["id"], 0) for tag in tags)
+    
+    # The categories version was bumped, so the running catalog reloads
+    monkeypatch.setattr(category_catalog, "_check_seconds", 0)
+    assert len(client.get("/categories", headers=headers).json()) > 0
+    
+    # New rows get ids past the generated ones (PostgreSQL sequences were moved)
+    new_user = register_and_login(client)
+    response = client.post(
+        "/habits", json={"name": "New", "goal": "Every day"},
+        headers={"Authorization": f"Bearer {new_user['access_token']}"}
+    )
+    assert response.status_code == 201, response.text
@@ -0,0 +1,23 @@
+"""
+Habits with their category and tags
+"""
+
+
+def test_habits_serialized_with_relations(client, auth_headers):
+    category = client.post("/categories", json={"name": "Health"}, headers=auth_headers).json()
+    tag = client.post("/tags", json={"name": "morning"}, headers=auth_headers).json()
+    response = client.post(
+        "/habits",
+        json={"name": "Run", "goal": "5 km", "category_id": category["id"], "tag_ids": [tag["id"]]},
+        headers=auth_headers
+    )
+    assert response.status_code == 201, response.text
+    habit = response.json()
+    
+    for url in ("/habits", f"/categories/{category['id']}/habits", f"/tags/{tag['id']}/habits"):
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        [listed] = response.json()
+        assert listed["id"] == habit["id"]
+        assert listed["category"]["name"] == "Health"
+        assert [t["name"] for t in listed["tags"]] == ["morning"]
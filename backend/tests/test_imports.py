@@ -0,0 +1,116 @@
+"""
+Bulk log import (POST /import/logs)
+"""
+
+import json
+
+from tests.conftest import register_and_login
+
+
+def upload(client, headers, name: str, content: str, **params):
+    return client.post(
+        "/import/logs",
+        params=params,
+        files={"file": (name, content.encode(), "application/octet-stream")},
+        headers=headers
+    )
+
+
+def habit_logs(client, headers) -> dict:
+    """Logs of every habit of the user, by habit name"""
+    habits = client.get("/habits", headers=headers).json()
+    return {
+        habit["name"]: client.get(f"/habits/{habit['id']}/logs", headers=headers).json()
+        for habit in habits
+    }
+
+
+def test_import_csv(client, auth_headers):
+    content = (
+        "habit,date,value,note,goal\n"
+        "Read,2024-03-01,yes,Chapter 1,20 pages\n"
+        "Read,2024-03-02,no,,\n"
+        "Run,2024-03-01,1,,5 km\n"
+    )
+    response = upload(client, auth_headers, "logs.csv", content)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["rows_processed"] == 3
+    assert summary["habits_created"] == 2
+    assert summary["logs_created"] == 3
+    assert summary["error_count"] == 0
+    assert summary["streaks_rebuilt"] == 2
+    
+    logs = habit_logs(client, auth_headers)
+    assert sorted(logs) == ["Read", "Run"]
+    assert sorted((log["value"], log["note"]) for log in logs["Read"]) == [(False, None), (True, "Chapter 1")]
+
+
+def test_import_ndjson_in_batches(client, auth_headers):
+    rows = [
+        {"habit": "Meditate", "date": f"2024-03-0{day}", "value": True, "note": f"day {day}"}
+        for day in range(1, 6)
+    ]
+    content = "\n".join(json.dumps(row) for row in rows) + "\n\n"
+    response = upload(client, auth_headers, "logs.ndjson", content, batch_size=2)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["logs_created"] == 5
+    assert summary["batches_committed"] == 3
+    assert [batch["rows_processed"] for batch in summary["progress"]] == [2, 4, 5]
+    assert len(habit_logs(client, auth_headers)["Meditate"]) == 5
+
+
+def test_import_reports_malformed_rows(client, auth_headers):
+    content = "\n".join([
+        json.dumps({"habit": "Read", "date": "2024-03-01", "value": True}),
+        json.dumps({"date": "2024-03-02", "value": True}),
+        json.dumps({"habit": "Read", "date": "yesterday", "value": True}),
+        json.dumps({"habit": "Read", "date": "2024-03-03", "value": "maybe"}),
+        "{not json",
+        json.dumps(["Read", "2024-03-04"]),
+    ])
+    response = upload(client, auth_headers, "logs.jsonl", content)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["rows_processed"] == 6
+    assert summary["logs_created"] == 1
+    assert summary["error_count"] == 5
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 4, 5, 6]
+    assert "Missing habit name" in summary["errors"][0]["message"]
+    
+    # Unknown format without a usable file name
+    response = upload(client, auth_headers, "logs.txt", content)
+    assert response.status_code == 400
+
+
+def test_import_upserts_duplicate_days(client, auth_headers):
+    content = (
+        "habit,date,value,note\n"
+        "Read,2024-03-01T08:00:00,yes,first\n"
+        "Read,2024-03-01T21:30:00,no,second\n"
+    )
+    summary = upload(client, auth_headers, "logs.csv", content).json()
+    assert (summary["logs_created"], summary["logs_updated"]) == (1, 0)
+    
+    # Any time of an already logged day updates that day's log
+    summary = upload(client, auth_headers, "logs.csv", "habit,date,value\nRead,2024-03-01T12:00:00,yes\n").json()
+    assert (summary["habits_created"], summary["logs_created"], summary["logs_updated"]) == (0, 0, 1)
+    
+    [log] = habit_logs(client, auth_headers)["Read"]
+    assert (log["value"], log["note"]) == (True, "second")
+
+
+def test_import_never_touches_other_users_habits(client, auth_headers):
+    other_headers = {"Authorization": f"Bearer {register_and_login(client)['access_token']}"}
+    response = client.post("/habits", json={"name": "Read", "goal": "Mine"}, headers=other_headers)
+    other_habit = response.json()
+    
+    # Habits are matched by name among the importer's own habits; ids are ignored
+    content = json.dumps({"habit": "Read", "habit_id": other_habit["id"], "date": "2024-03-01", "value": True})
+    summary = upload(client, auth_headers, "logs.ndjson", content).json()
+    assert (summary["habits_created"], summary["logs_created"]) == (1, 1)
+    
+    [own_habit] = client.get("/habits", headers=auth_headers).json()
+    assert own_habit["id"] != other_habit["id"]
+    assert client.get(f"/habits/{other_habit['id']}/logs", headers=other_headers).json() == []
@@ -0,0 +1,41 @@
+"""
+Load-test harness, run in-process with a tiny workload
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TINY_RUN = ["--users", "2", "--duration", "1", "--ramp-up", "0", "--habits", "1", "--history-days", "2"]
+
+
+def run_load_test(*args) -> tuple:
+    """Run load_test.py; returns its output and the SQLite file it used"""
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    result = subprocess.run(
+        [sys.executable, "load_test.py", *TINY_RUN, *args],
+        cwd=BACKEND_DIR, env=dict(env, BCRYPT_ROUNDS="4"), capture_output=True, text=True, check=True
+    )
+    database_path = Path(re.search(r"in-process app on sqlite:///(\S+)", result.stdout).group(1))
+    return result.stdout, database_path
+
+
+@pytest.mark.parametrize("keep_db", [False, True])
+def test_in_process_run(tmp_path, keep_db):
+    results = tmp_path / "results.json"
+    output, database_path = run_load_test("--json", str(results), *(["--keep-db"] if keep_db else []))
+    
+    endpoints = json.loads(results.read_text())["endpoints"]
+    assert endpoints and sum(row["errors"] for row in endpoints) == 0
+    assert "mean Server-Timing phases" in output
+    assert database_path.exists() == keep_db
+    if keep_db:
+        assert f"database kept in {database_path.parent}" in output
+        shutil.rmtree(database_path.parent)
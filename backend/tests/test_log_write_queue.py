@@ -0,0 +1,54 @@
+"""
+Write-behind queue for log upserts
+"""
+
+from concurrent.futures import wait
+from datetime import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from models import Habit, HabitLog, User
+from utils.log_write_queue import LogWriteQueue
+
+
+def test_idle_queue_stats(client, auth_headers):
+    response = client.get("/logs/write-queue", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert "commit_seconds" not in stats
+    assert (stats["batches"], stats["avg_batch_size"], stats["avg_commit_ms"]) == (0, 0.0, 0.0)
+
+
+def test_queue_group_commits_upserts(client, bound_database):
+    session_factory = sessionmaker(bind=bound_database)
+    with session_factory() as db:
+        user = User(username="writer", email="writer@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        habit = Habit(name="Read", goal="Every day", user_id=user.id)
+        db.add(habit)
+        db.commit()
+        habit_id = habit.id
+    
+    write_queue = LogWriteQueue(session_factory, batch_size=10, max_delay_ms=50)
+    try:
+        futures = [
+            write_queue.submit(habit_id, datetime(2024, 3, 1, hour), hour % 2 == 0, f"note {hour}")
+            for hour in range(8, 12)
+        ]
+        futures.append(write_queue.submit(habit_id, datetime(2024, 3, 2, 9), True))
+        wait(futures, timeout=10)
+        results = [future.result() for future in futures]
+    finally:
+        write_queue.stop(timeout=10)
+    
+    # Writes to the same day collapse into one log; the last one wins
+    assert len({result["id"] for result in results[:4]}) == 1
+    with session_factory() as db:
+        logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).order_by(HabitLog.date).all()
+        assert [(log.value, log.note) for log in logs] == [(False, "note 11"), (True, None)]
+    
+    stats = write_queue.stats()
+    assert stats["committed"] == 5
+    assert stats["batches"] <= 2
+    assert stats["avg_commit_ms"] > 0
@@ -0,0 +1,104 @@
+"""
+Habit logs and the streaks computed from them
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from models import Streak
+
+
+def create_habit(client, headers, name="Read") -> dict:
+    response = client.post("/habits", json={"name": name, "goal": "Every day"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def log_days(client, headers, habit_id: int, days) -> None:
+    """Log (day of March 2024, value) pairs at noon"""
+    for day, value in days:
+        response = client.post(
+            f"/habits/{habit_id}/logs",
+            json={"date": f"2024-03-{day:02d}T12:00:00", "value": value},
+            headers=headers
+        )
+        assert response.status_code == 201, response.text
+
+
+def test_log_upsert_by_day(client, auth_headers):
+    habit = create_habit(client, auth_headers)
+    logs_url = f"/habits/{habit['id']}/logs"
+    
+    # Same day at another time of day updates the existing log
+    first = client.post(logs_url, json={"date": "2024-03-01T08:00:00", "value": True}, headers=auth_headers)
+    assert first.status_code == 201, first.text
+    second = client.post(logs_url, json={"date": "2024-03-01T21:30:00", "value": False}, headers=auth_headers)
+    assert second.status_code == 201, second.text
+    assert second.json()["id"] == first.json()["id"]
+    
+    logs = client.get(logs_url, headers=auth_headers).json()
+    assert [(log["id"], log["value"]) for log in logs] == [(first.json()["id"], False)]
+
+
+def test_toggle_today(client, auth_headers):
+    read = create_habit(client, auth_headers, "Read")
+    run = create_habit(client, auth_headers, "Run")
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    client.post(f"/habits/{read['id']}/logs", json={"date": f"{yesterday}T09:00:00", "value": True}, headers=auth_headers)
+    client.post(f"/habits/{read['id']}/logs", json={"date": f"{today}T07:00:00", "value": False}, headers=auth_headers)
+    
+    response = client.post(
+        "/logs/today",
+        json={"values": {str(read["id"]): True, str(run["id"]): True}},
+        headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    results = {result["habit_id"]: result for result in response.json()["results"]}
+    assert results[read["id"]]["current_streak"] == 2
+    assert results[run["id"]]["current_streak"] == 1
+    
+    # Today's existing log was updated rather than duplicated
+    logs = client.get(f"/habits/{read['id']}/logs", headers=auth_headers).json()
+    assert len(logs) == 2
+    assert results[read["id"]]["log_id"] in {log["id"] for log in logs}
+    
+    # Toggling back off keeps the same log; yesterday's streak is still current
+    response = client.post("/logs/today", json={"values": {str(read["id"]): False}}, headers=auth_headers)
+    [result] = response.json()["results"]
+    assert (result["log_id"], result["value"], result["current_streak"]) == (results[read["id"]]["log_id"], False, 1)
+
+
+def test_toggle_today_rejects_foreign_habits(client, auth_headers):
+    response = client.post("/logs/today", json={"values": {"999": True}}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_streak_stats(client, auth_headers):
+    habit = create_habit(client, auth_headers)
+    log_days(client, auth_headers, habit["id"], [(1, True), (2, True), (3, False), (4, True), (5, True), (6, True)])
+    
+    response = client.get(f"/streaks/{habit['id']}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert (stats["longest_streak"], stats["total_streaks"]) == (3, 2)
+    assert stats["average_streak_length"] == 2.5
+
+
+def test_streak_history(client, auth_headers, bound_database):
+    habit = create_habit(client, auth_headers)
+    log_days(client, auth_headers, habit["id"], [(1, True), (2, True), (3, False), (4, True), (5, True), (6, True)])
+    
+    response = client.get(f"/streaks/{habit['id']}/history", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    streaks = response.json()["streaks"]
+    assert sorted(streak["length"] for streak in streaks) == [2, 3]
+    
+    # Asking again reuses the stored streaks instead of adding new rows
+    response = client.get(f"/streaks/{habit['id']}/history", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert [streak["id"] for streak in response.json()["streaks"]] == [streak["id"] for streak in streaks]
+    with bound_database.connect() as conn:
+        stored = conn.scalar(select(func.count()).select_from(Streak).where(Streak.habit_id == habit["id"]))
+    assert stored == 2
@@ -0,0 +1,46 @@
+"""
+Prometheus metrics on /metrics
+"""
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from tests.test_logs import create_habit, log_days
+
+
+def sample(client, name: str, **labels) -> float:
+    """Value of one sample in the current /metrics output (0 when absent)"""
+    response = client.get("/metrics")
+    assert response.status_code == 200, response.text
+    for family in text_string_to_metric_families(response.text):
+        for metric in family.samples:
+            if metric.name == name and all(metric.labels.get(key) == value for key, value in labels.items()):
+                return metric.value
+    return 0.0
+
+
+def test_requests_labelled_by_route_template(client, auth_headers):
+    habit = create_habit(client, auth_headers)
+    labels = {"method": "GET", "route": "/habits/{habit_id}", "status": "200"}
+    before = sample(client, "http_requests_total", **labels)
+    unmatched_before = sample(client, "http_requests_total", route="<unmatched>", status="404")
+    
+    for _ in range(2):
+        client.get(f"/habits/{habit['id']}", headers=auth_headers)
+    client.get("/no/such/path")
+    
+    assert sample(client, "http_requests_total", **labels) == before + 2
+    assert sample(client, "http_requests_total", route="<unmatched>", status="404") == unmatched_before + 1
+    assert sample(client, "http_request_duration_seconds_count", method="GET", route="/habits/{habit_id}") >= 2
+    assert sample(client, "http_request_db_queries_total", route="/habits/{habit_id}") > 0
+
+
+def test_cache_and_calculator_metrics(client, auth_headers):
+    habit = create_habit(client, auth_headers)
+    log_days(client, auth_headers, habit["id"], [(1, True), (2, True)])
+    hits = sample(client, "cache_requests_total", cache="principals", result="hit")
+    dashboards = sample(client, "calculator_duration_seconds_count", calculator="dashboard")
+    
+    assert client.get("/analytics/dashboard", headers=auth_headers).status_code == 200
+    
+    assert sample(client, "cache_requests_total", cache="principals", result="hit") == hits + 1
+    assert sample(client, "calculator_duration_seconds_count", calculator="dashboard") == dashboards + 1
@@ -0,0 +1,86 @@
+"""
+Upgrading a database created with the original schema
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from migrations import MIGRATIONS, applied_versions
+from tests.legacy_schema import legacy_habit_logs, legacy_habit_tags, legacy_habits, legacy_tags, legacy_users
+from utils.auth_utils import hash_password
+from utils.day_key import to_day_key
+
+LEGACY_PASSWORD = "legacypass"
+
+
+@pytest.fixture
+def legacy_data(legacy_database):
+    """A little data in the original schema"""
+    with legacy_database.begin() as conn:
+        conn.execute(legacy_users.insert(), [{
+            "id": 1, "username": "legacy", "email": "legacy@example.com",
+            "hashed_password": hash_password(LEGACY_PASSWORD), "created_at": datetime(2023, 1, 1),
+        }])
+        conn.execute(legacy_habits.insert(), [
+            {"id": 1, "name": "Read", "goal": "Every day", "user_id": 1, "created_at": datetime(2023, 1, 1)},
+            {"id": 2, "name": "Run", "goal": "Every day", "user_id": 1, "created_at": datetime(2023, 1, 1)},
+        ])
+        conn.execute(legacy_habit_logs.insert(), [
+            {"id": 1, "habit_id": 1, "date": datetime(2023, 1, 1, 8, 0), "value": True, "note": "Finished the novel"},
+            {"id": 2, "habit_id": 1, "date": datetime(2023, 1, 2, 23, 59), "value": True, "note": None},
+            {"id": 3, "habit_id": 2, "date": datetime(2023, 1, 2, 0, 0), "value": False, "note": None},
+        ])
+        conn.execute(legacy_tags.insert(), [
+            {"id": 1, "name": "morning", "user_id": 1, "created_at": datetime(2023, 1, 1)},
+            {"id": 2, "name": "outdoor", "user_id": 1, "created_at": datetime(2023, 1, 1)},
+            {"id": 3, "name": "unused", "user_id": 1, "created_at": datetime(2023, 1, 1)},
+        ])
+        conn.execute(legacy_habit_tags.insert(), [
+            {"habit_id": 1, "tag_id": 1},
+            {"habit_id": 2, "tag_id": 1},
+            {"habit_id": 2, "tag_id": 2},
+        ])
+    return legacy_database
+
+
+def test_upgrade_legacy_database(legacy_data, client):
+    # The app's lifespan ran init_db on the legacy database
+    assert applied_versions(legacy_data) == [version for version, _, _ in MIGRATIONS]
+    
+    with legacy_data.connect() as conn:
+        days = dict(conn.execute(text("SELECT id, day FROM habit_logs")).all())
+    assert days == {
+        1: to_day_key(datetime(2023, 1, 1)),
+        2: to_day_key(datetime(2023, 1, 2)),
+        3: to_day_key(datetime(2023, 1, 2)),
+    }
+    with legacy_data.connect() as conn:
+        tag_counts = dict(conn.execute(text("SELECT id, habit_count FROM tags")).all())
+    assert tag_counts == {1: 2, 2: 1, 3: 0}
+    with legacy_data.connect() as conn:
+        versions = dict(conn.execute(text("SELECT name, version FROM cache_versions")).all())
+    assert versions == {"categories": 0, "principals": 0}
+    
+    # The existing account and its data work through the API
+    response = client.post("/auth/login", data={"username": "legacy", "password": LEGACY_PASSWORD})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    response = client.get("/habits/1/logs", headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 2
+    
+    # A log at another time of a migrated day updates it
+    response = client.post("/habits/1/logs", json={"date": "2023-01-02T10:00:00", "value": False}, headers=headers)
+    assert response.status_code == 201, response.text
+    assert response.json()["id"] == 2
+    
+    # Existing habits and notes were indexed for search
+    if legacy_data.dialect.name == "sqlite":
+        response = client.get("/search", params={"q": "novel"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert [(hit["type"], hit["id"]) for hit in response.json()["results"]] == [("log", 1)]
+        response = client.get("/search", params={"q": "read"}, headers=headers)
+        assert [(hit["type"], hit["id"]) for hit in response.json()["results"]] == [("habit", 1)]
@@ -0,0 +1,86 @@
+"""
+On-demand request profiling
+"""
+
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database
+from database import init_db
+from routers import auth, habits
+from tests.conftest import register_and_login
+from tests.test_logs import create_habit
+from utils import profiling
+from utils.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, REQUEST_ID_HEADER, profiling_middleware
+
+TOKEN = "profile-me"
+
+
+@pytest.fixture
+def profiles_dir(tmp_path):
+    return tmp_path / "profiles"
+
+
+@pytest.fixture
+def profiled_client(bound_database, monkeypatch, profiles_dir):
+    """Client of an app with the profiling middleware installed, writing to profiles_dir"""
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(profiles_dir))
+    monkeypatch.setattr(profiling, "PROFILES_MAX_KEPT", 2)
+    init_db()
+    
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(habits.router)
+    app.middleware("http")(profiling_middleware)
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(database.async_engine.dispose)
+
+
+def test_profile_requested_by_header(profiled_client, profiles_dir):
+    headers = {"Authorization": f"Bearer {register_and_login(profiled_client)['access_token']}"}
+    habit = create_habit(profiled_client, headers)
+    
+    response = profiled_client.get(
+        f"/habits/{habit['id']}",
+        headers={**headers, PROFILE_HEADER: TOKEN, REQUEST_ID_HEADER: "req-1"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers[PROFILE_ID_HEADER] == "req-1"
+    
+    summary = json.loads((profiles_dir / "req-1.json").read_text())
+    assert (summary["trigger"], summary["route"], summary["status"]) == ("header", "/habits/{habit_id}", 200)
+    assert summary["data_size"]["habits"] == 1
+    assert summary["sql"]["queries"] > 0 and summary["sql"]["statements"]
+    assert "profiles" in json.loads((profiles_dir / "req-1.speedscope.json").read_text())
+
+
+def test_profiles_only_on_valid_token(profiled_client, profiles_dir):
+    for header in ({}, {PROFILE_HEADER: "wrong"}):
+        response = profiled_client.post("/auth/login", data={"username": "nobody", "password": "x"}, headers=header)
+        assert PROFILE_ID_HEADER not in response.headers
+    assert not profiles_dir.exists()
+
+
+def test_unsafe_request_id_replaced_and_old_profiles_pruned(profiled_client, profiles_dir):
+    ids = []
+    for request_id in ("../../etc/passwd", "a", "b"):
+        response = profiled_client.post(
+            "/auth/login",
+            data={"username": "nobody", "password": "x"},
+            headers={PROFILE_HEADER: TOKEN, REQUEST_ID_HEADER: request_id}
+        )
+        ids.append(response.headers[PROFILE_ID_HEADER])
+        # Profiles are pruned by modification time: keep them apart
+        time.sleep(0.02)
+    
+    assert ids[0] != "../../etc/passwd" and ids[1:] == ["a", "b"]
+    # PROFILES_MAX_KEPT is 2: the oldest profile is gone
+    assert sorted(path.name for path in profiles_dir.iterdir()) == [
+        "a.json", "a.speedscope.json", "b.json", "b.speedscope.json"
+    ]
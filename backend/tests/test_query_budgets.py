@@ -0,0 +1,88 @@
+"""
+Query budgets of the read endpoints
+Each endpoint declaring a budget is called on an account with several
+habits, categories, tags, logs, goals and achievements, so a query issued per
+row (an N+1) pushes it over the budget.
+"""
+
+import pytest
+
+from tests.test_logs import log_days
+from utils.sql_instrumentation import QUERY_BUDGET_HEADER, assert_query_budget
+
+HABITS = 4
+LOGGED_DAYS = [(1, True), (2, True), (3, False), (4, True), (5, True), (6, True)]
+
+
+@pytest.fixture
+def populated(client, auth_headers) -> dict:
+    """Ids of the data created for the budget checks"""
+    categories = [
+        client.post("/categories", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("Health", "Learning")
+    ]
+    tags = [
+        client.post("/tags", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("morning", "evening", "outdoor")
+    ]
+    
+    habits = []
+    for i in range(HABITS):
+        response = client.post(
+            "/habits",
+            json={
+                "name": f"Habit {i}",
+                "goal": "Every day",
+                "category_id": categories[i % len(categories)],
+                "tag_ids": tags[:i % len(tags) + 1],
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 201, response.text
+        habits.append(response.json()["id"])
+        log_days(client, auth_headers, habits[-1], LOGGED_DAYS)
+    
+    goals = []
+    for habit_id in habits:
+        response = client.post(
+            "/goals",
+            json={"habit_id": habit_id, "title": "Five times", "goal_type": "COUNT", "target_value": 5,
+                  "start_date": "2024-03-01T00:00:00"},
+            headers=auth_headers
+        )
+        assert response.status_code == 201, response.text
+        goals.append(response.json()["id"])
+    # Completing goals unlocks achievements
+    for goal_id in goals[:2]:
+        assert client.post(f"/goals/{goal_id}/check", headers=auth_headers).json()["completed"]
+    
+    return {"habit": habits[0], "category": categories[0], "tag": tags[0], "goal": goals[0]}
+
+
+@pytest.mark.parametrize("url", [
+    "/habits",
+    "/habits/{habit}",
+    "/habits/{habit}/logs",
+    "/categories",
+    "/categories/stats",
+    "/categories/{category}",
+    "/categories/{category}/habits",
+    "/categories/{category}/stats",
+    "/tags",
+    "/tags/{tag}",
+    "/tags/{tag}/habits",
+    "/goals",
+    "/goals/{goal}/progress",
+    "/achievements",
+    "/streaks/{habit}",
+    "/streaks/{habit}/history",
+    "/streaks/{habit}/current",
+    "/analytics/dashboard",
+    "/analytics/{habit}/heatmap",
+])
+def test_endpoint_within_query_budget(client, auth_headers, populated, url):
+    response = client.get(url.format(**populated), headers=auth_headers)
+    
+    assert response.status_code == 200, response.text
+    assert QUERY_BUDGET_HEADER in response.headers
+    assert_query_budget(response)
@@ -0,0 +1,91 @@
+"""
+Query plans of the hot queries
+Each query the routers run on a foreign key must be served by its index,
+both on a fresh database and on one upgraded from the original schema.
+PostgreSQL is planned with sequential and bitmap scans disabled: on the
+empty test tables it would otherwise always prefer them, so the check is
+whether a usable index exists.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text, update
+
+from database import init_db
+from models import Achievement, Goal, Habit, HabitLog, Streak, Tag
+from models.tag import habit_tags
+from tests.legacy_schema import legacy_metadata
+
+# (description, statement, index expected in the plan)
+HOT_QUERIES = [
+    ("habits of a user",
+     select(Habit).where(Habit.user_id == 1),
+     "ix_habits_user_id_category_id"),
+    ("habits of a user in a category",
+     select(Habit).where(Habit.user_id == 1, Habit.category_id == 2),
+     "ix_habits_user_id_category_id"),
+    ("habits in a category (category delete)",
+     update(Habit).where(Habit.category_id == 2).values(category_id=None),
+     "ix_habits_category_id"),
+    ("logs of a habit",
+     select(HabitLog).where(HabitLog.habit_id == 1),
+     "ix_habit_logs_habit_id_day"),
+    ("log of a habit on a day",
+     select(HabitLog).where(HabitLog.habit_id == 1, HabitLog.day == 739000),
+     "ix_habit_logs_habit_id_day"),
+    ("active goals of a user",
+     select(Goal).where(Goal.user_id == 1, Goal.completed == False),
+     "ix_goals_user_id_completed"),
+    ("goals of a habit",
+     select(Goal).where(Goal.habit_id == 1),
+     "ix_goals_habit_id"),
+    ("streak of a habit by start date",
+     select(Streak).where(Streak.habit_id == 1, Streak.start_date == datetime(2024, 1, 1)),
+     "ix_streaks_habit_id_start_date"),
+    ("achievements of a user, newest first",
+     select(Achievement).where(Achievement.user_id == 1).order_by(Achievement.unlocked_at.desc()),
+     "ix_achievements_user_id_unlocked_at"),
+    ("achievements of a goal (goal delete)",
+     select(Achievement).where(Achievement.goal_id == 1),
+     "ix_achievements_goal_id"),
+    ("tag of a user by name",
+     select(Tag.id).where(Tag.name == "health", Tag.user_id == 1),
+     "ix_tags_user_id_name"),
+    ("habits with a tag",
+     select(habit_tags.c.habit_id).where(habit_tags.c.tag_id == 1),
+     "ix_habit_tags_tag_id"),
+]
+
+
+def query_plan(conn, statement) -> str:
+    sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        return " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    conn.exec_driver_sql("SET LOCAL enable_bitmapscan = off")
+    return " | ".join(row[0] for row in conn.execute(text(f"EXPLAIN {sql}")))
+
+
+@pytest.fixture(params=["fresh", "upgraded"])
+def migrated_database(request, bound_database):
+    """A database created by the current models, or upgraded from the original schema"""
+    if request.param == "upgraded":
+        legacy_metadata.create_all(bound_database)
+    init_db()
+    return bound_database
+
+
+@pytest.mark.parametrize(
+    "statement, index_name",
+    [pytest.param(statement, index_name, id=description) for description, statement, index_name in HOT_QUERIES]
+)
+def test_hot_query_uses_index(migrated_database, statement, index_name):
+    with migrated_database.begin() as conn:
+        plan = query_plan(conn, statement)
+    
+    assert index_name in plan, plan
+    # No table scan, and no sort the index should have provided
+    assert "SCAN habit" not in plan and "Seq Scan" not in plan, plan
+    assert "TEMP B-TREE" not in plan and "Sort" not in plan, plan
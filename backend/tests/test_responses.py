@@ -0,0 +1,48 @@
+"""
+Fast JSON serialization and negotiated compression
+"""
+
+from fastapi.responses import JSONResponse
+
+from tests.test_logs import create_habit
+from utils.compression import supported_encodings
+from utils.fast_json import FastJSONResponse
+
+
+def test_fast_json_response_renders_any_content():
+    assert FastJSONResponse(b'{"a":1}').body == b'{"a":1}'
+    assert FastJSONResponse({"a": [1, 2]}).body == JSONResponse({"a": [1, 2]}).body
+
+
+def test_empty_dashboard(client, auth_headers):
+    response = client.get("/analytics/dashboard", headers=auth_headers)
+    
+    assert response.status_code == 200, response.text
+    dashboard = response.json()
+    assert dashboard["overall_stats"]["total_habits"] == 0
+    assert dashboard["overall_stats"]["best_day_date"] is None
+    assert (dashboard["heatmap_data"], dashboard["habit_summaries"], dashboard["category_breakdown"]) == ([], [], {})
+
+
+def test_fast_json_list_matches_response_model(client, auth_headers):
+    habit = create_habit(client, auth_headers, "Read")
+    
+    response = client.get("/habits", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == [client.get(f"/habits/{habit['id']}", headers=auth_headers).json()]
+
+
+def test_compression_follows_accept_encoding(client, auth_headers):
+    # Enough habits for the body to pass the minimum compressed size
+    for i in range(20):
+        create_habit(client, auth_headers, f"A habit with a fairly long name {i}")
+    
+    for encoding in supported_encodings():
+        response = client.get("/habits", headers={**auth_headers, "Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 20
+    
+    response = client.get("/habits", headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 20
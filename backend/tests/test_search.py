@@ -0,0 +1,102 @@
+"""
+Full-text search over habits and log notes (SQLite FTS5)
+"""
+
+import pytest
+
+
+@pytest.fixture
+def search(client, auth_headers, bound_database):
+    """GET /search for the test user; SQLite only"""
+    if bound_database.dialect.name != "sqlite":
+        pytest.skip("Search needs the SQLite FTS5 index")
+    
+    def run(q: str, **params) -> dict:
+        response = client.get("/search", params={"q": q, **params}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return run
+
+
+def create_habit(client, headers, name, goal="Every day") -> int:
+    response = client.post("/habits", json={"name": name, "goal": goal}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def log_note(client, headers, habit_id, day, note) -> int:
+    response = client.post(
+        f"/habits/{habit_id}/logs",
+        json={"date": f"2024-03-{day:02d}T12:00:00", "value": True, "note": note},
+        headers=headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def hits(results: dict) -> list:
+    return [(hit["type"], hit["id"]) for hit in results["results"]]
+
+
+def test_search_ranks_each_source_separately(client, auth_headers, search):
+    run = create_habit(client, auth_headers, "Morning run", "Run 5 km before work")
+    read = create_habit(client, auth_headers, "Read", "One chapter, maybe about running")
+    note = log_note(client, auth_headers, read, 1, "Skipped the run, read instead")
+    log_note(client, auth_headers, read, 2, "Nothing to report")
+    
+    results = search("run")
+    assert set(hits(results)) == {("habit", run), ("habit", read), ("log", note)}
+    # The best hit of each source scores 1.0 whatever its raw bm25 value
+    best = {hit["type"]: hit for hit in results["results"] if hit["score"] == 1.0}
+    assert best["habit"]["id"] == run and best["log"]["id"] == note
+    assert all(0 < hit["score"] <= 1.0 for hit in results["results"])
+    scores = [hit["score"] for hit in results["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert "<mark>run</mark>" in best["habit"]["snippet"]
+    
+    assert hits(search("run", type="log")) == [("log", note)]
+
+
+def test_snippet_is_html_escaped(client, auth_headers, search):
+    habit = create_habit(client, auth_headers, "Yoga <script>alert(1)</script>", "Stretch & breathe")
+    
+    [hit] = search("yoga")["results"]
+    assert hit["id"] == habit
+    assert "<script>" not in hit["snippet"]
+    assert "<mark>Yoga</mark> &lt;script&gt;alert(1)&lt;/script&gt;" in hit["snippet"]
+
+
+def test_search_pagination(client, auth_headers, search):
+    for i in range(3):
+        create_habit(client, auth_headers, f"Walk {i}")
+    
+    first = search("walk", limit=2)
+    second = search("walk", limit=2, offset=2)
+    assert (len(first["results"]), first["has_more"]) == (2, True)
+    assert (len(second["results"]), second["has_more"]) == (1, False)
+    assert not set(hits(first)) & set(hits(second))
+
+
+def test_index_follows_writes(client, auth_headers, search):
+    habit = create_habit(client, auth_headers, "Guitar")
+    note = log_note(client, auth_headers, habit, 1, "Learned a chord")
+    
+    # Renaming a habit and rewriting a note update the index
+    response = client.put(f"/habits/{habit}", json={"name": "Piano"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert log_note(client, auth_headers, habit, 1, "Practised scales") == note
+    assert hits(search("guitar")) == [] and hits(search("chord")) == []
+    assert hits(search("piano")) == [("habit", habit)]
+    assert hits(search("scales")) == [("log", note)]
+    
+    # Deleting the habit (and its logs) removes them
+    assert client.delete(f"/habits/{habit}", headers=auth_headers).status_code == 204
+    assert hits(search("piano")) == [] and hits(search("scales")) == []
+
+
+def test_search_other_backends(client, auth_headers, bound_database):
+    if bound_database.dialect.name == "sqlite":
+        pytest.skip("Search is supported on SQLite")
+    
+    response = client.get("/search", params={"q": "run"}, headers=auth_headers)
+    assert response.status_code == 501
@@ -0,0 +1,45 @@
+"""
+Server-Timing header
+"""
+
+from tests.test_logs import create_habit, log_days
+from utils.server_timing import SERVER_TIMING_HEADER, RequestTimings
+from utils.sql_instrumentation import QUERY_COUNT_HEADER
+
+
+def parse_server_timing(header: str) -> dict:
+    """{phase: (duration ms, description or None)}"""
+    phases = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        params = dict(param.split("=", 1) for param in params)
+        phases[name] = (float(params["dur"]), params.get("desc", "").strip('"') or None)
+    return phases
+
+
+def test_header_lists_entered_phases_in_order():
+    timings = RequestTimings()
+    timings.add("app", 0.010)
+    timings.add("db", 0.002)
+    timings.add("db", 0.001)
+    
+    assert timings.header(query_count=4) == 'db;dur=3.00;desc="4 queries", app;dur=10.00'
+
+
+def test_dashboard_phases(client, auth_headers):
+    habit = create_habit(client, auth_headers)
+    log_days(client, auth_headers, habit["id"], [(1, True), (2, False), (3, True)])
+    
+    response = client.get("/analytics/dashboard", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    
+    phases = parse_server_timing(response.headers[SERVER_TIMING_HEADER])
+    assert list(phases) == ["auth", "db", "orm", "compute", "serialize", "app"]
+    assert phases["db"][1] == f"{response.headers[QUERY_COUNT_HEADER]} queries"
+    assert all(duration <= phases["app"][0] for duration, _ in phases.values())
+
+
+def test_default_response_serialization_is_timed(client, auth_headers):
+    response = client.get("/tags", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert "serialize" in parse_server_timing(response.headers[SERVER_TIMING_HEADER])
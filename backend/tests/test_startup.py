@@ -0,0 +1,50 @@
+"""
+Worker start-up: importing the app is free, the lifespan does the work
+unless the launcher already initialized the database
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import main
+from database import INIT_DB_DONE_ENV, init_db
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+# Heavy modules only loaded by the endpoints or features that use them
+LAZY_MODULES = ("pandas", "pyinstrument")
+
+
+def test_import_touches_neither_database_nor_lazy_modules(tmp_path):
+    database_path = tmp_path / "untouched.db"
+    subprocess.run(
+        [sys.executable, "-c", f"import sys, main; assert not sys.modules.keys() & {set(LAZY_MODULES)}"],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}"),
+        check=True
+    )
+    assert not database_path.exists()
+
+
+@pytest.mark.parametrize("launcher_ran_init_db", [False, True])
+def test_lifespan_skips_init_db_after_launcher(bound_database, monkeypatch, launcher_ran_init_db):
+    # Tables exist either way; only whether the worker runs init_db again changes
+    init_db()
+    calls = []
+    monkeypatch.setattr(main, "init_db", lambda: calls.append("init_db"))
+    if launcher_ran_init_db:
+        monkeypatch.setenv(INIT_DB_DONE_ENV, "1")
+    else:
+        monkeypatch.delenv(INIT_DB_DONE_ENV, raising=False)
+    
+    with TestClient(main.app) as test_client:
+        assert test_client.get("/").status_code == 200
+        test_client.portal.call(database.async_engine.dispose)
+    assert calls == ([] if launcher_ran_init_db else ["init_db"])
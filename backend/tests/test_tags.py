@@ -0,0 +1,61 @@
+"""
+Tag usage counts and the multi-tag habit filter
+"""
+
+import pytest
+
+import routers.tags
+from utils.tag_counts import tag_usage_counts
+
+
+def create_habit(client, headers, name, tag_ids) -> int:
+    response = client.post("/habits", json={"name": name, "goal": "Every day", "tag_ids": tag_ids}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("denormalized", [True, False], ids=["counter", "grouped"])
+def test_tag_counts_follow_habit_changes(client, auth_headers, bound_database, monkeypatch, denormalized):
+    monkeypatch.setattr(routers.tags, "TAG_COUNTS_DENORMALIZED", denormalized)
+    morning, evening, outdoor = (
+        client.post("/tags", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("morning", "evening", "outdoor")
+    )
+    
+    def assert_counts(expected: dict) -> None:
+        response = client.get("/tags/with-counts", headers=auth_headers)
+        assert response.status_code == 200, response.text
+        served = {tag["id"]: tag["habit_count"] for tag in response.json()}
+        with bound_database.connect() as conn:
+            grouped = dict(conn.execute(tag_usage_counts()).all())
+        assert served == {tag_id: grouped.get(tag_id, 0) for tag_id in served} == expected
+    
+    run = create_habit(client, auth_headers, "Run", [morning, outdoor])
+    read = create_habit(client, auth_headers, "Read", [morning])
+    assert_counts({morning: 2, evening: 0, outdoor: 1})
+    
+    response = client.put(f"/habits/{run}", json={"tag_ids": [evening]}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert_counts({morning: 1, evening: 1, outdoor: 0})
+    
+    assert client.delete(f"/habits/{read}", headers=auth_headers).status_code == 204
+    assert_counts({morning: 0, evening: 1, outdoor: 0})
+
+
+def test_filter_habits_by_several_tags(client, auth_headers):
+    morning, outdoor = (
+        client.post("/tags", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("morning", "outdoor")
+    )
+    run = create_habit(client, auth_headers, "Run", [morning, outdoor])
+    read = create_habit(client, auth_headers, "Read", [morning])
+    create_habit(client, auth_headers, "Cook", [])
+    
+    def listed(params) -> list:
+        response = client.get("/habits", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return sorted(habit["id"] for habit in response.json())
+    
+    assert listed({"tag_ids": [morning, outdoor]}) == sorted([run, read])
+    assert listed({"tag_ids": [morning, outdoor], "tag_match": "all"}) == [run]
+    assert listed({"tag_id": outdoor}) == [run]
@@ -5,6 +5,9 @@ Utils package
 from .auth_utils import (
     hash_password,
     verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
     get_current_user,
 )
@@ -12,6 +15,9 @@ from .auth_utils import (
 __all__ = [
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
+    "password_needs_rehash",
     "create_access_token",
     "get_current_user",
 ]
@@ -2,31 +2,55 @@
 Authentication utilities for JWT and password hashing
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 import bcrypt
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_db
 from models import User
+from utils.principal_cache import principal_cache, snapshot_user, attach_principal
+from utils.server_timing import timed_phase
 
 # Configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"  # TODO: Move to environment variable
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Access tokens are short-lived and renewed via refresh tokens. They are not
+# revoked one by one: logout revokes the refresh token and the access token
+# works until it expires. Every request still resolves the user through the
+# principal cache, so a deleted or renamed user is rejected at once by this
+# process and by other workers within PRINCIPAL_CACHE_CHECK_SECONDS, when
+# their principals version poll clears the cache (PRINCIPAL_CACHE_TTL_SECONDS
+# if that poll fails).
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+
+# Password hashing: bcrypt cost, dedicated worker threads and max queued hash operations
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt with the configured work factor"""
     # Convert password to bytes and hash
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return as string for storage
     return hashed.decode('utf-8')
@@ -41,6 +65,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash was created with a different work factor"""
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_password_task(func, *args):
+    """Run a bcrypt call on the dedicated executor, bounded by the pending-task limit"""
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop or the request threadpool"""
+    return await _run_password_task(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop or the request threadpool"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -54,10 +104,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     """
     Dependency to get the current authenticated user from JWT token
     """
+    with timed_phase("auth"):
+        return await _resolve_user(token, db)
+
+
+async def _resolve_user(token: str, db: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -67,13 +122,29 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    # Serve the principal from cache when possible (no users query)
+    cached = principal_cache.get(username)
+    if cached is not None and (user_id is None or cached["id"] == user_id):
+        return await attach_principal(db, cached)
+    
+    # Tokens carrying the user id resolve through the primary key; legacy
+    # tokens without one through the username
+    if user_id is not None:
+        user = await db.get(User, user_id)
+        if user is not None and user.username != username:
+            user = None
+    else:
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
+    
     if user is None:
         raise credentials_exception
     
+    principal_cache.set(username, snapshot_user(user))
     return user
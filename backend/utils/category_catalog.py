@@ -0,0 +1,120 @@
+"""
+In-process category catalog
+Categories are global and rarely change, so every worker keeps them in
+memory. Writes bump the "categories" row of cache_versions in the same
+transaction; readers re-check that version at most every
+CATEGORY_CATALOG_CHECK_SECONDS and reload the catalog when it moved, which
+keeps several worker processes consistent.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from dependencies import get_db
+from models.cache_version import CacheVersion
+from models.category import Category
+from utils.metrics import record_cache_lookup
+
+# Configuration
+CATEGORY_CATALOG_CHECK_SECONDS = float(os.getenv("CATEGORY_CATALOG_CHECK_SECONDS", "5"))
+
+CATALOG_NAME = "categories"
+CATEGORY_COLUMNS = ("id", "name", "description", "color", "icon", "created_at")
+
+
+def _version_query():
+    return select(CacheVersion.version).where(CacheVersion.name == CATALOG_NAME)
+
+
+def _categories_query():
+    return select(*(getattr(Category, column) for column in CATEGORY_COLUMNS)).order_by(Category.id)
+
+
+class CategoryCatalog:
+    """
+    Snapshot of all categories, swapped as a whole on reload.
+    
+    A request costs at most two queries for it (version check and reload)
+    and none between checks.
+    """
+
+    def __init__(self, check_seconds: float = CATEGORY_CATALOG_CHECK_SECONDS):
+        self._check_seconds = check_seconds
+        self._by_id: Dict[int, dict] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self.reloads = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._version is not None
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def _replace(self, version: Optional[int], rows) -> None:
+        self._by_id = {row.id: dict(row._mapping) for row in rows}
+        self._version = version or 0
+        self._checked_at = time.monotonic()
+        self.reloads += 1
+
+    def load(self, db: Session) -> None:
+        """Load synchronously (application startup)"""
+        version = db.execute(_version_query()).scalar()
+        self._replace(version, db.execute(_categories_query()).all())
+
+    async def reload(self, db: AsyncSession, version: Optional[int] = None) -> None:
+        if version is None:
+            version = await db.scalar(_version_query())
+        self._replace(version, (await db.execute(_categories_query())).all())
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload when another process (or this one) changed the categories"""
+        if self.loaded and time.monotonic() - self._checked_at < self._check_seconds:
+            record_cache_lookup("categories", hit=True)
+            return
+        
+        version = await db.scalar(_version_query()) or 0
+        if version != self._version:
+            record_cache_lookup("categories", hit=False)
+            await self.reload(db, version)
+        else:
+            record_cache_lookup("categories", hit=True)
+            self._checked_at = time.monotonic()
+
+    def all(self) -> List[dict]:
+        return list(self._by_id.values())
+
+    def get(self, category_id: int) -> Optional[dict]:
+        return self._by_id.get(category_id)
+
+    def names(self) -> Dict[int, str]:
+        return {category_id: category["name"] for category_id, category in self._by_id.items()}
+
+
+category_catalog = CategoryCatalog()
+
+
+async def bump_catalog_version(db: AsyncSession) -> None:
+    """Invalidate every worker's catalog; call inside the writing transaction"""
+    result = await db.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == CATALOG_NAME)
+        .values(version=CacheVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.add(CacheVersion(name=CATALOG_NAME, version=1))
+
+
+async def get_category_catalog(db: AsyncSession = Depends(get_db)) -> CategoryCatalog:
+    """Dependency returning the catalog after an (interval-limited) version check"""
+    await category_catalog.ensure_fresh(db)
+    return category_catalog
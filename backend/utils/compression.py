@@ -0,0 +1,133 @@
+"""
+Negotiated response compression
+ASGI middleware that compresses responses with brotli or gzip, whichever the
+client prefers in Accept-Encoding. brotli is optional: without the package
+only gzip is offered. Small bodies, non-text content types and streaming
+responses are sent as they are.
+"""
+
+import gzip
+import os
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Configuration
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))  # Bytes
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))  # 0-11; low values suit dynamic responses
+
+# Bodies above this size are compressed in the threadpool instead of on the event loop
+THREADPOOL_COMPRESSION_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def supported_encodings() -> tuple:
+    """Encodings this server can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+    
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+    
+    Returns:
+        "br", "gzip" or None (send uncompressed)
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+    
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compress complete (non-streaming) text responses with the negotiated coding"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small: not worth buffering or compressing
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            
+            if len(body) > THREADPOOL_COMPRESSION_SIZE:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+        
+        await self.app(scope, receive, send_compressed)
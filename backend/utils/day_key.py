@@ -0,0 +1,23 @@
+"""
+Day key helpers
+Logs are keyed by the proleptic Gregorian ordinal of their calendar day
+(date.toordinal), so day arithmetic and comparisons are plain integer math.
+"""
+
+from datetime import date, datetime
+from typing import Union
+
+
+def to_day_key(value: Union[date, datetime]) -> int:
+    """Convert a date or datetime to its integer day key (time part is ignored)"""
+    return value.toordinal()
+
+
+def from_day_key(day_key: int) -> date:
+    """Convert an integer day key back to a date"""
+    return date.fromordinal(int(day_key))
+
+
+def today_key() -> int:
+    """Day key for the current local date"""
+    return date.today().toordinal()
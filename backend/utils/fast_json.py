@@ -0,0 +1,57 @@
+"""
+Fast JSON responses for list-heavy endpoints
+Serializes straight to bytes with pydantic-core (TypeAdapter.dump_json),
+skipping FastAPI's response_model round trip through Python dicts and the
+stdlib json encoder. Endpoints opt in by returning fast_json_response(...)
+and keep their response_model for validation rules and the OpenAPI schema.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from utils.server_timing import timed_phase
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response whose content is already serialized to bytes.
+    
+    Anything else (e.g. a model returned on a path that skipped
+    fast_json_response) is encoded like a regular JSONResponse rather than
+    sent as an empty body.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with timed_phase("serialize"):
+            return super().render(content)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any) -> bytes:
+    """
+    Validate `content` against `schema` and serialize it to JSON bytes.
+    
+    Args:
+        schema: Response type, the same as the endpoint's response_model (e.g. List[HabitLogResponse])
+        content: ORM objects, dicts or schema instances (instances are not re-validated)
+    
+    Returns:
+        UTF-8 encoded JSON
+    """
+    adapter = _adapter(schema)
+    with timed_phase("serialize"):
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def fast_json_response(schema: Any, content: Any, status_code: int = 200) -> FastJSONResponse:
+    """Build the response of an endpoint declared with response_model=schema"""
+    return FastJSONResponse(dump_json(schema, content), status_code=status_code)
@@ -5,10 +5,11 @@ Handles different goal types: STREAK, COUNT, DATE_BASED
 
 from datetime import datetime, date
 from typing import List, Optional, Tuple
-import pandas as pd
 
 from models.goal import Goal, GoalType
 from models.habit_log import HabitLog
+from utils.day_key import to_day_key, from_day_key, today_key
+from utils.metrics import timed_calculator
 from utils.streak_calculator import calculate_current_streak
 
 
@@ -38,6 +39,7 @@ def calculate_goal_progress(goal: Goal, logs: List[HabitLog]) -> Tuple[int, floa
     return current_value, round(progress_percentage, 2)
 
 
+@timed_calculator("goal_completion")
 def check_goal_completion(goal: Goal, logs: List[HabitLog]) -> bool:
     """
     Check if a goal has been completed.
@@ -73,18 +75,20 @@ def calculate_total_completions(logs: List[HabitLog], start_date: Optional[datet
     if not logs:
         return 0
     
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date, 'value': log.value}
-        for log in logs
-    ])
+    import pandas as pd
+    
+    # Convert to DataFrame keyed by day
+    df = pd.DataFrame({
+        'day': [log.day for log in logs],
+        'value': [bool(log.value) for log in logs]
+    })
     
     # Filter by start_date if provided
     if start_date:
-        df = df[df['date'] >= start_date]
+        df = df[df['day'] >= to_day_key(start_date)]
     
     # Count completed logs
-    return int(df[df['value'] == True].shape[0])
+    return int(df['value'].sum())
 
 
 def calculate_completions_until_date(
@@ -106,20 +110,22 @@ def calculate_completions_until_date(
     if not logs:
         return 0
     
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date, 'value': log.value}
-        for log in logs
-    ])
+    import pandas as pd
+    
+    # Convert to DataFrame keyed by day
+    df = pd.DataFrame({
+        'day': [log.day for log in logs],
+        'value': [bool(log.value) for log in logs]
+    })
     
     # Filter by date range
     if start_date:
-        df = df[df['date'] >= start_date]
+        df = df[df['day'] >= to_day_key(start_date)]
     if end_date:
-        df = df[df['date'] <= end_date]
+        df = df[df['day'] <= to_day_key(end_date)]
     
     # Count completed logs
-    return int(df[df['value'] == True].shape[0])
+    return int(df['value'].sum())
 
 
 def get_estimated_completion_date(goal: Goal, logs: List[HabitLog]) -> Optional[date]:
@@ -138,32 +144,26 @@ def get_estimated_completion_date(goal: Goal, logs: List[HabitLog]) -> Optional[
     if not logs or len(logs) < 7:  # Need at least a week of data
         return None
     
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date.date(), 'value': log.value}
-        for log in logs
-    ])
+    import pandas as pd
     
-    # Filter only completed logs
-    completed_df = df[df['value'] == True].copy()
+    # Completed day keys, sorted
+    completed_days = pd.Series(
+        [log.day for log in logs if log.value], dtype="int64"
+    ).sort_values(ignore_index=True)
     
-    if completed_df.empty:
+    if completed_days.empty:
         return None
     
-    # Convert to datetime
-    completed_df['date'] = pd.to_datetime(completed_df['date'])
-    completed_df = completed_df.sort_values('date')
-    
     # Calculate completion rate (completions per day) over last 30 days
-    thirty_days_ago = datetime.now() - pd.Timedelta(days=30)
-    recent_df = completed_df[completed_df['date'] >= thirty_days_ago]
+    thirty_days_ago = today_key() - 30
+    recent_days = completed_days[completed_days >= thirty_days_ago]
     
-    if recent_df.empty:
+    if recent_days.empty:
         return None
     
     # Calculate average completions per day
-    days_span = (recent_df['date'].max() - recent_df['date'].min()).days + 1
-    completions_count = len(recent_df)
+    days_span = int(recent_days.max() - recent_days.min()) + 1
+    completions_count = len(recent_days)
     avg_per_day = completions_count / days_span if days_span > 0 else 0
     
     if avg_per_day == 0:
@@ -180,9 +180,7 @@ def get_estimated_completion_date(goal: Goal, logs: List[HabitLog]) -> Optional[
     days_needed = remaining / avg_per_day
     
     # Project completion date
-    estimated_date = date.today() + pd.Timedelta(days=int(days_needed))
-    
-    return estimated_date.date() if hasattr(estimated_date, 'date') else estimated_date
+    return from_day_key(today_key() + int(days_needed))
 
 
 def calculate_days_remaining(goal: Goal) -> Optional[int]:
@@ -202,6 +200,7 @@ def calculate_days_remaining(goal: Goal) -> Optional[int]:
     return max(delta.days, 0)
 
 
+@timed_calculator("goal_insights")
 def get_goal_insights(goal: Goal, logs: List[HabitLog]) -> dict:
     """
     Get comprehensive insights about goal progress.
@@ -0,0 +1,272 @@
+"""
+Bulk log import utilities
+Parses CSV / NDJSON uploads incrementally and upserts logs in batched transactions
+"""
+
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.habit import Habit
+from models.habit_log import HabitLog
+from utils.day_key import to_day_key
+from utils.streak_store import rebuild_habit_streaks
+
+# Configuration
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+DEFAULT_IMPORTED_GOAL = "Imported habit"
+
+TRUE_VALUES = {"1", "true", "yes", "y", "done", "x"}
+FALSE_VALUES = {"0", "false", "no", "n", ""}
+
+
+class ImportRowError(ValueError):
+    """Raised when a single import row cannot be parsed"""
+
+
+def iter_raw_rows(stream: BinaryIO, file_format: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield (line_number, raw_row) pairs from an uploaded file, one line at a time.
+
+    The stream is decoded lazily so the file is never fully loaded in memory.
+
+    Args:
+        stream: Binary file object (e.g. UploadFile.file)
+        file_format: "csv" or "ndjson"
+
+    Returns:
+        Iterator of (line_number, dict) tuples
+    """
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, {"__error__": f"Invalid JSON: {exc.msg}"}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, {"__error__": "Each line must be a JSON object"}
+            continue
+        yield line_number, row
+
+
+def parse_row(raw: dict) -> dict:
+    """
+    Validate and normalize a raw import row.
+
+    Expected keys: habit, date, value and optionally note and goal.
+
+    Raises:
+        ImportRowError: If the row is malformed
+    """
+    if "__error__" in raw:
+        raise ImportRowError(raw["__error__"])
+
+    habit_name = str(raw.get("habit") or "").strip()
+    if not habit_name:
+        raise ImportRowError("Missing habit name")
+    if len(habit_name) > 100:
+        raise ImportRowError("Habit name is longer than 100 characters")
+
+    raw_date = raw.get("date")
+    if not raw_date:
+        raise ImportRowError("Missing date")
+    try:
+        log_date = datetime.fromisoformat(str(raw_date).strip())
+    except ValueError:
+        raise ImportRowError(f"Invalid date: {raw_date!r}")
+
+    raw_value = raw.get("value", True)
+    if isinstance(raw_value, bool):
+        value = raw_value
+    else:
+        normalized = str(raw_value).strip().lower()
+        if normalized in TRUE_VALUES:
+            value = True
+        elif normalized in FALSE_VALUES:
+            value = False
+        else:
+            raise ImportRowError(f"Invalid value: {raw_value!r}")
+
+    note = raw.get("note") or None
+    goal = str(raw.get("goal") or "").strip() or DEFAULT_IMPORTED_GOAL
+
+    return {
+        "habit": habit_name,
+        "date": log_date,
+        "value": value,
+        "note": str(note) if note is not None else None,
+        "goal": goal[:500],
+    }
+
+
+def _resolve_habits(
+    db: Session,
+    user_id: int,
+    batch: List[dict],
+    habit_ids: Dict[str, int],
+    summary: dict
+) -> None:
+    """Match batch habit names against the user's habits, creating missing ones"""
+    missing = {row["habit"]: row["goal"] for row in batch if row["habit"] not in habit_ids}
+    if not missing:
+        return
+
+    existing = db.query(Habit.id, Habit.name).filter(
+        Habit.user_id == user_id,
+        Habit.name.in_(list(missing))
+    ).order_by(Habit.id).all()
+
+    for habit_id, name in existing:
+        habit_ids.setdefault(name, habit_id)
+
+    new_habits = [
+        Habit(name=name, goal=goal, user_id=user_id)
+        for name, goal in missing.items()
+        if name not in habit_ids
+    ]
+    if new_habits:
+        db.add_all(new_habits)
+        db.flush()
+        for habit in new_habits:
+            habit_ids[habit.name] = habit.id
+        summary["habits_created"] += len(new_habits)
+
+
+def _upsert_batch(
+    db: Session,
+    user_id: int,
+    batch: List[dict],
+    habit_ids: Dict[str, int],
+    summary: dict
+) -> Tuple[int, int]:
+    """Upsert one batch of parsed rows. Returns (created, updated)"""
+    _resolve_habits(db, user_id, batch, habit_ids, summary)
+
+    # Last row wins when the same habit/day appears twice in a batch
+    rows = {}
+    for row in batch:
+        rows[(habit_ids[row["habit"]], to_day_key(row["date"]))] = row
+
+    batch_habit_ids = {habit_id for habit_id, _ in rows}
+    batch_days = {day for _, day in rows}
+    existing_logs = {}
+    for log in db.query(HabitLog).filter(
+        HabitLog.habit_id.in_(batch_habit_ids),
+        HabitLog.day.in_(batch_days)
+    ).order_by(HabitLog.id):
+        existing_logs.setdefault((log.habit_id, log.day), log)
+
+    created = updated = 0
+    for key, row in rows.items():
+        existing_log = existing_logs.get(key)
+        if existing_log:
+            existing_log.value = row["value"]
+            if row["note"] is not None:
+                existing_log.note = row["note"]
+            updated += 1
+        else:
+            db.add(HabitLog(habit_id=key[0], date=row["date"], value=row["value"], note=row["note"]))
+            created += 1
+
+    db.commit()
+    return created, updated
+
+
+def _record_error(summary: dict, line: int, message: str) -> None:
+    summary["error_count"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": line, "message": message})
+
+
+def import_logs(
+    db: Session,
+    user_id: int,
+    stream: BinaryIO,
+    file_format: str,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> dict:
+    """
+    Import habit logs for a user from a CSV or NDJSON stream.
+
+    Habits are matched by name (and created when missing), logs are upserted
+    in transactions of `batch_size` rows, and streaks are rebuilt once per
+    touched habit after the last batch.
+
+    Returns:
+        Summary dictionary matching schemas.ImportSummary
+    """
+    summary = {
+        "rows_processed": 0,
+        "habits_created": 0,
+        "logs_created": 0,
+        "logs_updated": 0,
+        "batches_committed": 0,
+        "streaks_rebuilt": 0,
+        "error_count": 0,
+        "errors": [],
+        "progress": [],
+    }
+    habit_ids: Dict[str, int] = {}
+    touched_habits = set()
+    batch: List[dict] = []
+    batch_lines: List[int] = []
+
+    def flush():
+        try:
+            created, updated = _upsert_batch(db, user_id, batch, habit_ids, summary)
+        except Exception as exc:
+            db.rollback()
+            # Habits created in the failed transaction were rolled back too
+            habit_ids.clear()
+            _record_error(summary, batch_lines[0], f"Batch ending at line {batch_lines[-1]} failed: {exc}")
+            return
+
+        touched_habits.update(habit_ids[row["habit"]] for row in batch)
+        summary["logs_created"] += created
+        summary["logs_updated"] += updated
+        summary["batches_committed"] += 1
+        summary["progress"].append({
+            "batch": summary["batches_committed"],
+            "rows_processed": summary["rows_processed"],
+            "logs_created": summary["logs_created"],
+            "logs_updated": summary["logs_updated"],
+        })
+
+    for line_number, raw in iter_raw_rows(stream, file_format):
+        summary["rows_processed"] += 1
+        try:
+            batch.append(parse_row(raw))
+            batch_lines.append(line_number)
+        except ImportRowError as exc:
+            _record_error(summary, line_number, str(exc))
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+            batch, batch_lines = [], []
+
+    if batch:
+        flush()
+
+    # Re-materialize derived data once for every habit that received logs
+    for habit_id in touched_habits:
+        rebuild_habit_streaks(db, habit_id)
+    db.commit()
+    summary["streaks_rebuilt"] = len(touched_habits)
+
+    return summary
@@ -0,0 +1,220 @@
+"""
+Write-behind queue for habit log upserts
+Coalesces concurrent log writes into small group-commit batches executed by a
+single writer thread, so SQLite's writer lock is taken once per batch instead
+of once per request.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.habit_log import HabitLog
+from utils.day_key import to_day_key
+
+# Configuration
+LOG_WRITE_MODE = os.getenv("LOG_WRITE_MODE", "direct")  # "direct" or "queued"
+LOG_WRITE_BATCH_SIZE = int(os.getenv("LOG_WRITE_BATCH_SIZE", "64"))
+LOG_WRITE_MAX_DELAY_MS = float(os.getenv("LOG_WRITE_MAX_DELAY_MS", "5"))
+LOG_WRITE_ACK_TIMEOUT_SECONDS = float(os.getenv("LOG_WRITE_ACK_TIMEOUT_SECONDS", "10"))
+
+_STOP = object()
+
+
+class LogWriteQueue:
+    """
+    Single-writer group-commit queue.
+
+    `submit` returns a Future that resolves with the committed log row only
+    after its batch has been committed, so acknowledging a request after
+    `future.result()` is as durable as a direct commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = LOG_WRITE_BATCH_SIZE,
+        max_delay_ms: float = LOG_WRITE_MAX_DELAY_MS
+    ):
+        self._session_factory = session_factory
+        self._batch_size = max(batch_size, 1)
+        self._max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "committed": 0,
+            "failed": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "max_batch_size": 0,
+            "commit_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)"""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="log-write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush pending writes and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    def submit(
+        self,
+        habit_id: int,
+        log_date: datetime,
+        value: bool,
+        note: Optional[str] = None
+    ) -> Future:
+        """Enqueue a log upsert. The Future resolves to the committed row as a dict"""
+        if not self.running:
+            self.start()
+
+        future: Future = Future()
+        with self._lock:
+            self._stats["submitted"] += 1
+        self._queue.put((habit_id, log_date, value, note, future))
+        return future
+
+    def stats(self) -> dict:
+        """Counters describing queue throughput and batching efficiency"""
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        commit_seconds = stats.pop("commit_seconds")
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = round(stats["committed"] / batches, 2) if batches else 0.0
+        stats["avg_commit_ms"] = round(commit_seconds * 1000 / batches, 3) if batches else 0.0
+        stats["running"] = self.running
+        return stats
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # Collect more writes until the batch is full or the delay elapses
+            batch = [item]
+            deadline = time.monotonic() + self._max_delay
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Drain whatever was enqueued before the stop marker was processed
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for start in range(0, len(pending), self._batch_size):
+            self._flush(pending[start:start + self._batch_size])
+
+    def _flush(self, batch: List[tuple]) -> None:
+        # Requests that timed out waiting for their ack have cancelled their future
+        batch = [item for item in batch if item[-1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            # Later writes for the same habit/day win, as they would sequentially
+            rows: Dict[tuple, tuple] = {}
+            for habit_id, log_date, value, note, _ in batch:
+                rows[(habit_id, to_day_key(log_date))] = (log_date, value, note)
+
+            existing_logs: Dict[tuple, HabitLog] = {}
+            for log in db.query(HabitLog).filter(
+                HabitLog.habit_id.in_({habit_id for habit_id, _ in rows}),
+                HabitLog.day.in_({day for _, day in rows})
+            ).order_by(HabitLog.id):
+                existing_logs.setdefault((log.habit_id, log.day), log)
+
+            logs: Dict[tuple, HabitLog] = {}
+            for key, (log_date, value, note) in rows.items():
+                log = existing_logs.get(key)
+                if log:
+                    log.value = value
+                    if note is not None:
+                        log.note = note
+                else:
+                    log = HabitLog(habit_id=key[0], date=log_date, value=value, note=note)
+                    db.add(log)
+                logs[key] = log
+
+            db.flush()
+            results = {
+                key: {
+                    "id": log.id,
+                    "habit_id": log.habit_id,
+                    "date": log.date,
+                    "value": log.value,
+                    "note": log.note,
+                }
+                for key, log in logs.items()
+            }
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            with self._lock:
+                self._stats["failed"] += len(batch)
+                self._stats["failed_batches"] += 1
+            for *_, future in batch:
+                future.set_exception(exc)
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            self._stats["committed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+            self._stats["commit_seconds"] += time.perf_counter() - started
+
+        for habit_id, log_date, _, _, future in batch:
+            future.set_result(results[(habit_id, to_day_key(log_date))])
+
+
+def is_queued_mode() -> bool:
+    """True when log upserts go through the write-behind queue"""
+    return LOG_WRITE_MODE == "queued"
+
+
+log_write_queue = LogWriteQueue(SessionLocal)
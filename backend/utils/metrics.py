@@ -0,0 +1,148 @@
+"""
+Prometheus metrics
+Request rate, per-route latency, in-flight requests, database time, pool
+checkout wait, cache hits and calculator timings, exposed on /metrics.
+
+Multi-worker mode: set PROMETHEUS_MULTIPROC_DIR to an empty directory shared
+by the workers (scripts/run_prod.sh does); every worker then writes its
+samples to memory-mapped files there and /metrics aggregates all of them.
+"""
+
+import functools
+import os
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    REGISTRY,
+)
+
+from utils.server_timing import timed_phase
+from utils.sql_instrumentation import count_queries, current_query_stats
+
+# Configuration
+METRICS_ENABLED = os.getenv("METRICS", "true").lower() in ("1", "true", "yes")
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Buckets in seconds, from cache-served reads to slow analytics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Requests that matched no route share one label, so random paths cannot
+# create unbounded series
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served",
+    ["method"], multiprocess_mode="livesum"
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Database time spent per request by route template",
+    ["route"], buckets=FAST_BUCKETS
+)
+REQUEST_DB_QUERIES = Counter(
+    "http_request_db_queries_total", "SQL statements executed by route template",
+    ["route"]
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time to obtain a pooled database connection",
+    ["pool"], buckets=FAST_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "In-process cache lookups (hit ratio = hit / all)",
+    ["cache", "result"]
+)
+CALCULATOR_LATENCY = Histogram(
+    "calculator_duration_seconds", "Analytics, streak and goal calculator run time",
+    ["calculator"], buckets=FAST_BUCKETS
+)
+
+
+def route_template(request: Request) -> str:
+    """Path template of the matched route, e.g. /habits/{habit_id}/logs"""
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """HTTP middleware recording request count, latency and database time per route"""
+    method = request.method
+    REQUESTS_IN_PROGRESS.labels(method).inc()
+    started = time.perf_counter()
+    status = 500
+
+    # Reuse the SQL instrumentation stats when enabled, otherwise count here
+    stats = current_query_stats()
+    try:
+        if stats is None:
+            with count_queries() as stats:
+                response = await call_next(request)
+        else:
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = route_template(request)
+        REQUESTS_IN_PROGRESS.labels(method).dec()
+        REQUESTS.labels(method, route, str(status)).inc()
+        REQUEST_LATENCY.labels(method, route).observe(elapsed)
+        REQUEST_DB_TIME.labels(route).observe(stats.seconds)
+        REQUEST_DB_QUERIES.labels(route).inc(stats.count)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_pool_wait(pool: str, seconds: float) -> None:
+    DB_POOL_WAIT.labels(pool).observe(seconds)
+
+
+def timed_calculator(name: str) -> Callable:
+    """Decorator recording the run time of a calculator under `name` (and as Server-Timing compute)"""
+    histogram = CALCULATOR_LATENCY.labels(name)
+
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with timed_phase("compute"):
+                    return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return timed
+    return decorate
+
+
+def metrics_response() -> Response:
+    """Current samples in the Prometheus text format (all workers in multiprocess mode)"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Gunicorn child_exit hook: drop the live gauges of a stopped worker"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
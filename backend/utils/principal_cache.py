@@ -0,0 +1,148 @@
+"""
+Principal cache for authenticated requests
+Keeps a bounded, TTL-limited snapshot of recently resolved users keyed by
+token subject, so get_current_user can skip the users lookup.
+User changes bump the "principals" row of cache_versions; a background task
+in every worker polls it and clears the local cache when it moved, so other
+workers never serve a changed user for longer than the poll interval.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from models.cache_version import CacheVersion
+from models.user import User
+from utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+PRINCIPAL_CACHE_CHECK_SECONDS = float(os.getenv("PRINCIPAL_CACHE_CHECK_SECONDS", "2"))
+
+PRINCIPALS_VERSION_NAME = "principals"
+
+# Columns kept in the cache (the password hash is deliberately left out)
+PRINCIPAL_COLUMNS = ("id", "username", "email", "created_at")
+
+
+class PrincipalCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                record_cache_lookup("principals", hit=False)
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            record_cache_lookup("principals", hit=True)
+            return entry[1]
+
+    def set(self, subject: str, snapshot: dict) -> None:
+        if self._max_size <= 0 or self._ttl <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self._ttl, snapshot)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def sync_version(self, version: int) -> bool:
+        """Adopt the shared version, clearing the cache if it moved. Returns True if cleared"""
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            if changed:
+                self._entries.clear()
+            self._version = version
+            return changed
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
+
+def snapshot_user(user: User) -> dict:
+    """Plain-data copy of the cached user columns"""
+    return {column: getattr(user, column) for column in PRINCIPAL_COLUMNS}
+
+
+async def attach_principal(db: AsyncSession, snapshot: dict) -> User:
+    """
+    Rebuild a persistent User in `db` from a cached snapshot without a query.
+
+    Only the snapshot columns are loaded; use `await db.refresh(user)` before
+    reading anything else.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    """Drop cached principals whenever a user row changes or disappears"""
+    usernames = set(inspect(target).attrs.username.history.deleted or ())
+    usernames.add(target.username)
+    for username in usernames:
+        principal_cache.invalidate(username)
+    
+    # Same transaction as the change: other workers see both or neither
+    connection.execute(
+        update(CacheVersion.__table__)
+        .where(CacheVersion.name == PRINCIPALS_VERSION_NAME)
+        .values(version=CacheVersion.version + 1)
+    )
+
+
+async def watch_principal_version(
+    session_factory: async_sessionmaker,
+    interval: float = PRINCIPAL_CACHE_CHECK_SECONDS
+) -> None:
+    """
+    Poll the shared principals version for the lifetime of a worker.
+    
+    Runs as a background task, so requests never pay for the check.
+    """
+    query = select(CacheVersion.version).where(CacheVersion.name == PRINCIPALS_VERSION_NAME)
+    while True:
+        try:
+            async with session_factory() as db:
+                version = await db.scalar(query)
+            principal_cache.sync_version(version or 0)
+        except SQLAlchemyError:
+            # Keep serving from the TTL-bounded cache and retry on the next tick
+            logger.exception("Could not check the principals cache version")
+        await asyncio.sleep(interval)
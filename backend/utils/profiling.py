@@ -0,0 +1,200 @@
+"""
+On-demand request profiling
+Samples the Python stack of selected requests with pyinstrument and stores
+one speedscope profile per request (open it at https://www.speedscope.app,
+it renders as a flamegraph) next to a JSON summary: route, status, duration,
+the user's data size (habits and logs) and the SQL time breakdown.
+
+A request is profiled when it carries the debug header with the configured
+token (X-Profile: <PROFILING_TOKEN>) or when it falls in the sampled
+fraction of traffic (PROFILING_SAMPLE_RATE). Both are off by default.
+pyinstrument is optional and only imported when profiling is configured.
+
+Only the event loop thread is sampled: work handed to the threadpool
+(pandas calculators) shows up as time spent awaiting it.
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from database import AsyncSessionLocal
+from models import Habit, HabitLog, User
+from utils.auth_utils import ALGORITHM, SECRET_KEY
+from utils.metrics import route_template
+from utils.sql_instrumentation import count_queries, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")  # Empty: the debug header is ignored
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # Fraction of requests, 0-1
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.001"))  # Seconds between stack samples
+PROFILES_DIR = os.getenv("PROFILES_DIR", os.path.join(tempfile.gettempdir(), "habit-tracker-profiles"))
+PROFILES_MAX_KEPT = int(os.getenv("PROFILES_MAX_KEPT", "200"))  # Oldest profiles are deleted beyond this
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Never profiled: scrapes and the profiler's own overhead would dominate
+EXCLUDED_PATHS = ("/metrics",)
+
+
+def profiling_enabled() -> bool:
+    """True when profiling is configured and pyinstrument is installed"""
+    if not PROFILING_TOKEN and PROFILING_SAMPLE_RATE <= 0:
+        return False
+    
+    # Imported only when profiling is on, so the app does not load it otherwise
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        logger.warning("Profiling is configured but pyinstrument is not installed, no profiles are taken")
+        return False
+    return True
+
+
+def _trigger(request: Request) -> Optional[str]:
+    """Why this request should be profiled ("header" or "sample"), None to skip it"""
+    if request.url.path in EXCLUDED_PATHS:
+        return None
+    
+    token = request.headers.get(PROFILE_HEADER)
+    if token and PROFILING_TOKEN and hmac.compare_digest(token, PROFILING_TOKEN):
+        return "header"
+    if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def _request_id(request: Request) -> str:
+    """Client supplied request id when it is safe as a file name, a new one otherwise"""
+    supplied = request.headers.get(REQUEST_ID_HEADER, "")
+    if supplied and len(supplied) <= 64 and all(char.isalnum() or char in "-_" for char in supplied):
+        return supplied
+    return uuid.uuid4().hex
+
+
+async def _user_data_size(request: Request) -> Optional[dict]:
+    """Habit and log counts of the request's user, None for anonymous requests"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    
+    user_id = payload.get("uid")
+    habits = select(func.count(Habit.id)).where(Habit.user_id == User.id).scalar_subquery()
+    logs = (
+        select(func.count(HabitLog.id))
+        .join(Habit, Habit.id == HabitLog.habit_id)
+        .where(Habit.user_id == User.id)
+        .scalar_subquery()
+    )
+    query = select(User.id, habits, logs)
+    if user_id is not None:
+        query = query.where(User.id == user_id)
+    else:
+        query = query.where(User.username == payload.get("sub"))
+    
+    # Own stats block: these queries are not part of the profiled request
+    with count_queries():
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(query)).first()
+    if row is None:
+        return None
+    return {"user_id": row[0], "habits": row[1], "logs": row[2]}
+
+
+def _write_profile(request_id: str, speedscope: str, summary: dict) -> None:
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    with open(os.path.join(PROFILES_DIR, f"{request_id}.speedscope.json"), "w") as file:
+        file.write(speedscope)
+    with open(os.path.join(PROFILES_DIR, f"{request_id}.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    
+    # Keep the newest PROFILES_MAX_KEPT profiles
+    summaries = sorted(
+        (entry for entry in os.scandir(PROFILES_DIR) if entry.name.endswith(".json")
+         and not entry.name.endswith(".speedscope.json")),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in summaries[:max(len(summaries) - PROFILES_MAX_KEPT, 0)]:
+        stale_id = entry.name[:-len(".json")]
+        for name in (f"{stale_id}.json", f"{stale_id}.speedscope.json"):
+            try:
+                os.remove(os.path.join(PROFILES_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+async def profiling_middleware(request: Request, call_next):
+    """HTTP middleware profiling requests selected by the debug header or sampling"""
+    trigger = _trigger(request)
+    if trigger is None:
+        return await call_next(request)
+    
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    
+    request_id = _request_id(request)
+    stats = current_query_stats()
+    profiler = Profiler(interval=PROFILING_INTERVAL, async_mode="enabled")
+    started = time.perf_counter()
+    
+    # Reuse the SQL instrumentation stats when enabled, otherwise count here
+    with count_queries() if stats is None else nullcontext(stats) as stats:
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+    duration = time.perf_counter() - started
+    
+    try:
+        summary = {
+            "request_id": request_id,
+            "trigger": trigger,
+            "created_at": datetime.utcnow().isoformat(),
+            "method": request.method,
+            "route": route_template(request),
+            "path": request.url.path,
+            "query": request.url.query,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "data_size": await _user_data_size(request),
+            "sql": {
+                "queries": stats.count,
+                "ms": round(stats.milliseconds, 3),
+                "statements": stats.breakdown(),
+            },
+        }
+        speedscope = profiler.output(renderer=SpeedscopeRenderer())
+        await run_in_threadpool(_write_profile, request_id, speedscope, summary)
+    except Exception:
+        # A failed profile must never fail the request it describes
+        logger.exception("Could not store the profile of %s %s", request.method, request.url.path)
+        return response
+    
+    response.headers[PROFILE_ID_HEADER] = request_id
+    logger.info(
+        "Profiled %s %s (%s): %.1f ms, %d queries -> %s",
+        request.method, request.url.path, trigger, duration * 1000, stats.count, request_id
+    )
+    return response
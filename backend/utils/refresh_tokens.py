@@ -0,0 +1,115 @@
+"""
+Refresh token utilities
+Issues opaque refresh tokens, rotates them on use and revokes token families
+"""
+
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.refresh_token import RefreshToken
+
+# Configuration
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused"""
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 digest used to look tokens up without storing them"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> str:
+    """
+    Create a refresh token for a user and stage it in the session.
+
+    The caller owns the transaction and is expected to commit.
+
+    Returns:
+        The raw token, which is only ever returned to the client
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+async def revoke_token_family(db: AsyncSession, family_id: str) -> None:
+    """Revoke every still-active token issued from the same login"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[int, str]:
+    """
+    Exchange a refresh token for a new one from the same family.
+
+    Presenting an already rotated token is treated as theft: the whole family
+    is revoked. Commits the transaction.
+
+    Returns:
+        Tuple of (user_id, new_raw_token)
+
+    Raises:
+        RefreshTokenError: If the token cannot be used
+    """
+    stored = await _get_stored_token(db, token)
+
+    if stored is None:
+        raise RefreshTokenError("Unknown refresh token")
+
+    if stored.revoked_at is not None:
+        await revoke_token_family(db, stored.family_id)
+        await db.commit()
+        raise RefreshTokenError("Refresh token reuse detected")
+
+    if stored.expires_at < datetime.utcnow():
+        raise RefreshTokenError("Refresh token expired")
+
+    # Conditional update so two concurrent exchanges cannot both succeed
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        raise RefreshTokenError("Refresh token already used")
+
+    user_id, family_id = stored.user_id, stored.family_id
+    new_token = issue_refresh_token(db, user_id, family_id)
+    await db.commit()
+
+    return user_id, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Log out: revoke the family of the given token (unknown tokens are ignored). Commits"""
+    stored = await _get_stored_token(db, token)
+    if stored is not None:
+        await revoke_token_family(db, stored.family_id)
+        await db.commit()
+
+
+async def _get_stored_token(db: AsyncSession, token: str) -> Optional[RefreshToken]:
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    return result.scalars().first()
@@ -0,0 +1,139 @@
+"""
+Full-text search utilities
+Turns free text into a safe FTS5 MATCH expression and queries the habits_fts /
+habit_logs_fts indexes created by migration 5 (SQLite only).
+"""
+
+import html
+import os
+import re
+from typing import List, Optional
+
+from sqlalchemy import DateTime, Float, Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Configuration
+SEARCH_MAX_TERMS = int(os.getenv("SEARCH_MAX_TERMS", "8"))
+SEARCH_SNIPPET_TOKENS = int(os.getenv("SEARCH_SNIPPET_TOKENS", "12"))
+
+# Column weights for bm25(): a hit in the habit name outranks one in its goal
+HABIT_NAME_WEIGHT = 10.0
+HABIT_GOAL_WEIGHT = 5.0
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# snippet() wraps matches in these control characters rather than in HTML, so
+# the stored text can be HTML-escaped before they become <mark> tags
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+# bm25() is unbounded and not comparable across FTS tables, so each source is
+# normalised by its own best hit: score = rank / best rank, 1.0 for the best
+# match of that source and closer to 0 for weaker ones
+_HABIT_HITS = f"""
+    SELECT 'habit' AS type, habits.id AS id, habits.id AS habit_id, habits.name AS habit_name,
+           NULL AS date,
+           snippet(habits_fts, -1, char(2), char(3), '…', {SEARCH_SNIPPET_TOKENS}) AS snippet,
+           bm25(habits_fts, {HABIT_NAME_WEIGHT}, {HABIT_GOAL_WEIGHT}) AS rank
+    FROM habits_fts
+    JOIN habits ON habits.id = habits_fts.rowid
+    WHERE habits_fts MATCH :match AND habits.user_id = :user_id
+"""
+
+_LOG_HITS = f"""
+    SELECT 'log' AS type, habit_logs.id AS id, habits.id AS habit_id, habits.name AS habit_name,
+           habit_logs.date AS date,
+           snippet(habit_logs_fts, 0, char(2), char(3), '…', {SEARCH_SNIPPET_TOKENS}) AS snippet,
+           bm25(habit_logs_fts) AS rank
+    FROM habit_logs_fts
+    JOIN habit_logs ON habit_logs.id = habit_logs_fts.rowid
+    JOIN habits ON habits.id = habit_logs.habit_id
+    WHERE habit_logs_fts MATCH :match AND habits.user_id = :user_id
+"""
+
+_SCORED_HITS = """
+    SELECT type, id, habit_id, habit_name, date, snippet,
+           COALESCE(rank / NULLIF(MIN(rank) OVER (), 0), 1.0) AS score
+    FROM ({hits})
+"""
+
+
+def search_supported(db: AsyncSession) -> bool:
+    """The FTS5 index only exists on SQLite databases"""
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Convert user input into an FTS5 MATCH expression.
+    
+    Every word is double-quoted so FTS5 operators and column filters typed by
+    the user are matched literally; words are ANDed and the last one is a
+    prefix, so results show up while typing.
+    
+    Args:
+        query: Raw search text
+    
+    Returns:
+        MATCH expression, or None when the text has no searchable words
+    """
+    terms = _TERM_PATTERN.findall(query)[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML-escape an FTS5 snippet, then wrap its matched terms in <mark></mark>"""
+    return (
+        html.escape(snippet)
+        .replace(_MATCH_START, "<mark>")
+        .replace(_MATCH_END, "</mark>")
+    )
+
+
+async def search_user_content(
+    db: AsyncSession,
+    user_id: int,
+    match: str,
+    kind: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> List[dict]:
+    """
+    Ranked habits and log notes of one user matching an FTS5 expression.
+    
+    Args:
+        db: Database session
+        user_id: Owner of the searched habits
+        match: Expression built by build_match_query
+        kind: "habit" or "log" to search only one index
+        limit: Page size
+        offset: Rows to skip
+    
+    Returns:
+        List of hit dicts ordered by score (best first), snippets escaped
+    """
+    parts = []
+    if kind in (None, "habit"):
+        parts.append(_SCORED_HITS.format(hits=_HABIT_HITS))
+    if kind in (None, "log"):
+        parts.append(_SCORED_HITS.format(hits=_LOG_HITS))
+    
+    statement = text(
+        " UNION ALL ".join(parts) + " ORDER BY score DESC, type, id LIMIT :limit OFFSET :offset"
+    ).columns(
+        type=String, id=Integer, habit_id=Integer, habit_name=String,
+        date=DateTime, snippet=String, score=Float
+    )
+    result = await db.execute(
+        statement,
+        {"match": match, "user_id": user_id, "limit": limit, "offset": offset}
+    )
+    return [
+        {**row, "snippet": highlight_snippet(row["snippet"])}
+        for row in result.mappings()
+    ]
@@ -0,0 +1,141 @@
+"""
+Server-Timing header
+Breaks the latency of every response into phases, reported in the standard
+Server-Timing header (shown by browser devtools, read by load_test.py):
+
+    auth       resolving the current user (get_current_user)
+    db         SQL statements executing in the database
+    orm        fetching result rows and building objects from them
+    compute    pandas / calculator work (functions decorated with timed_calculator)
+    serialize  encoding the response body to JSON
+    app        the whole request inside the application
+
+Phases can overlap (the user lookup of auth is db time too) and not every
+step has a phase (e.g. response_model validation), so they need not add
+up to app.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.sql_instrumentation import count_queries, current_query_stats
+
+# Configuration
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Header order; phases a request never entered are left out
+PHASES = ("auth", "db", "orm", "compute", "serialize", "app")
+
+
+class RequestTimings:
+    """Seconds spent per phase within one request"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self, query_count: Optional[int] = None) -> str:
+        entries = []
+        for phase in PHASES:
+            if phase not in self.phases:
+                continue
+            entry = f"{phase};dur={self.phases[phase] * 1000:.2f}"
+            if phase == "db" and query_count is not None:
+                entry += f';desc="{query_count} queries"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+# Timings of the running request; like the SQL stats, the object is shared
+# with threadpool work, which runs on a copy of the context
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("server_timings", default=None)
+
+# Phases open in the current context: nested calls (a calculator calling
+# another one, lazy loads during hydration) are not counted twice
+_open_phases: ContextVar[FrozenSet[str]] = ContextVar("server_timing_open_phases", default=frozenset())
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """Add the time spent inside the block to `phase` of the running request"""
+    timings = _current_timings.get()
+    open_phases = _open_phases.get()
+    if timings is None or phase in open_phases:
+        yield
+        return
+    
+    token = _open_phases.set(open_phases | {phase})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+        _open_phases.reset(token)
+
+
+# ORM selects through any session (sync or async) are fully loaded inside
+# execute, so their run time minus the SQL time is row fetching + hydration
+@event.listens_for(Session, "do_orm_execute")
+def _time_orm_select(orm_execute_state):
+    timings = _current_timings.get()
+    open_phases = _open_phases.get()
+    if timings is None or not orm_execute_state.is_select or "orm" in open_phases:
+        return None
+    
+    stats = current_query_stats()
+    db_before = stats.seconds if stats is not None else 0.0
+    token = _open_phases.set(open_phases | {"orm"})
+    started = time.perf_counter()
+    try:
+        return orm_execute_state.invoke_statement()
+    finally:
+        db_spent = stats.seconds - db_before if stats is not None else 0.0
+        timings.add("orm", max(time.perf_counter() - started - db_spent, 0.0))
+        _open_phases.reset(token)
+
+
+class TimedJSONResponse(JSONResponse):
+    """Default response class: JSON rendering counts as the serialize phase"""
+
+    def render(self, content) -> bytes:
+        with timed_phase("serialize"):
+            return super().render(content)
+
+
+async def server_timing_middleware(request: Request, call_next):
+    """HTTP middleware adding the Server-Timing header to every response"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    started = time.perf_counter()
+    
+    # Reuse the SQL instrumentation stats when enabled, otherwise count here
+    stats = current_query_stats()
+    try:
+        if stats is None:
+            with count_queries() as stats:
+                response = await call_next(request)
+        else:
+            response = await call_next(request)
+    finally:
+        _current_timings.reset(token)
+    
+    timings.add("db", stats.seconds)
+    timings.add("app", time.perf_counter() - started)
+    response.headers[SERVER_TIMING_HEADER] = timings.header(stats.count)
+    return response
@@ -0,0 +1,174 @@
+"""
+Per-request SQL instrumentation
+Counts the queries and database time of every request through SQLAlchemy
+cursor events, reports them as response headers and a debug log, and flags
+N+1 patterns (the same statement executed many times in one request).
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+SQL_INSTRUMENTATION_ENABLED = os.getenv("SQL_INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+QUERY_BUDGET_HEADER = "X-DB-Query-Budget"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by the test helpers when a request runs more queries than allowed"""
+
+
+class QueryStats:
+    """Queries executed within one request (or one `count_queries` block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.budget: Optional[int] = None
+        self.statements: Counter = Counter()
+        self.statement_seconds: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        self.statement_seconds[statement] += seconds
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def repeated_statements(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, the signature of an N+1"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def breakdown(self, limit: int = 10) -> List[dict]:
+        """The statements that took the most database time, with their execution counts"""
+        return [
+            {"statement": " ".join(statement.split()), "count": self.statements[statement], "ms": round(seconds * 1000, 3)}
+            for statement, seconds in self.statement_seconds.most_common(limit)
+        ]
+
+
+# Stats object of the running request. The object itself is mutable, so
+# threadpool work (which runs on a copy of the context) reports into it too.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# Listening on the Engine class covers the sync engine and the async
+# engine's underlying sync engine alike
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        context._sql_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, "_sql_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Collect the queries run inside the block (scripts and tests)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring the most queries an endpoint should run.
+    
+    Usage:
+        @router.get("", dependencies=[Depends(query_budget(3))])
+    
+    The budget is reported in the X-DB-Query-Budget header and a warning is
+    logged whenever a request exceeds it; `assert_query_budget` turns that
+    into a test failure.
+    """
+    async def declare_query_budget():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+    return declare_query_budget
+
+
+def assert_query_budget(response, max_queries: Optional[int] = None) -> int:
+    """
+    Test helper: fail when a response ran more queries than allowed.
+    
+    Args:
+        response: Response from TestClient / httpx / requests
+        max_queries: Explicit budget, defaults to the one the endpoint declared
+    
+    Returns:
+        Number of queries the request ran
+    
+    Raises:
+        QueryBudgetExceeded: If the budget was exceeded
+    """
+    if QUERY_COUNT_HEADER not in response.headers:
+        raise QueryBudgetExceeded(f"Response has no {QUERY_COUNT_HEADER} header, is SQL_INSTRUMENTATION enabled?")
+    
+    count = int(response.headers[QUERY_COUNT_HEADER])
+    if max_queries is None and QUERY_BUDGET_HEADER in response.headers:
+        max_queries = int(response.headers[QUERY_BUDGET_HEADER])
+    
+    if max_queries is not None and count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {max_queries}"
+        )
+    return count
+
+
+async def sql_instrumentation_middleware(request: Request, call_next):
+    """HTTP middleware adding per-request query count and DB time headers"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+    
+    response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+    response.headers[QUERY_TIME_HEADER] = f"{stats.milliseconds:.2f}"
+    if stats.budget is not None:
+        response.headers[QUERY_BUDGET_HEADER] = str(stats.budget)
+    
+    path = f"{request.method} {request.url.path}"
+    logger.debug("%s: %d queries, %.2f ms in the database", path, stats.count, stats.milliseconds)
+    if stats.over_budget:
+        logger.warning("%s ran %d queries, over its budget of %d", path, stats.count, stats.budget)
+    for statement, count in stats.repeated_statements():
+        logger.warning("Possible N+1 in %s: statement executed %d times: %s", path, count, " ".join(statement.split())[:200])
+    
+    return response
@@ -3,22 +3,45 @@ Streak calculation utilities using Pandas
 Demonstrates Python mastery with data processing
 """
 
-from datetime import datetime, date, timedelta
-from typing import List, Tuple, Optional
-import pandas as pd
+from datetime import date
+from typing import TYPE_CHECKING, List, Tuple, Optional
 
 from models.habit_log import HabitLog
+from utils.day_key import from_day_key, today_key
+from utils.metrics import timed_calculator
 
+# pandas is imported inside the functions that need it: it is the heaviest
+# import of the API and most requests never touch it
+if TYPE_CHECKING:
+    import pandas as pd
 
+
+def _completed_days(logs: List[HabitLog]) -> "pd.Series":
+    """
+    Sorted, de-duplicated day keys of the completed logs.
+    
+    Logs carry an integer day key, so no per-row datetime conversion is needed.
+    """
+    import pandas as pd
+    
+    days = pd.Series([log.day for log in logs if log.value], dtype="int64")
+    return days.drop_duplicates().sort_values(ignore_index=True)
+
+
+def _streak_groups(days: "pd.Series") -> "pd.Series":
+    """Label each day with its streak group (a new group starts after every gap)"""
+    return (days.diff() != 1).cumsum()
+
+
+@timed_calculator("current_streak")
 def calculate_current_streak(logs: List[HabitLog]) -> int:
     """
     Calculate the current active streak of consecutive completions.
     
     Uses Pandas to:
-    1. Convert logs to DataFrame
-    2. Filter only completed logs
-    3. Sort by date
-    4. Check for consecutive days from today backwards
+    1. Collect completed day keys
+    2. Group consecutive days
+    3. Take the latest group if it reaches today or yesterday
     
     Args:
         logs: List of HabitLog objects
@@ -26,58 +49,27 @@ def calculate_current_streak(logs: List[HabitLog]) -> int:
     Returns:
         Length of current streak (0 if no current streak)
     """
-    if not logs:
-        return 0
-    
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date.date(), 'value': log.value}
-        for log in logs
-    ])
+    days = _completed_days(logs)
     
-    # Filter only completed logs
-    df = df[df['value'] == True].copy()
-    
-    if df.empty:
+    if days.empty:
         return 0
     
-    # Convert to datetime and sort
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date', ascending=False).drop_duplicates(subset=['date'])
-    
-    # Check if today or yesterday has a log (streak must be recent)
-    today = pd.Timestamp(date.today())
-    yesterday = today - pd.Timedelta(days=1)
-    
-    latest_date = df['date'].iloc[0]
-    
     # Streak is broken if last completion was more than 1 day ago
-    if latest_date < yesterday:
+    if days.iloc[-1] < today_key() - 1:
         return 0
     
-    # Count consecutive days backwards from latest
-    streak = 0
-    current_date = latest_date
-    
-    for log_date in df['date']:
-        if log_date == current_date:
-            streak += 1
-            current_date -= pd.Timedelta(days=1)
-        elif log_date < current_date:
-            # Gap found, streak ends
-            break
-    
-    return streak
+    groups = _streak_groups(days)
+    return int((groups == groups.iloc[-1]).sum())
 
 
+@timed_calculator("longest_streak")
 def calculate_longest_streak(logs: List[HabitLog]) -> int:
     """
     Calculate the longest streak ever achieved.
     
     Uses Pandas to:
-    1. Create complete date range
-    2. Identify consecutive completion groups
-    3. Find maximum group length
+    1. Identify consecutive completion groups
+    2. Find maximum group length
     
     Args:
         logs: List of HabitLog objects
@@ -85,38 +77,17 @@ def calculate_longest_streak(logs: List[HabitLog]) -> int:
     Returns:
         Length of longest streak
     """
-    if not logs:
-        return 0
-    
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date.date(), 'value': log.value}
-        for log in logs
-    ])
-    
-    # Filter only completed logs
-    df = df[df['value'] == True].copy()
+    days = _completed_days(logs)
     
-    if df.empty:
+    if days.empty:
         return 0
     
-    # Convert to datetime and sort
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').drop_duplicates(subset=['date'])
-    
-    # Calculate date differences to find gaps
-    df['date_diff'] = df['date'].diff().dt.days
-    
-    # Mark new streak groups (when diff > 1 or NaN for first row)
-    df['new_streak'] = (df['date_diff'] > 1) | (df['date_diff'].isna())
-    df['streak_group'] = df['new_streak'].cumsum()
-    
-    # Count streak lengths
-    streak_lengths = df.groupby('streak_group').size()
+    streak_lengths = days.groupby(_streak_groups(days)).size()
     
     return int(streak_lengths.max())
 
 
+@timed_calculator("streak_history")
 def get_streak_history(logs: List[HabitLog]) -> List[Tuple[date, Optional[date], int]]:
     """
     Get all historical streak periods.
@@ -130,49 +101,23 @@ def get_streak_history(logs: List[HabitLog]) -> List[Tuple[date, Optional[date],
     Returns:
         List of (start_date, end_date, length) tuples
     """
-    if not logs:
-        return []
-    
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date.date(), 'value': log.value}
-        for log in logs
-    ])
-    
-    # Filter only completed logs
-    df = df[df['value'] == True].copy()
+    days = _completed_days(logs)
     
-    if df.empty:
+    if days.empty:
         return []
     
-    # Convert to datetime and sort
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').drop_duplicates(subset=['date'])
+    periods = days.groupby(_streak_groups(days)).agg(["min", "max", "size"])
     
-    # Calculate date differences to find gaps
-    df['date_diff'] = df['date'].diff().dt.days
+    # Current streak if it ends today or yesterday
+    yesterday = today_key() - 1
     
-    # Mark new streak groups
-    df['new_streak'] = (df['date_diff'] > 1) | (df['date_diff'].isna())
-    df['streak_group'] = df['new_streak'].cumsum()
-    
-    # Get streak periods
     streaks = []
-    for group_id in df['streak_group'].unique():
-        group_df = df[df['streak_group'] == group_id]
-        start_date = group_df['date'].min().date()
-        end_date = group_df['date'].max().date()
-        length = len(group_df)
-        
-        # Check if this is the current streak
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-        
-        # Current streak if end_date is today or yesterday
-        if end_date >= yesterday:
-            streaks.append((start_date, None, length))
+    for start_day, end_day, length in periods.itertuples(index=False):
+        start_date = from_day_key(start_day)
+        if end_day >= yesterday:
+            streaks.append((start_date, None, int(length)))
         else:
-            streaks.append((start_date, end_date, length))
+            streaks.append((start_date, from_day_key(end_day), int(length)))
     
     return streaks
 
@@ -189,35 +134,18 @@ def detect_streak_breaks(logs: List[HabitLog]) -> List[date]:
     Returns:
         List of dates where streaks ended
     """
-    if not logs:
-        return []
+    days = _completed_days(logs)
     
-    # Convert to DataFrame
-    df = pd.DataFrame([
-        {'date': log.date.date(), 'value': log.value}
-        for log in logs
-    ])
-    
-    # Filter only completed logs
-    df = df[df['value'] == True].copy()
-    
-    if df.empty:
+    if days.empty:
         return []
     
-    # Convert to datetime and sort
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').drop_duplicates(subset=['date'])
-    
-    # Calculate date differences
-    df['date_diff'] = df['date'].diff().dt.days
-    
     # Find where gaps occur (diff > 1)
-    breaks = df[df['date_diff'] > 1]['date'].tolist()
+    breaks = days[days.diff() > 1]
     
-    # Convert to date objects
-    return [d.date() for d in breaks]
+    return [from_day_key(day) for day in breaks]
 
 
+@timed_calculator("streak_statistics")
 def calculate_streak_statistics(logs: List[HabitLog]) -> dict:
     """
     Calculate comprehensive streak statistics.
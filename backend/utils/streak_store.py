@@ -0,0 +1,40 @@
+"""
+Streak persistence helpers
+Rebuilds the materialized Streak rows of a habit from its logs
+"""
+
+from sqlalchemy.orm import Session
+
+from models.habit_log import HabitLog
+from models.streak import Streak
+from utils.streak_calculator import get_streak_history
+
+
+def rebuild_habit_streaks(db: Session, habit_id: int) -> int:
+    """
+    Replace the stored streak records of a habit with freshly calculated ones.
+    
+    The caller owns the transaction and is expected to commit.
+    
+    Args:
+        db: Database session
+        habit_id: Habit whose streaks are rebuilt
+        
+    Returns:
+        Number of streak records created
+    """
+    db.query(Streak).filter(Streak.habit_id == habit_id).delete()
+    
+    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
+    history = get_streak_history(logs)
+    
+    for start_date, end_date, length in history:
+        db.add(Streak(
+            habit_id=habit_id,
+            start_date=start_date,
+            end_date=end_date,
+            length=length,
+            is_current=(end_date is None)
+        ))
+    
+    return len(history)
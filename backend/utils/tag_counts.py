@@ -0,0 +1,67 @@
+"""
+Tag usage counts
+Habit counts per tag from a single GROUP BY over habit_tags, the
+denormalized Tag.habit_count counter kept in sync with it, and the grouped
+habit filter behind multi-tag searches.
+"""
+
+import os
+from typing import Iterable, List
+
+from sqlalchemy import Select, distinct, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.tag import Tag, habit_tags
+
+# Configuration
+TAG_COUNTS_DENORMALIZED = os.getenv("TAG_COUNTS_DENORMALIZED", "true").lower() in ("1", "true", "yes")
+
+
+def tag_usage_counts() -> Select:
+    """(tag_id, habit_count) for every tag in use, in one grouped query"""
+    return (
+        select(habit_tags.c.tag_id, func.count(habit_tags.c.habit_id).label("habit_count"))
+        .group_by(habit_tags.c.tag_id)
+    )
+
+
+def habits_with_tags(tag_ids: List[int], match: str = "any") -> Select:
+    """
+    Ids of habits carrying the given tags, grouped over habit_tags.
+    
+    Args:
+        tag_ids: Tags to look for
+        match: "any" for at least one of the tags, "all" for every one
+    """
+    query = (
+        select(habit_tags.c.habit_id)
+        .where(habit_tags.c.tag_id.in_(tag_ids))
+        .group_by(habit_tags.c.habit_id)
+    )
+    if match == "all":
+        query = query.having(func.count(distinct(habit_tags.c.tag_id)) == len(set(tag_ids)))
+    return query
+
+
+async def refresh_tag_counts(db: AsyncSession, tag_ids: Iterable[int]) -> None:
+    """
+    Recount Tag.habit_count for the given tags after their habits changed.
+    
+    Flushes pending association changes first; the caller commits.
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return
+    
+    await db.flush()
+    usage = (
+        select(func.count(habit_tags.c.habit_id))
+        .where(habit_tags.c.tag_id == Tag.id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Tag)
+        .where(Tag.id.in_(tag_ids))
+        .values(habit_count=usage)
+        .execution_options(synchronize_session=False)
+    )
@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { Habit, createHabitLog } from '../services/api';
+import { Habit, setTodayLogs } from '../services/api';
 
 interface HabitQuickToggleProps {
   habits: Habit[];
@@ -17,10 +17,7 @@ export default function HabitQuickToggle({ habits, completedHabits, onToggle }:
 
     try {
       const today = new Date().toISOString().split('T')[0];
-      await createHabitLog(habit.id, {
-        date: today,
-        value: !isCompleted,
-      });
+      await setTodayLogs({ [habit.id]: !isCompleted }, today);
       onToggle();
     } catch (err) {
       console.error('Failed to toggle habit:', err);
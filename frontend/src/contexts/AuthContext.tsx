@@ -1,5 +1,5 @@
 import React, { createContext, useState, useContext, useEffect, ReactNode } from 'react';
-import { login as apiLogin, register as apiRegister, getCurrentUser } from '../services/api';
+import { login as apiLogin, logout as apiLogout, register as apiRegister, getCurrentUser } from '../services/api';
 
 interface User {
   id: number;
@@ -52,6 +52,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       } catch (error) {
         console.error('Auth check failed:', error);
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         setToken(null);
         setUser(null);
       }
@@ -65,6 +66,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       const newToken = response.access_token;
       
       localStorage.setItem('token', newToken);
+      if (response.refresh_token) {
+        localStorage.setItem('refresh_token', response.refresh_token);
+      }
       setToken(newToken);
       
       // Fetch user data
@@ -88,7 +92,12 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      apiLogout(refreshToken).catch((error) => console.error('Logout failed:', error));
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     setToken(null);
     setUser(null);
   };
@@ -18,6 +18,51 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Renew the access token with the refresh token once when a request gets a 401
+// (except for the endpoints that issue or revoke tokens themselves)
+const NO_REFRESH_URLS = ['/auth/login', '/auth/register', '/auth/refresh', '/auth/logout'];
+
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = async (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    return null;
+  }
+  try {
+    const response = await axios.post(`${API_BASE_URL}/auth/refresh`, {
+      refresh_token: refreshToken,
+    });
+    localStorage.setItem('token', response.data.access_token);
+    localStorage.setItem('refresh_token', response.data.refresh_token);
+    return response.data.access_token;
+  } catch {
+    localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+    return null;
+  }
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status !== 401 || !original || original._retried || NO_REFRESH_URLS.includes(original.url ?? '')) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+    refreshPromise = refreshPromise ?? refreshAccessToken().finally(() => {
+      refreshPromise = null;
+    });
+    const newToken = await refreshPromise;
+    if (!newToken) {
+      return Promise.reject(error);
+    }
+    original.headers.Authorization = `Bearer ${newToken}`;
+    return api(original);
+  }
+);
+
 // Auth Types
 export interface User {
   id: number;
@@ -35,6 +80,8 @@ export interface UserCreate {
 export interface Token {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
+  expires_in?: number;
 }
 
 // Habit Types
@@ -69,6 +116,18 @@ export interface HabitLogCreate {
   value: boolean;
 }
 
+export interface TodayLogResult {
+  habit_id: number;
+  log_id: number;
+  value: boolean;
+  current_streak: number;
+}
+
+export interface TodayLogsResponse {
+  date: string;
+  results: TodayLogResult[];
+}
+
 export interface HeatmapDataPoint {
   date: string;
   value: number;
@@ -122,6 +181,15 @@ export const deleteHabitLog = async (habitId: number, logId: number): Promise<vo
   await api.delete(`/habits/${habitId}/logs/${logId}`);
 };
 
+// Set today's log for several habits in one request
+export const setTodayLogs = async (
+  values: Record<number, boolean>,
+  date?: string
+): Promise<TodayLogsResponse> => {
+  const response = await api.post('/logs/today', { values, date });
+  return response.data;
+};
+
 // Analytics
 export const getHabitHeatmap = async (habitId: number): Promise<HeatmapResponse> => {
   const response = await api.get(`/analytics/${habitId}/heatmap`);
@@ -147,6 +215,10 @@ export const login = async (username: string, password: string): Promise<Token>
   return response.data;
 };
 
+export const logout = async (refreshToken: string): Promise<void> => {
+  await api.post('/auth/logout', { refresh_token: refreshToken });
+};
+
 export const getCurrentUser = async (): Promise<User> => {
   const response = await api.get('/auth/me');
   return response.data;
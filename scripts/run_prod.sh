@@ -0,0 +1,25 @@
+#!/bin/bash
+
+echo "=================================="
+echo "Habit Tracker API - Production"
+echo "=================================="
+echo ""
+
+# Workers, bind address, keep-alive, backlog... are read from the environment
+# by backend/gunicorn_conf.py (e.g. WEB_CONCURRENCY=8 PORT=8000)
+cd "$(dirname "$0")/../backend"
+
+if [ -d "venv" ]; then
+    source venv/bin/activate
+fi
+
+# Workers share their Prometheus samples through this directory (/metrics)
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-${TMPDIR:-/tmp}/habit-tracker-metrics}"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+echo "🚀 Starting ${WEB_CONCURRENCY:-$(nproc)} workers on ${BIND:-${HOST:-0.0.0.0}:${PORT:-8000}}"
+echo "   Graceful reload: kill -HUP <master pid>"
+echo ""
+
+# exec so gunicorn's master receives the signals sent to this script
+exec gunicorn main:app -c gunicorn_conf.py